@@ -0,0 +1,140 @@
+import csv
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+from .workflow import run_pipeline
+from .pool import agent_pool
+from .tools.rate_limit import limiter_stats
+from .tools.search_tools import article_cache_stats
+
+_DEFAULT_LICENSES = "CC-BY,CC-BY-SA,CC0,Public Domain"
+
+
+def _slug(text: str) -> str:
+    s = re.sub(r"[^A-Za-z0-9]+", "-", text.strip().lower()).strip("-")
+    return s[:60] or "course"
+
+
+def load_topics(path: str) -> List[Dict]:
+    """
+    Read a topic list from YAML (a list, or {"topics": [...]}), CSV (header row)
+    or JSONL. Each entry needs `topic`; weeks, lessons_per_week, min_resources,
+    licenses and out_dir are optional per topic.
+    """
+    p = Path(path)
+    suffix = p.suffix.lower()
+    text = p.read_text(encoding="utf-8")
+    if suffix in (".yaml", ".yml"):
+        data = yaml.safe_load(text) or []
+        rows = data.get("topics", []) if isinstance(data, dict) else data
+    elif suffix == ".csv":
+        rows = list(csv.DictReader(text.splitlines()))
+    elif suffix in (".jsonl", ".ndjson"):
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        raise ValueError(f"unsupported topic list format: {p.suffix} (use .yaml, .csv or .jsonl)")
+
+    out = []
+    for row in rows:
+        if isinstance(row, str):
+            row = {"topic": row}
+        topic = str((row or {}).get("topic") or "").strip()
+        if topic:
+            out.append({k: v for k, v in row.items() if v not in (None, "")})
+    return out
+
+
+def run_batch(
+    topics_path: str,
+    cfg: Dict,
+    out_root: str = "courses",
+    workers: int = 4,
+    weeks: int = 4,
+    lessons_per_week: int = 2,
+    min_resources: int = 2,
+    license_allowlist: str = _DEFAULT_LICENSES,
+    on_done: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Build every topic in `topics_path` on a thread pool, one directory per course
+    under `out_root`. Workers share the article cache, rate limiters, pooled agents
+    and LLM clients. Writes `<out_root>/batch_report.json` and returns it.
+    """
+    jobs = load_topics(topics_path)
+    workers = max(1, int(workers))
+    root = Path(out_root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    # keep one idle agent set per worker so every build after the first reuses one
+    pool = agent_pool()
+    pool.max_idle = max(pool.max_idle, workers)
+
+    used = set()
+    for job in jobs:
+        slug = _slug(job.get("out_dir") or job["topic"])
+        base, n = slug, 2
+        while slug in used:
+            slug, n = f"{base}-{n}", n + 1
+        used.add(slug)
+        job["out_dir"] = (root / slug).as_posix()
+
+    def _one(job: Dict) -> Dict:
+        t0 = time.perf_counter()
+        rec = {"topic": job["topic"], "out_dir": job["out_dir"]}
+        try:
+            res = run_pipeline(
+                job["topic"],
+                int(job.get("weeks", weeks)),
+                int(job.get("lessons_per_week", lessons_per_week)),
+                int(job.get("min_resources", min_resources)),
+                str(job.get("licenses") or job.get("license_allowlist") or license_allowlist),
+                cfg,
+                out_dir=job["out_dir"],
+            )
+            rec["status"] = "ok"
+            rec["lessons"] = len(res["manifest"].get("lessons", []))
+            rec["license_violations"] = len(res["qa"].get("license_violations", []))
+            storage = res["manifest"].get("storage") or {}
+            rec["bytes_written"] = (storage.get("written") or {}).get("total")
+            rec["bytes"] = storage.get("bytes")
+            rec["stored_bytes"] = storage.get("stored_bytes")
+        except Exception as e:
+            rec["status"] = "failed"
+            rec["error"] = f"{type(e).__name__}: {e}"
+        rec["seconds"] = round(time.perf_counter() - t0, 3)
+        return rec
+
+    t_start = time.perf_counter()
+    results: List[Dict] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="build") as ex:
+        futures = [ex.submit(_one, job) for job in jobs]
+        for fut in as_completed(futures):
+            rec = fut.result()
+            results.append(rec)
+            if on_done:
+                on_done(rec)
+
+    results.sort(key=lambda r: r["out_dir"])
+    report = {
+        "topics_file": str(topics_path),
+        "workers": workers,
+        "total": len(results),
+        "ok": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "seconds": round(time.perf_counter() - t_start, 3),
+        # summed over successful courses; per-course figures are in `courses`
+        "bytes_written": sum(r.get("bytes_written") or 0 for r in results),
+        "stored_bytes": sum(r.get("stored_bytes") or 0 for r in results),
+        "courses": results,
+        "article_cache": article_cache_stats(),
+        "agent_pool": pool.stats(),
+        "limits": limiter_stats(),
+    }
+    (root / "batch_report.json").write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return report
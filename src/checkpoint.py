@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+
+class Checkpoint:
+    """
+    Durable per-unit build progress: one JSON file per completed unit
+    (refine, crew, curated, spares, syllabus, lesson_W_L, quiz_W_L) under the course tree.
+    Every save is write-to-temp + fsync + os.replace, so a crash leaves either
+    the previous state or the new one, never a torn file.
+    """
+
+    def __init__(self, root: str = "course/.checkpoint"):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def save(self, key: str, value: Any):
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"key": key, "value": value}, ensure_ascii=False)
+        fd, tmp = tempfile.mkstemp(prefix=f".{key}.", suffix=".tmp", dir=str(self.root))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def load(self, key: str) -> Optional[Any]:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def done(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def matches(self, params: dict) -> bool:
+        """True if the checkpoint was written for the same build parameters."""
+        return self.load("params") == params
+
+    def completed(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.stem for p in self.root.glob("*.json"))
@@ -2,12 +2,42 @@ import yaml
 from pathlib import Path
 from typing import Optional, Callable, Dict, Any
 from .workflow import run_pipeline
+from .batch import run_batch
+from .render import parse_formats
+from .tools.export_tools import parse_sidecars
 
 def load_config():
     p = Path(__file__).resolve().parents[1] / "configs" / "settings.yaml"
     return yaml.safe_load(p.read_text(encoding="utf-8"))
 
-def run(topic, weeks, lessons_per_week, min_resources, license_allowlist, progress_cb=None):
+def run(topic, weeks, lessons_per_week, min_resources, license_allowlist, progress_cb=None, low_memory=None,
+        resume=None, corpus=None, max_cost_usd=None, max_tokens=None, formats=None, incremental=None,
+        compact=None, sidecars=None, out_dir="course"):
     cfg = load_config()
+    if formats:
+        cfg.setdefault("output", {})["formats"] = list(parse_formats(formats))
+    if compact is not None:
+        cfg.setdefault("output", {})["compact"] = bool(compact)
+    if sidecars:
+        cfg.setdefault("output", {})["sidecars"] = list(parse_sidecars(sidecars))
+    if incremental is not None:
+        cfg.setdefault("run", {})["incremental"] = bool(incremental)
+    if max_cost_usd is not None:
+        cfg.setdefault("budget", {})["max_cost_usd"] = float(max_cost_usd)
+    if max_tokens is not None:
+        cfg.setdefault("budget", {})["max_tokens"] = int(max_tokens)
+    if corpus:
+        cfg["content"] = {"backend": "corpus", "corpus_path": corpus}
+    if low_memory is not None:
+        cfg.setdefault("run", {})["low_memory"] = bool(low_memory)
+    if resume is not None:
+        cfg.setdefault("run", {})["resume"] = bool(resume)
     return run_pipeline(topic, int(weeks), int(lessons_per_week), int(min_resources), license_allowlist, cfg,
-                        progress_cb=progress_cb)
\ No newline at end of file
+                        progress_cb=progress_cb, out_dir=out_dir)
+
+def run_many(topics_path, out_root="courses", workers=4, weeks=4, lessons_per_week=2, min_resources=2,
+             license_allowlist="CC-BY,CC-BY-SA,CC0,Public Domain", on_done=None):
+    cfg = load_config()
+    return run_batch(topics_path, cfg, out_root=out_root, workers=int(workers), weeks=int(weeks),
+                     lessons_per_week=int(lessons_per_week), min_resources=int(min_resources),
+                     license_allowlist=license_allowlist, on_done=on_done)
@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+# CrewAI's built-in delegation tools (names as the manager sees them)
+_DELEGATION_TOOLS = ("delegate work to coworker", "ask question to coworker")
+
+
+class CrewLimitExceeded(RuntimeError):
+    """Raised from a step callback to stop a crew that hit its delegation cap or deadline."""
+
+
+class CrewLimits:
+    """
+    Bounds one hierarchical kickoff: `max_loops_per_stage` caps each worker's
+    reasoning iterations per task (CrewAI forces a final answer at the cap),
+    `max_delegations_per_stage` caps the manager's delegate/ask round trips per
+    task, and `deadline_seconds` bounds the whole crew phase. Every agent step is
+    one LLM call, so the per-agent step counts are the crew's LLM call counts.
+
+    The deadline is best-effort: it is checked between agent steps (and passed to
+    CrewAI as max_execution_time), so an LLM call already running finishes first,
+    and CrewAI waits for a timed-out task's worker thread before returning.
+    Attached agents get max_retry_limit=0, so an abort is not retried.
+    """
+
+    def __init__(self, max_loops_per_stage: int = 2, max_delegations_per_stage: int = 3,
+                 deadline_seconds: Optional[float] = 600.0):
+        self.max_loops_per_stage = max(1, int(max_loops_per_stage))
+        self.max_delegations_per_stage = max(1, int(max_delegations_per_stage))
+        self.deadline_seconds = float(deadline_seconds) if deadline_seconds else None
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self._stages: List[str] = []
+        self._stage = 0
+        self._calls: Dict[str, int] = {}
+        self._delegations: Dict[str, int] = {}
+        self.aborted: Optional[str] = None
+        self._saved: List[tuple] = []
+
+    @classmethod
+    def from_cfg(cls, cfg: Optional[Dict]) -> "CrewLimits":
+        r = (cfg or {}).get("run") or {}
+        return cls(
+            max_loops_per_stage=r.get("max_loops_per_stage", 2),
+            max_delegations_per_stage=r.get("max_delegations_per_stage", 3),
+            deadline_seconds=r.get("crew_deadline_seconds", 600),
+        )
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline_seconds is None:
+            return None
+        return self.deadline_seconds - (time.monotonic() - self._t0)
+
+    def _stage_name(self) -> str:
+        return self._stages[self._stage] if self._stage < len(self._stages) else f"stage_{self._stage}"
+
+    def _abort(self, reason: str):
+        self.aborted = self.aborted or reason
+        raise CrewLimitExceeded(reason)
+
+    def _on_step(self, role: str, step):
+        with self._lock:
+            self._calls[role] = self._calls.get(role, 0) + 1
+            tool = str(getattr(step, "tool", "") or "").strip().lower()
+            stage = self._stage_name()
+            if tool in _DELEGATION_TOOLS:
+                n = self._delegations[stage] = self._delegations.get(stage, 0) + 1
+                if n > self.max_delegations_per_stage:
+                    self._abort(f"delegation cap ({self.max_delegations_per_stage}) exceeded in {stage}")
+        left = self.remaining()
+        if left is not None and left <= 0:
+            self._abort(f"crew deadline ({self.deadline_seconds:g}s) exceeded in {stage}")
+
+    def _on_task_done(self, _output):
+        with self._lock:
+            self._stage += 1
+
+    def attach(self, manager, workers: List, tasks: List, stage_names: List[str]):
+        """Apply caps and callbacks to (pooled) agents for one kickoff; `detach` restores them."""
+        self._t0 = time.monotonic()
+        self._stages = list(stage_names)
+        left = self.remaining()
+        for agent, max_iter in [(manager, self.max_loops_per_stage * (self.max_delegations_per_stage + 1))] + \
+                [(a, self.max_loops_per_stage) for a in workers]:
+            role = getattr(agent, "role", "agent")
+            self._saved.append((agent, agent.max_iter, agent.step_callback, agent.max_execution_time,
+                                agent.max_retry_limit))
+            agent.max_iter = max_iter
+            # CrewAI retries a failed task; a limit abort must not cost another attempt
+            agent.max_retry_limit = 0
+            agent.step_callback = lambda step, _role=role: self._on_step(_role, step)
+            if left is not None:
+                agent.max_execution_time = max(1, int(left))
+        for task in tasks:
+            task.callback = self._on_task_done
+
+    def detach(self):
+        for agent, max_iter, step_cb, max_exec, max_retry in self._saved:
+            agent.max_iter = max_iter
+            agent.step_callback = step_cb
+            agent.max_execution_time = max_exec
+            agent.max_retry_limit = max_retry
+        self._saved = []
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                "seconds": round(time.monotonic() - self._t0, 3),
+                "stages_completed": min(self._stage, len(self._stages)),
+                "stages": len(self._stages),
+                "llm_calls": dict(self._calls),
+                "llm_calls_total": sum(self._calls.values()),
+                "delegations": dict(self._delegations),
+                "limits": {
+                    "max_loops_per_stage": self.max_loops_per_stage,
+                    "max_delegations_per_stage": self.max_delegations_per_stage,
+                    "deadline_seconds": self.deadline_seconds,
+                },
+                "aborted": self.aborted,
+            }
@@ -1,8 +1,14 @@
-import os, json, threading, queue, time
+import os, json, threading, queue, time, uuid
 import typer
 import gradio as gr
 from dotenv import load_dotenv
-from .crew import run
+from .crew import run, run_many, load_config
+from .batch import _slug
+from .pool import shutdown, agent_pool
+from .tools.metrics import REGISTRY, BuildSlots, counter_lines, serve_metrics
+from .tools.manifest_tools import diff_manifests
+from .tools.corpus_tools import CorpusIndex
+from .tools.quiz_bank import QuizBank
 
 load_dotenv()
 app = typer.Typer(add_completion=False)
@@ -33,27 +39,149 @@ def build(
     lessons_per_week: int = typer.Option(2),
     min_resources: int = typer.Option(2),
     license_allowlist: str = typer.Option("CC-BY,CC-BY-SA,CC0,Public Domain"),
+    low_memory: bool = typer.Option(False, "--low-memory", help="Bounded-memory mode for very large courses."),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted build from its checkpoint."),
+    corpus: str = typer.Option("", help="Serve content from a local corpus index (see ingest-corpus) instead of live Wikipedia."),
+    max_cost_usd: float = typer.Option(0.0, help="Stop calling the LLM once this build has spent this much (0 = no cap)."),
+    max_tokens: int = typer.Option(0, help="Stop calling the LLM after this many tokens (0 = no cap)."),
+    formats: str = typer.Option("", help="Output formats, e.g. 'html' or 'pdf,html' (default from settings: pdf)."),
+    incremental: bool = typer.Option(False, "--incremental", help="Keep rendered pages and re-render only changed ones."),
+    compact: bool = typer.Option(False, "--compact", help="Write JSON without indentation."),
+    sidecars: str = typer.Option("", help="Also write compressed copies of JSON/Markdown: 'gzip', 'zstd' or both."),
 ):
-    res = run(topic, weeks, lessons_per_week, min_resources, license_allowlist)
+    res = run(topic, weeks, lessons_per_week, min_resources, license_allowlist,
+              low_memory=low_memory or None, resume=resume or None, corpus=corpus or None,
+              max_cost_usd=max_cost_usd or None, max_tokens=max_tokens or None,
+              formats=formats or None, incremental=incremental or None,
+              compact=compact or None, sidecars=sidecars or None)
     typer.echo(json.dumps(res, indent=2))
 
 
+@app.command("build-batch")
+def build_batch(
+    topics: str = typer.Option(..., help="YAML, CSV or JSONL list of topics (per-topic weeks/lessons/licenses optional)."),
+    out: str = typer.Option("courses", help="Root directory; one subdirectory per course."),
+    workers: int = typer.Option(4, help="Courses built concurrently."),
+    weeks: int = typer.Option(4),
+    lessons_per_week: int = typer.Option(2),
+    min_resources: int = typer.Option(2),
+    license_allowlist: str = typer.Option("CC-BY,CC-BY-SA,CC0,Public Domain"),
+):
+    def _done(rec):
+        mark = "ok" if rec["status"] == "ok" else f"FAILED ({rec.get('error', '')})"
+        typer.echo(f"[{rec['seconds']:>8.1f}s] {rec['topic']} -> {rec['out_dir']}: {mark}")
+
+    report = run_many(topics, out_root=out, workers=workers, weeks=weeks, lessons_per_week=lessons_per_week,
+                      min_resources=min_resources, license_allowlist=license_allowlist, on_done=_done)
+    typer.echo(f"{report['ok']}/{report['total']} courses built in {report['seconds']}s; "
+               f"report: {out}/batch_report.json")
+    if report["failed"]:
+        raise typer.Exit(code=1)
+
+
+@app.command("ingest-corpus")
+def ingest_corpus(
+    dump: str = typer.Argument(..., help="Wikipedia dump: .xml/.xml.bz2 (pages-articles) or .jsonl[.bz2|.gz] extract."),
+    index: str = typer.Option("data/wiki_corpus.sqlite", help="SQLite FTS5 index to create or extend."),
+    batch_size: int = typer.Option(500, help="Pages per insert transaction."),
+):
+    """Stream a Wikipedia dump into a local full-text index for offline builds."""
+    idx = CorpusIndex(index)
+    t0 = time.time()
+    def _progress(n):
+        typer.echo(f"\r{n} pages", nl=False)
+    n = idx.ingest(dump, batch_size=batch_size, progress=_progress)
+    typer.echo(f"\nIngested {n} pages into {index} ({idx.count()} total) in {time.time() - t0:.1f}s")
+
+
+@app.command()
+def diff(
+    old: str = typer.Argument(..., help="Previous course_manifest.json"),
+    new: str = typer.Argument("course/course_manifest.json", help="Current course_manifest.json"),
+):
+    """List artifacts added, changed or removed between two manifests (by content hash)."""
+    with open(old, encoding="utf-8") as f:
+        a = json.load(f)
+    with open(new, encoding="utf-8") as f:
+        b = json.load(f)
+    typer.echo(json.dumps(diff_manifests(a, b), indent=2))
+
+
+def _csv_list(value: str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+@app.command("quiz-bank")
+def quiz_bank(
+    bank: str = typer.Argument("course/quiz_bank.sqlite", help="Course quiz bank (written next to course_manifest.json)."),
+    lesson: str = typer.Option("", help="Lesson unit(s) as week_lesson, e.g. '1_2' or '1_1,2_1'."),
+    week: str = typer.Option("", help="Week number(s), e.g. '1' or '1,2'."),
+    bloom: str = typer.Option("", help="Bloom level(s), e.g. 'apply,analyze'."),
+    difficulty: str = typer.Option("", help="Difficulty level(s): easy, medium, hard."),
+    item_type: str = typer.Option("", "--type", help="Item type(s): mcq, short."),
+    limit: int = typer.Option(0, help="Return at most this many items (0 = all)."),
+    out: str = typer.Option("", help="Export matches to a .jsonl, .json or .csv file instead of printing them."),
+    summary: bool = typer.Option(False, "--summary", help="Print item counts by type, bloom level and difficulty."),
+):
+    """Query the course quiz bank or bulk-export selected items."""
+    if not os.path.exists(bank):
+        typer.echo(f"No quiz bank at {bank}; build a course first.", err=True)
+        raise typer.Exit(1)
+    qb = QuizBank(bank)
+    try:
+        if summary:
+            typer.echo(json.dumps(qb.summary(), indent=2))
+            return
+        filters = {"unit": _csv_list(lesson), "week": [int(w) for w in _csv_list(week)], "bloom": _csv_list(bloom),
+                   "difficulty": _csv_list(difficulty), "type": _csv_list(item_type)}
+        if out:
+            n = qb.export(out, limit=limit or None, **filters)
+            typer.echo(f"Exported {n} items to {out}")
+        else:
+            for it in qb.query(limit=limit or None, **filters):
+                typer.echo(json.dumps(it, ensure_ascii=False))
+    finally:
+        qb.close()
+
+
 def _gather_files(man):
     lessons = [p.replace("\\", "/") for p in man.get("lesson_pdfs", []) or man.get("lessons", [])]
     quizzes = [p.replace("\\", "/") for p in man.get("quiz_pdfs", []) or man.get("quizzes", [])]
+    out = man.get("out_dir", "course")
     key = []
     # prefer PDFs if present
     if man.get("syllabus_pdf"): key.append(man["syllabus_pdf"])
-    else: key.append(man.get("syllabus_md", "course/syllabus.md"))
+    else: key.append(man.get("syllabus_md", f"{out}/syllabus.md"))
     if man.get("reading_list_pdf"): key.append(man["reading_list_pdf"])
-    else: key.append(man.get("reading_list", "course/reading_list.md"))
-    key += ["course/course_manifest.json", "course/qa_report.json"]
+    else: key.append(man.get("reading_list", f"{out}/reading_list.md"))
+    if man.get("site_index"): key.append(man["site_index"])
+    key += [f"{out}/course_manifest.json", f"{out}/qa_report.json"]
     key = [p for p in key if os.path.exists(p)]
     return key, lessons, quizzes
 
 
+@REGISTRY.collector
+def _pool_metrics():
+    st = {"agents": agent_pool().stats()}
+    return (counter_lines("c2c_agent_sets_idle", "Idle pooled agent sets.", "pool", st, "idle", "gauge")
+            + counter_lines("c2c_agent_sets_created_total", "Agent sets built.", "pool", st, "created")
+            + counter_lines("c2c_agent_sets_reused_total", "Builds served by a pooled agent set.", "pool", st, "reused"))
+
+
 @app.command()
-def ui():
+def ui(
+    metrics_port: int = typer.Option(-1, help="Serve Prometheus metrics on this port (0 = off; default from settings)."),
+):
+    ui_cfg = load_config().get("ui") or {}
+    port = metrics_port if metrics_port >= 0 else int(ui_cfg.get("metrics_port", 9464) or 0)
+    metrics_server = serve_metrics(port, host=ui_cfg.get("metrics_host", "127.0.0.1")) if port else None
+    if metrics_server:
+        print(f"Metrics: http://{metrics_server.server_address[0]}:{metrics_server.server_address[1]}/metrics")
+    # builds beyond this wait here (visible as c2c_builds_queued) instead of inside Gradio's queue
+    slots = BuildSlots(ui_cfg.get("max_concurrent_builds", 2))
+    # builds run concurrently, so each one writes its own course tree under this root
+    out_root = (ui_cfg.get("out_root") or "course").rstrip("/")
+
     def _build(topic, weeks, lessons_per_week, min_resources, cc_by, cc_by_sa, cc0, pub_domain):
         allow_list = []
         if cc_by: allow_list.append("CC-BY")
@@ -69,10 +197,14 @@ def ui():
             q.put(("progress", msg, float(pct)))
 
         result_holder = {"res": None, "done": False, "err": None}
+        out_dir = f"{out_root}/{_slug(topic or '')}-{uuid.uuid4().hex[:8]}"
 
         def worker():
             try:
-                result_holder["res"] = run(topic, int(weeks), int(lessons_per_week), int(min_resources), allow, progress_cb=progress_cb)
+                q.put(("progress", "Queued — waiting for a build slot", 0.0))
+                with slots.slot():
+                    result_holder["res"] = run(topic, int(weeks), int(lessons_per_week), int(min_resources), allow,
+                                                  progress_cb=progress_cb, out_dir=out_dir)
             except Exception as e:
                 result_holder["err"] = str(e)
             finally:
@@ -152,10 +284,16 @@ def ui():
         build_btn.click(
             _build,
             [topic, weeks, lessons, minres, cc_by, cc_by_sa, cc0, pub_domain],
-            [prog, status_md, key_files, lesson_files, quiz_files]
+            [prog, status_md, key_files, lesson_files, quiz_files],
+            concurrency_limit=None,
         )
 
-    demo.queue().launch(show_api=False, server_name="127.0.0.1", server_port=7860)
+    try:
+        demo.queue().launch(show_api=False, server_name="127.0.0.1", server_port=7860)
+    finally:
+        if metrics_server:
+            metrics_server.shutdown()
+        shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_STOP = object()
+
+
+class Stage:
+    """
+    One pipeline stage: a bounded input queue drained by `workers` threads running
+    `fn(item, emit)`, or `fn(items, emit)` on micro-batches when batch_size > 1.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any, Callable[[str, Any], None]], None],
+                 workers: int = 1, maxsize: int = 2, batch_size: int = 1, batch_wait: float = 0.05):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.batch_wait = max(0.0, float(batch_wait))
+        self.q: "queue.Queue" = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self._depth_sum = 0
+        self._depth_n = 0
+        self._threads: List[threading.Thread] = []
+
+
+class StagedPipeline:
+    """
+    Stages connected by bounded queues. A worker hands results downstream with
+    `emit(stage_name, item)`, which blocks while that stage's queue is full, so a
+    slow stage (e.g. LLM quizzes) holds back the stages feeding it instead of
+    letting fetched articles pile up in memory.
+
+    Stages must be added in topological order (emits only go to later stages);
+    `run` then shuts them down front to back once each one's upstream is done.
+    The first worker exception stops intake, the remaining items are drained,
+    and the exception is re-raised from `run`.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        self._order: List[str] = []
+        self._error: Optional[BaseException] = None
+        self._failed = threading.Event()
+        self._lock = threading.Lock()
+        self._t0: Optional[float] = None
+        self._seconds = 0.0
+
+    def add_stage(self, name: str, fn: Callable[[Any, Callable[[str, Any], None]], None],
+                  workers: int = 1, maxsize: int = 2, batch_size: int = 1,
+                  batch_wait: float = 0.05) -> "StagedPipeline":
+        self.stages[name] = Stage(name, fn, workers, maxsize, batch_size, batch_wait)
+        self._order.append(name)
+        return self
+
+    def depths(self) -> Dict[str, int]:
+        """Current queue depth per stage (approximate; for progress display and sampling)."""
+        return {n: self.stages[n].q.qsize() for n in self._order}
+
+    def _sample(self):
+        for s in self.stages.values():
+            d = s.q.qsize()
+            with self._lock:
+                s.max_depth = max(s.max_depth, d)
+                s._depth_sum += d
+                s._depth_n += 1
+
+    def _emit(self, name: str, item: Any):
+        if self._failed.is_set():
+            return
+        self.stages[name].q.put(item)
+        self._sample()
+
+    def _take(self, stage: Stage):
+        """Next item, or for batching stages whatever arrives within batch_wait (up to batch_size)."""
+        first = stage.q.get()
+        if first is _STOP or stage.batch_size == 1:
+            return first, first is _STOP
+        batch = [first]
+        t_end = time.monotonic() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            try:
+                item = stage.q.get(timeout=max(0.0, t_end - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True  # finish this batch, then exit on the consumed stop
+            batch.append(item)
+        return batch, False
+
+    def _worker(self, stage: Stage):
+        while True:
+            work, stop = self._take(stage)
+            if work is _STOP:
+                return
+            if not self._failed.is_set():  # otherwise drain so upstream puts never block forever
+                t0 = time.perf_counter()
+                try:
+                    stage.fn(work, self._emit)
+                except BaseException as e:
+                    with self._lock:
+                        if self._error is None:
+                            self._error = e
+                    self._failed.set()
+                finally:
+                    with self._lock:
+                        stage.processed += len(work) if stage.batch_size > 1 else 1
+                        stage.busy_seconds += time.perf_counter() - t0
+            if stop:
+                return
+
+    def run(self, items: Iterable[Any]):
+        """Feed `items` into the first stage and block until every stage has drained."""
+        self._t0 = time.perf_counter()
+        for name in self._order:
+            stage = self.stages[name]
+            for i in range(stage.workers):
+                t = threading.Thread(target=self._worker, args=(stage,), name=f"{self.name}-{name}-{i}", daemon=True)
+                t.start()
+                stage._threads.append(t)
+        try:
+            for item in items:
+                if self._failed.is_set():
+                    break
+                self._emit(self._order[0], item)
+        finally:
+            for name in self._order:
+                stage = self.stages[name]
+                for _ in stage._threads:
+                    stage.q.put(_STOP)
+                for t in stage._threads:
+                    t.join()
+            self._seconds = time.perf_counter() - self._t0
+        if self._error is not None:
+            raise self._error
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "seconds": round(self._seconds, 3),
+                "stages": {
+                    n: {
+                        "workers": s.workers,
+                        "batch_size": s.batch_size,
+                        "queue_size": s.q.maxsize,
+                        "processed": s.processed,
+                        "busy_seconds": round(s.busy_seconds, 3),
+                        "max_depth": s.max_depth,
+                        "mean_depth": round(s._depth_sum / s._depth_n, 2) if s._depth_n else 0.0,
+                    }
+                    for n, s in ((n, self.stages[n]) for n in self._order)
+                },
+            }
@@ -0,0 +1,104 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+from .agents import supervisor, curator, designer, note_maker, assessor, assembler, auditor, topic_refiner
+from .tools.llm_tools import close_clients
+
+_FACTORIES: Dict[str, Callable] = {
+    "topic_refiner": topic_refiner,
+    "supervisor": supervisor,
+    "curator": curator,
+    "designer": designer,
+    "note_maker": note_maker,
+    "assessor": assessor,
+    "assembler": assembler,
+    "auditor": auditor,
+}
+
+
+class AgentPool:
+    """
+    Keeps fully-built agent sets alive between builds.
+    A lease hands one set to exactly one build at a time: CrewAI agents carry
+    per-run executor state, so a set is never shared by two concurrent crews.
+    """
+
+    def __init__(self, max_idle: int = 4):
+        self.max_idle = max(0, int(max_idle))
+        self._lock = threading.Lock()
+        self._idle: List[Dict[str, object]] = []
+        self._leased = 0
+        self._created = 0
+        self._reused = 0
+        self._closed = False
+
+    def _new_set(self) -> Dict[str, object]:
+        return {name: make() for name, make in _FACTORIES.items()}
+
+    @contextmanager
+    def lease(self) -> Iterator[Dict[str, object]]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("agent pool is shut down")
+            agents = self._idle.pop() if self._idle else None
+            self._leased += 1
+            if agents is not None:
+                self._reused += 1
+        if agents is None:
+            try:
+                agents = self._new_set()
+            except Exception:
+                with self._lock:
+                    self._leased -= 1
+                raise
+            with self._lock:
+                self._created += 1
+        try:
+            yield agents
+        finally:
+            with self._lock:
+                self._leased -= 1
+                if not self._closed and len(self._idle) < self.max_idle:
+                    self._idle.append(agents)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "leased": self._leased,
+                "created": self._created,
+                "reused": self._reused,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            self._idle.clear()
+
+
+_POOL: AgentPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def agent_pool(max_idle: int = 4) -> AgentPool:
+    """Process-wide agent pool; created on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL._closed:
+            _POOL = AgentPool(max_idle=max_idle)
+        return _POOL
+
+
+def shutdown():
+    """Drop pooled agents and close pooled LLM HTTP clients. Safe to call twice."""
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown()
+    close_clients()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,107 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .tools.search_tools import SearchTools
+
+
+class SpeculativeFetch:
+    """
+    Warms the shared article cache for a build's curation before its topic is final.
+
+    `start(query)` searches the raw topic while the topic refiner runs and
+    prefetches the pages and lead summaries of the first `total` hits, the ones
+    that become lesson sources (search hits are lazy, so no other article is
+    downloaded).
+    `reconcile(query)` switches to the refined topic: titles both searches return
+    are reused (already cached or in flight), queued prefetches for titles the
+    refined search dropped are cancelled, and new titles are queued. Curation and
+    the lesson fetch stage then read the same cache, so they find the pages ready.
+    """
+
+    def __init__(self, st: SearchTools, total: int, max_results: int, workers: int = 4, sentences: int = 6):
+        self.st = st
+        self.total = max(1, int(total))
+        self.max_results = int(max_results)
+        self.sentences = sentences
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._gen = 0
+        self._query: Optional[str] = None
+        self._futures: Dict[str, Future] = {}
+        self._closed = False
+        self._t0 = time.perf_counter()
+        self._seconds: Optional[float] = None
+        self._counts = {"queued": 0, "fetched": 0, "reused": 0, "cancelled": 0, "failed": 0}
+        self._queries: List[str] = []
+
+    def start(self, query: str) -> "SpeculativeFetch":
+        self._switch(query)
+        return self
+
+    def reconcile(self, query: str):
+        """The refined topic is known: keep overlapping work, cancel the rest, queue what is missing."""
+        if query != self._query:
+            self._switch(query)
+
+    def _switch(self, query: str):
+        with self._lock:
+            if self._closed:
+                return
+            self._gen += 1
+            self._query = query
+            self._queries.append(query)
+            gen = self._gen
+        # the search runs beside the pool so a reconcile is not queued behind stale prefetches
+        threading.Thread(target=self._expand, args=(query, gen), name="prefetch-search", daemon=True).start()
+
+    def _expand(self, query: str, gen: int):
+        hits = self.st.wiki_search(query, self.max_results)  # lazy: nothing downloaded yet
+        titles = [h["title"] for h in hits[: self.total]]
+        with self._lock:
+            if gen != self._gen or self._closed:
+                return  # superseded by a later reconcile while searching
+            wanted = set(titles)
+            for title, fut in list(self._futures.items()):
+                if title not in wanted and fut.cancel():
+                    self._counts["cancelled"] += 1
+                    del self._futures[title]
+            for title in titles:
+                if title in self._futures:
+                    self._counts["reused"] += 1
+                    continue
+                self._futures[title] = self._pool.submit(self._prefetch, title)
+                self._counts["queued"] += 1
+
+    def _prefetch(self, title: str):
+        try:
+            # lessons fetch by the search title (hits are lazy), so prefetch under the same keys
+            self.st.wiki_page(title)
+            self.st.wiki_summary(title, sentences=self.sentences)
+        except Exception:
+            with self._lock:
+                self._counts["failed"] += 1
+            return
+        with self._lock:
+            self._counts["fetched"] += 1
+
+    def close(self):
+        """Cancel prefetches that have not started; running ones finish into the cache. Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for fut in self._futures.values():
+                if fut.cancel():
+                    self._counts["cancelled"] += 1
+            self._seconds = time.perf_counter() - self._t0
+        self._pool.shutdown(wait=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            out = dict(self._counts)
+            out["queries"] = list(self._queries)
+            secs = self._seconds if self._seconds is not None else time.perf_counter() - self._t0
+            out["seconds"] = round(secs, 3)
+            return out
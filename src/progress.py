@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+from .tools.metrics import observe_stage
+
+# Seconds per unit used until a stage has measured history.
+_PRIOR_SECONDS: Dict[str, float] = {
+    "refine": 8.0,
+    "crew": 90.0,
+    "search": 3.0,
+    "syllabus": 1.5,
+    "lesson": 5.0,
+    "quiz": 12.0,
+    "reading_list": 1.0,
+    "qa": 0.2,
+    "manifest": 0.2,
+}
+_ALPHA = 0.3  # EWMA weight of the newest sample
+
+
+class TimingHistory:
+    """Per-stage seconds-per-unit (EWMA) persisted to a small JSON file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            self._data: Dict[str, Dict] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._data = {}
+
+    def mean(self, stage: str) -> float:
+        with self._lock:
+            rec = self._data.get(stage)
+            return float(rec["mean"]) if rec else _PRIOR_SECONDS.get(stage, 1.0)
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            rec = self._data.get(stage)
+            if rec is None:
+                self._data[stage] = {"mean": seconds, "n": 1, "max": seconds}
+            else:
+                rec["mean"] = (1 - _ALPHA) * rec["mean"] + _ALPHA * seconds
+                rec["n"] = rec.get("n", 0) + 1
+                rec["max"] = max(rec.get("max", seconds), seconds)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._data.items()}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._data, indent=2, sort_keys=True)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # history is advisory; never fail a build over it
+
+
+_HISTORIES: Dict[str, TimingHistory] = {}
+_HISTORIES_LOCK = threading.Lock()
+
+
+def timing_history(path: str = ".cache/timings.json") -> TimingHistory:
+    """One shared history per file so concurrent builds don't overwrite each other's samples."""
+    with _HISTORIES_LOCK:
+        h = _HISTORIES.get(path)
+        if h is None:
+            h = _HISTORIES[path] = TimingHistory(path)
+        return h
+
+
+def _fmt_eta(seconds: float) -> str:
+    seconds = int(round(max(0.0, seconds)))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressModel:
+    """
+    Turns stage/unit completions into a progress fraction weighted by the
+    expected cost of each stage (history mean x unit count) and an ETA.
+    The ETA scales remaining expected cost by how fast this build has run so
+    far relative to history, so a slow upstream shows up within a few units.
+    While a `stage()` runs, progress is re-emitted every `tick` seconds and
+    the running unit counts for its elapsed time, up to 90% of its expected
+    cost, so long single-unit phases (refine, crew) don't freeze the bar.
+    """
+
+    def __init__(self, progress_cb: Optional[Callable[[str, float], None]], units: Dict[str, int],
+                 history: Optional[TimingHistory] = None, tick: float = 1.0):
+        self.cb = progress_cb
+        self.tick = float(tick or 0.0)
+        self.history = history or timing_history()
+        self.units = {k: max(0, int(v)) for k, v in units.items()}
+        self.done_units: Dict[str, int] = {k: 0 for k in self.units}
+        self.spent: Dict[str, float] = {k: 0.0 for k in self.units}
+        self._mean = {k: self.history.mean(k) for k in self.units}
+        self._running: Dict[str, float] = {}  # stage -> start of its unit in progress
+        self._t0 = time.monotonic()
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def _expected_total(self) -> float:
+        return sum(self._mean[k] * n for k, n in self.units.items()) or 1.0
+
+    def _expected_done(self) -> float:
+        done = sum(self._mean[k] * min(self.done_units[k], self.units[k]) for k in self.units)
+        now = time.monotonic()
+        for k, t0 in self._running.items():
+            if self.done_units.get(k, 0) < self.units.get(k, 0):
+                done += min(now - t0, 0.9 * self._mean[k])
+        return done
+
+    def fraction(self) -> float:
+        with self._lock:
+            return min(1.0, self._expected_done() / self._expected_total())
+
+    def eta_seconds(self) -> Optional[float]:
+        with self._lock:
+            done = self._expected_done()
+            remaining = self._expected_total() - done
+            if done <= 0:
+                return remaining
+            pace = (time.monotonic() - self._t0) / done
+            return remaining * min(10.0, max(0.1, pace))
+
+    def emit(self, msg: str):
+        if not self.cb:
+            return
+        frac = self.fraction()
+        with self._lock:
+            frac = self._last = max(self._last, frac)
+        eta = self.eta_seconds()
+        suffix = f" (ETA {_fmt_eta(eta)})" if eta is not None and frac < 1.0 else ""
+        self.cb(f"{msg}{suffix}", frac)
+
+    def _ticker(self, msg: str, stop: threading.Event):
+        while not stop.wait(self.tick):
+            self.emit(msg)
+
+    @contextmanager
+    def stage(self, name: str, msg: str, record: bool = True) -> Iterator[None]:
+        """
+        Time one unit of `name`; emits `msg` on entry and every `tick` seconds until it
+        ends. The unit is counted on success; a stage that raises keeps its seconds in
+        `spent` but is neither counted nor recorded in history.
+        """
+        t0 = time.monotonic()
+        with self._lock:
+            self._running[name] = t0
+        stop = threading.Event()
+        ticker = None
+        try:
+            self.emit(msg)
+            if self.cb and self.tick > 0:
+                ticker = threading.Thread(target=self._ticker, args=(msg, stop), name=f"progress-{name}", daemon=True)
+                ticker.start()
+            yield
+        except BaseException:
+            with self._lock:
+                self.spent[name] = self.spent.get(name, 0.0) + time.monotonic() - t0
+            raise
+        else:
+            self.add(name, time.monotonic() - t0, record=record)
+        finally:
+            stop.set()
+            if ticker is not None:
+                ticker.join()
+            with self._lock:
+                self._running.pop(name, None)
+
+    def add(self, name: str, seconds: float, record: bool = True):
+        """Count one unit of `name` timed by the caller (e.g. work split across pipeline stages)."""
+        with self._lock:
+            self.done_units[name] = self.done_units.get(name, 0) + 1
+            self.spent[name] = self.spent.get(name, 0.0) + seconds
+        observe_stage(name, seconds)
+        if record:
+            self.history.record(name, seconds)
+
+    def skip(self, name: str, n: int = 1):
+        """Count units that needed no work (resumed from checkpoint) without recording a timing."""
+        with self._lock:
+            self.done_units[name] = self.done_units.get(name, 0) + n
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                "elapsed_seconds": round(time.monotonic() - self._t0, 3),
+                "expected_seconds": round(self._expected_total(), 1),
+                "stages": {
+                    k: {
+                        "units": self.units[k],
+                        "done": self.done_units[k],
+                        "seconds": round(self.spent[k], 3),
+                        "expected_per_unit": round(self._mean[k], 3),
+                    }
+                    for k in self.units
+                },
+            }
+
+    def finish(self, msg: str = "Done"):
+        self.history.save()
+        with self._lock:
+            self._last = 1.0
+        if self.cb:
+            self.cb(msg, 1.0)
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .tools.export_tools import ExportTools
+from .tools.html_tools import HtmlTools
+from .tools.metrics import cache_event
+
+FORMATS = ("pdf", "html")
+_RENDER_VERSION = 2  # bump when a renderer's output changes for the same source
+
+
+def parse_formats(value) -> tuple:
+    """'pdf,html' / ['html'] -> ('pdf', 'html') in canonical order; empty means PDF only."""
+    if isinstance(value, str):
+        value = value.split(",")
+    picked = {str(v).strip().lower() for v in (value or []) if str(v).strip()}
+    unknown = picked - set(FORMATS)
+    if unknown:
+        raise ValueError(f"unknown output format(s): {', '.join(sorted(unknown))} (use {', '.join(FORMATS)})")
+    return tuple(f for f in FORMATS if f in picked) or ("pdf",)
+
+
+class RenderIndex:
+    """
+    Source digest per rendered file (`<out>/.render_index.json`). An output whose
+    file still exists and whose source digest is unchanged is not rendered again.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            self._data: Dict[str, str] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._data = {}
+
+    @staticmethod
+    def digest(*parts) -> str:
+        raw = json.dumps([_RENDER_VERSION, *parts], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def fresh(self, out_path: str, digest: str) -> bool:
+        with self._lock:
+            return self._data.get(out_path) == digest and os.path.exists(out_path)
+
+    def mark(self, out_path: str, digest: str):
+        with self._lock:
+            self._data[out_path] = digest
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._data, indent=0, sort_keys=True)
+        try:
+            tmp = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # losing the index only costs a re-render next time
+
+
+class Renderer:
+    """
+    Writes each course page in the selected formats: PDF under `<out>/` and a
+    static site under `<out>/site/`. Pages are addressed by their path without
+    extension (e.g. "lessons/week_1/lesson_2"); unchanged sources are skipped.
+    """
+
+    def __init__(self, out: str = "course", formats: Iterable[str] = ("pdf",), xt: Optional[ExportTools] = None):
+        self.out = out
+        self.formats = parse_formats(list(formats))
+        self.pdf = "pdf" in self.formats
+        self.xt = xt or ExportTools()
+        self.ht = HtmlTools(f"{out}/site") if "html" in self.formats else None
+        self.index = RenderIndex(f"{out}/.render_index.json")
+        self.rendered = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._order: List[tuple] = []  # (rel, label) of lessons, for prev/next links
+
+    def _count(self, rendered: bool):
+        cache_event("render_pdf", not rendered)
+        with self._lock:
+            if rendered:
+                self.rendered += 1
+            else:
+                self.skipped += 1
+
+    def set_lesson_order(self, syllabus: Dict):
+        self._order = [(f"lessons/week_{w['week']}/lesson_{l['lesson']}.html", l["title"])
+                       for w in syllabus.get("weeks", []) for l in w.get("lessons", [])]
+
+    def _nav(self, rel_html: str):
+        for i, (rel, _) in enumerate(self._order):
+            if rel == rel_html:
+                prev = self._order[i - 1] if i > 0 else None
+                nxt = self._order[i + 1] if i + 1 < len(self._order) else None
+                return prev, nxt
+        return None, None
+
+    def markdown(self, md: str, rel: str, title: Optional[str] = None,
+                 page_title: Optional[str] = None) -> Dict[str, str]:
+        """Render Markdown to `<out>/<rel>.pdf` and/or `<out>/site/<rel>.html`; returns format -> path."""
+        paths: Dict[str, str] = {}
+        if self.pdf:
+            path = f"{self.out}/{rel}.pdf"
+            digest = RenderIndex.digest("md-pdf", title, md)
+            fresh = self.index.fresh(path, digest)
+            if not fresh:
+                self.xt.write_pdf_from_markdown(md, path, title=title)
+                self.index.mark(path, digest)
+            self._count(not fresh)
+            paths["pdf"] = path
+        if self.ht is not None:
+            rel_html = f"{rel}.html"
+            prev, nxt = self._nav(rel_html)
+            body = self.ht.markdown_to_html(md, title=title)
+            label = page_title or title or rel.rsplit("/", 1)[-1]
+            paths["html"] = self.ht.write_page(rel_html, label, body, prev=prev, next=nxt)
+        return paths
+
+    def quiz(self, quiz: Dict, rel: str, title: str) -> Dict[str, str]:
+        paths: Dict[str, str] = {}
+        if self.pdf:
+            path = f"{self.out}/{rel}.pdf"
+            digest = RenderIndex.digest("quiz-pdf", title, quiz)
+            fresh = self.index.fresh(path, digest)
+            if not fresh:
+                self.xt.quiz_json_to_pdf(quiz, path, title=title)
+                self.index.mark(path, digest)
+            self._count(not fresh)
+            paths["pdf"] = path
+        if self.ht is not None:
+            paths["html"] = self.ht.write_page(f"{rel}.html", title, self.ht.quiz_to_html(quiz, title=title))
+        return paths
+
+    def site(self, topic: str, syllabus: Dict, reading_list: bool = True) -> Optional[Dict[str, str]]:
+        """Stylesheet + index page; None when HTML output is off."""
+        if self.ht is None:
+            return None
+        extras = [("syllabus.html", "Syllabus")] + ([("reading_list.html", "Reading list")] if reading_list else [])
+        return {"style": self.ht.write_stylesheet(), "index": self.ht.write_index(topic, syllabus, extras)}
+
+    def close(self):
+        self.index.save()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"formats": list(self.formats), "pdf_rendered": self.rendered, "pdf_unchanged": self.skipped}
@@ -0,0 +1,230 @@
+import bz2
+import gzip
+import json
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+WIKI_URL = "https://en.wikipedia.org/wiki/"
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    title, content, content='pages', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+"""
+
+
+class CorpusPageError(LookupError):
+    pass
+
+
+# ---------- wikitext -> plain text (keeps "== Heading ==" lines for section lookup) ----------
+_RE_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_RE_REF = re.compile(r"<ref[^>]*/>|<ref[^>]*>.*?</ref>", re.S | re.I)
+_RE_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+_RE_TABLE = re.compile(r"\{\|[^{}]*?\|\}", re.S)
+_RE_FILE = re.compile(r"\[\[(?:File|Image|Category):[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]", re.I)
+_RE_LINK = re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]+)\]\]")
+_RE_EXTLINK = re.compile(r"\[https?://[^\s\]]+\s*([^\]]*)\]")
+_RE_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+_RE_HEADING = re.compile(r"^(={2,6})\s*(.*?)\s*\1\s*$", re.M)
+_RE_LIST = re.compile(r"^[*#:;]+\s*", re.M)
+
+
+def wikitext_to_text(wt: str) -> str:
+    t = _RE_COMMENT.sub("", wt or "")
+    t = _RE_REF.sub("", t)
+    for _ in range(8):  # nested templates/tables unwrap from the inside out
+        t, n1 = _RE_TEMPLATE.subn("", t)
+        t, n2 = _RE_TABLE.subn("", t)
+        if not (n1 or n2):
+            break
+    t = _RE_FILE.sub("", t)
+    t = _RE_LINK.sub(r"\1", t)
+    t = _RE_EXTLINK.sub(r"\1", t)
+    t = _RE_TAG.sub("", t)
+    t = t.replace("'''", "").replace("''", "")
+    t = _RE_HEADING.sub(lambda m: f"\n{m.group(1)} {m.group(2)} {m.group(1)}\n", t)
+    t = _RE_LIST.sub("", t)
+    t = re.sub(r"[ \t]{2,}", " ", t)
+    t = re.sub(r"\n{3,}", "\n\n", t)
+    return t.strip()
+
+
+def _open(path: Path):
+    name = path.name.lower()
+    if name.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return path.open("rb")
+
+
+def _iter_xml(path: Path) -> Iterator[Dict]:
+    """Stream <page> elements from a MediaWiki XML dump; each element is cleared after use."""
+    with _open(path) as f:
+        ns, root = "", None
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                    if elem.tag.startswith("{"):
+                        ns = elem.tag[: elem.tag.index("}") + 1]
+                continue
+            if elem.tag != f"{ns}page":
+                continue
+            title = elem.findtext(f"{ns}title") or ""
+            page_ns = elem.findtext(f"{ns}ns") or "0"
+            redirect = elem.find(f"{ns}redirect") is not None
+            text = elem.findtext(f"{ns}revision/{ns}text") or ""
+            # drop the parsed page and the root's reference to it: constant memory on multi-GB dumps
+            elem.clear()
+            root.clear()
+            if page_ns != "0" or redirect or not title or text.lower().startswith("#redirect"):
+                continue
+            yield {"title": title, "content": wikitext_to_text(text)}
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict]:
+    """Stream a JSONL extract (e.g. wikiextractor --json): {"title", "text"|"content", "url"?}."""
+    with _open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            title = str(rec.get("title") or "").strip()
+            content = rec.get("content") or rec.get("text") or ""
+            if title and content:
+                yield {"title": title, "content": str(content), "url": rec.get("url")}
+
+
+class CorpusPage:
+    """Offline stand-in for wikipedia.WikipediaPage (title, url, content, section)."""
+
+    def __init__(self, title: str, url: str, content: str):
+        self.title = title
+        self.url = url
+        self.content = content
+
+    def section(self, section_title: str) -> Optional[str]:
+        # same contract as wikipedia.WikipediaPage.section
+        marker = f"== {section_title} =="
+        try:
+            index = self.content.index(marker) + len(marker)
+        except ValueError:
+            return None
+        try:
+            next_index = self.content.index("==", index)
+        except ValueError:
+            next_index = len(self.content)
+        return self.content[index:next_index].lstrip("=").strip()
+
+
+class CorpusIndex:
+    """
+    Local full-text Wikipedia index (SQLite FTS5). Read connections are per thread,
+    so one instance can serve every concurrent build.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA recursive_triggers=ON")  # REPLACE must fire the fts delete trigger
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---------- import ----------
+    def ingest(self, dump_path: str, batch_size: int = 500,
+               progress: Optional[Callable[[int], None]] = None) -> int:
+        """Stream a dump (.xml[.bz2|.gz] or .jsonl[.bz2|.gz]) into the index; memory stays O(batch_size)."""
+        p = Path(dump_path)
+        name = p.name.lower()
+        rows = _iter_xml(p) if ".xml" in name else _iter_jsonl(p)
+        conn = self._conn()
+        conn.execute("PRAGMA synchronous=OFF")
+        n, batch = 0, []
+        for rec in rows:
+            url = rec.get("url") or WIKI_URL + rec["title"].replace(" ", "_")
+            batch.append((rec["title"], url, rec["content"]))
+            if len(batch) >= batch_size:
+                n += self._insert(conn, batch)
+                batch = []
+                if progress:
+                    progress(n)
+        if batch:
+            n += self._insert(conn, batch)
+        conn.execute("INSERT INTO pages_fts(pages_fts) VALUES ('optimize')")
+        conn.commit()
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if progress:
+            progress(n)
+        return n
+
+    def _insert(self, conn: sqlite3.Connection, batch: List[tuple]) -> int:
+        with conn:
+            # REPLACE = delete + insert, so the fts delete trigger keeps the index in sync
+            conn.executemany("INSERT OR REPLACE INTO pages(title, url, content) VALUES (?, ?, ?)", batch)
+        return len(batch)
+
+    # ---------- lookups (same shapes as the wikipedia package) ----------
+    def search(self, query: str, results: int = 10) -> List[str]:
+        terms = re.findall(r"\w+", query or "")
+        if not terms:
+            return []
+        conn = self._conn()
+        sql = ("SELECT p.title FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid "
+               "WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts, 10.0, 1.0) LIMIT ?")
+        quoted = [f'"{t}"' for t in terms]
+        hits = [r[0] for r in conn.execute(sql, (" AND ".join(quoted), results))]
+        if len(hits) < results and len(terms) > 1:
+            for (title,) in conn.execute(sql, (" OR ".join(quoted), results)):
+                if title not in hits:
+                    hits.append(title)
+        return hits[:results]
+
+    def page(self, title: str) -> CorpusPage:
+        row = self._conn().execute("SELECT title, url, content FROM pages WHERE title = ?", (title,)).fetchone()
+        if row is None:
+            row = self._conn().execute(
+                "SELECT title, url, content FROM pages WHERE title = ? COLLATE NOCASE", (title,)
+            ).fetchone()
+        if row is None:
+            raise CorpusPageError(f"page not in corpus: {title}")
+        return CorpusPage(*row)
+
+    def summary(self, title: str, sentences: int = 6) -> str:
+        content = self.page(title).content
+        lead = content.split("\n==", 1)[0]
+        sents = [s.strip() for s in _SENT_SPLIT.split(lead.replace("\n", " ")) if s.strip()]
+        return " ".join(sents[:sentences])
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
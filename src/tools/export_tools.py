@@ -1,5 +1,8 @@
 from pathlib import Path
+import gzip
 import json
+import threading
+from typing import Dict, Iterable
 from xml.sax.saxutils import escape
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.units import inch
@@ -12,16 +15,83 @@ from reportlab.platypus import (
 from reportlab.lib import colors
 import re
 
+# codec -> file suffix of the compressed copy written next to a JSON/Markdown artifact
+SIDECARS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def parse_sidecars(value) -> tuple:
+    """'gzip,zstd' / ['gzip'] -> ('gzip', 'zstd'); empty means no sidecars. zstd needs `zstandard`."""
+    if isinstance(value, str):
+        value = value.split(",")
+    picked = {str(v).strip().lower() for v in (value or []) if str(v).strip()}
+    unknown = picked - set(SIDECARS)
+    if unknown:
+        raise ValueError(f"unknown sidecar codec(s): {', '.join(sorted(unknown))} (use {', '.join(SIDECARS)})")
+    if "zstd" in picked:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise ValueError("zstd sidecars need the 'zstandard' package (pip install zstandard)") from None
+    return tuple(c for c in SIDECARS if c in picked)
+
+
+def sidecar_paths(path: str, codecs: Iterable[str]) -> Dict[str, str]:
+    return {c: f"{path}{SIDECARS[c]}" for c in codecs}
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)  # mtime=0: same input, same bytes
+    import zstandard
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+
+_STYLES = None
+_STYLES_LOCK = threading.Lock()
+
+
+def _styles():
+    """One stylesheet for every PDF (read-only once built) instead of a fresh one per document."""
+    global _STYLES
+    with _STYLES_LOCK:
+        if _STYLES is None:
+            s = getSampleStyleSheet()
+            s["Heading1"].spaceAfter = 8
+            s["Heading2"].spaceAfter = 6
+            s["Heading3"].spaceAfter = 4
+            s["BodyText"].spaceAfter = 4
+            _STYLES = s
+        return _STYLES
+
+
 class ExportTools:
-    def write_text(self, path: str, content: str):
+    """
+    File writers for course artifacts. compact=True writes JSON without
+    whitespace; `sidecars` (gzip/zstd) adds a compressed copy next to every JSON
+    and Markdown file. PDFs always use compressed page streams and are
+    byte-for-byte reproducible, so manifest hashes only change with content.
+    """
+
+    def __init__(self, compact: bool = False, sidecars: Iterable[str] = ()):
+        self.compact = bool(compact)
+        self.sidecars = parse_sidecars(sidecars)
+
+    def _write(self, path: str, data: bytes):
         p = Path(path)
         p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(content, encoding="utf-8")
+        p.write_bytes(data)
+        for codec, side in sidecar_paths(path, self.sidecars).items():
+            Path(side).write_bytes(_compress(codec, data))
+
+    def write_text(self, path: str, content: str):
+        self._write(path, content.encode("utf-8"))
 
     def write_json(self, path: str, obj):
-        p = Path(path)
-        p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
+        if self.compact:
+            text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        else:
+            text = json.dumps(obj, indent=2, ensure_ascii=False)
+        self._write(path, text.encode("utf-8"))
 
     # ---------- helpers ----------
     def _para(self, txt: str, style):
@@ -39,16 +109,15 @@ class ExportTools:
         out = Path(out_path)
         out.parent.mkdir(parents=True, exist_ok=True)
 
-        styles = getSampleStyleSheet()
-        h1 = styles["Heading1"]; h1.spaceAfter = 8
-        h2 = styles["Heading2"]; h2.spaceAfter = 6
-        h3 = styles["Heading3"]; h3.spaceAfter = 4
-        body = styles["BodyText"]; body.spaceAfter = 4
+        styles = _styles()
+        h1, h2, h3, body = styles["Heading1"], styles["Heading2"], styles["Heading3"], styles["BodyText"]
 
         doc = SimpleDocTemplate(
             str(out),
             pagesize=LETTER,
             leftMargin=54, rightMargin=54, topMargin=54, bottomMargin=54,
+            pageCompression=1,  # deflate page content streams
+            invariant=1,  # no timestamp or random /ID: same source, same bytes and sha256
         )
         story = []
 
@@ -129,15 +198,15 @@ class ExportTools:
         out = Path(out_path)
         out.parent.mkdir(parents=True, exist_ok=True)
 
-        styles = getSampleStyleSheet()
-        h2 = styles["Heading2"]; h2.spaceAfter = 6
-        h3 = styles["Heading3"]; h3.spaceAfter = 4
-        body = styles["BodyText"]; body.spaceAfter = 4
+        styles = _styles()
+        h2, h3, body = styles["Heading2"], styles["Heading3"], styles["BodyText"]
 
         doc = SimpleDocTemplate(
             str(out),
             pagesize=LETTER,
             leftMargin=54, rightMargin=54, topMargin=54, bottomMargin=54,
+            pageCompression=1,  # deflate page content streams
+            invariant=1,  # no timestamp or random /ID: same source, same bytes and sha256
         )
         story = []
 
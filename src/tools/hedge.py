@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+# Defaults per upstream; overridable through the `deadlines` block of settings.yaml.
+_DEFAULTS: Dict[str, Dict] = {
+    "wikipedia": {"deadline": 20.0, "timeout": 10.0, "hedge": True, "hedge_quantile": 0.95,
+                  "hedge_min_delay": 0.3, "workers": 16},
+}
+
+
+class FetchTimeout(TimeoutError):
+    """An upstream call (including any hedge) did not finish before its deadline."""
+
+
+class Hedger:
+    """
+    Per-call deadline plus hedged requests for one upstream. A call that has not
+    answered after the recent p95 latency gets one duplicate request; the first
+    success wins and the loser is abandoned (its socket timeout ends it). A call
+    still unanswered at the deadline raises FetchTimeout and is counted.
+    """
+
+    def __init__(self, name: str, deadline: float = 20.0, timeout: float = 10.0, hedge: bool = True,
+                 hedge_quantile: float = 0.95, hedge_min_delay: float = 0.3, workers: int = 16,
+                 window: int = 200, min_samples: int = 20):
+        self.name = name
+        self._lock = threading.Lock()
+        self._lat: deque = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._counts = {"calls": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0, "errors": 0}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.configure(deadline=deadline, timeout=timeout, hedge=hedge, hedge_quantile=hedge_quantile,
+                       hedge_min_delay=hedge_min_delay, workers=workers)
+
+    def configure(self, deadline: float = 20.0, timeout: float = 10.0, hedge: bool = True,
+                  hedge_quantile: float = 0.95, hedge_min_delay: float = 0.3, workers: int = 16):
+        with self._lock:
+            self.deadline = float(deadline)
+            self.timeout = float(timeout)  # per HTTP request; see install_request_timeout
+            self.hedge = bool(hedge)
+            self.hedge_quantile = min(0.999, max(0.5, float(hedge_quantile)))
+            self.hedge_min_delay = float(hedge_min_delay)
+            if self._pool is None or workers != self._workers:
+                old, self._workers = self._pool, max(2, int(workers))
+                self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix=f"fetch-{self.name}")
+                if old is not None:
+                    old.shutdown(wait=False)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging: the recent latency quantile, or None until enough samples."""
+        with self._lock:
+            if not self.hedge or len(self._lat) < self.min_samples:
+                return None
+            lat = sorted(self._lat)
+            q = lat[min(len(lat) - 1, int(self.hedge_quantile * len(lat)))]
+            return min(self.deadline, max(self.hedge_min_delay, q))
+
+    def _timed(self, fn: Callable, args, kwargs):
+        t0 = time.monotonic()
+        result = fn(*args, **kwargs)
+        with self._lock:
+            self._lat.append(time.monotonic() - t0)
+        return result
+
+    def call(self, fn: Callable, *args, **kwargs):
+        return self._call(fn, args, kwargs, bounded=False)
+
+    def call_bounded(self, fn: Callable, *args, **kwargs):
+        """
+        Like `call`, but `fn` gets this call's deadline (a time.monotonic() value)
+        as its first argument, e.g. AdaptiveLimiter.call_until, so requests
+        abandoned at the deadline stop retrying instead of holding pool threads.
+        """
+        return self._call(fn, args, kwargs, bounded=True)
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict, bounded: bool):
+        with self._lock:
+            self._counts["calls"] += 1
+            pool, deadline = self._pool, self.deadline
+        t_end = time.monotonic() + deadline
+        if bounded:
+            args = (t_end,) + tuple(args)
+        primary = pool.submit(self._timed, fn, args, kwargs)
+        pending = {primary}
+        delay = self.hedge_delay()
+        hedged = False
+        error: Optional[BaseException] = None
+        while pending:
+            left = t_end - time.monotonic()
+            if left <= 0:
+                break
+            step = min(left, delay) if (delay is not None and not hedged) else left
+            done, pending = wait(pending, timeout=step, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if fut is not primary:
+                    with self._lock:
+                        self._counts["hedge_wins"] += 1
+                return result
+            if not hedged and delay is not None and pending:
+                # primary is slower than p95: race a duplicate against it
+                hedged = True
+                with self._lock:
+                    self._counts["hedged"] += 1
+                pending.add(pool.submit(self._timed, fn, args, kwargs))
+        if error is not None and not pending and not isinstance(error, TimeoutError):
+            with self._lock:
+                self._counts["errors"] += 1
+            raise error
+        with self._lock:
+            self._counts["timeouts"] += 1
+        raise FetchTimeout(f"{self.name}: no answer within {deadline:g}s") from error
+
+    def stats(self) -> Dict:
+        delay = self.hedge_delay()
+        with self._lock:
+            out = dict(self._counts)
+            out.update({
+                "deadline_seconds": self.deadline,
+                "request_timeout_seconds": self.timeout,
+                "hedge_delay_seconds": round(delay, 3) if delay is not None else None,
+                "samples": len(self._lat),
+            })
+            return out
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+_HEDGERS: Dict[str, Hedger] = {}
+_HEDGERS_LOCK = threading.Lock()
+
+
+def hedger(name: str) -> Hedger:
+    """Process-wide deadline/hedging policy for an upstream; shared by every concurrent build."""
+    with _HEDGERS_LOCK:
+        h = _HEDGERS.get(name)
+        if h is None:
+            h = _HEDGERS[name] = Hedger(name, **_DEFAULTS.get(name, {}))
+        return h
+
+
+def configure_hedgers(deadlines: Optional[Dict]):
+    """Apply the `deadlines` block from settings.yaml, e.g. {"wikipedia": {"deadline": 15}}."""
+    for name, opts in (deadlines or {}).items():
+        if isinstance(opts, dict):
+            merged = dict(_DEFAULTS.get(name, {}))
+            merged.update(opts)
+            hedger(name).configure(**merged)
+
+
+def hedge_stats() -> Dict[str, Dict]:
+    with _HEDGERS_LOCK:
+        items = list(_HEDGERS.items())
+    return {name: h.stats() for name, h in items}
+
+
+class _TimeoutRequests:
+    """Stands in for the `requests` module inside a client library and adds a default timeout."""
+
+    def __init__(self, requests_mod, get_timeout: Callable[[], float]):
+        self._requests = requests_mod
+        self._get_timeout = get_timeout
+
+    def get(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self._get_timeout())
+        return self._requests.get(*args, **kwargs)
+
+    def __getattr__(self, item):
+        return getattr(self._requests, item)
+
+
+def install_request_timeout(module, name: str):
+    """
+    The wikipedia package calls requests.get() without a timeout. Give its HTTP
+    calls the upstream's socket timeout so abandoned (hedged/late) requests end.
+    """
+    req = getattr(module, "requests", None)
+    if req is None or isinstance(req, _TimeoutRequests):
+        return
+    module.requests = _TimeoutRequests(req, lambda: hedger(name).timeout)
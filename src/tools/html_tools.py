@@ -0,0 +1,196 @@
+import os
+import re
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_NUM_RE = re.compile(r"^\s*\d+\.\s+")
+_URL_RE = re.compile(r"https?://[^\s\"'<>]+")
+_URL_TRAIL = ".,;:!?)]}"
+
+_CSS = """\
+body{font:16px/1.55 system-ui,-apple-system,"Segoe UI",Roboto,sans-serif;margin:0;color:#1f2328;background:#fff}
+main{max-width:46rem;margin:0 auto;padding:1.5rem 1rem 3rem}
+header.site{border-bottom:1px solid #d0d7de;padding:.6rem 1rem;font-size:.95rem}
+header.site a{margin-right:1rem}
+nav.pager{display:flex;justify-content:space-between;margin-top:2.5rem;border-top:1px solid #d0d7de;padding-top:.8rem}
+h1{font-size:1.8rem;margin:.2rem 0 1rem}h2{font-size:1.35rem;margin-top:1.8rem}h3{font-size:1.1rem}
+a{color:#0969da;text-decoration:none}a:hover{text-decoration:underline}
+ol.choices{list-style:upper-alpha}
+details{margin:.3rem 0 1rem;padding:.4rem .7rem;background:#f6f8fa;border-radius:6px}
+.meta{color:#57606a;font-size:.9rem}
+"""
+
+
+def _split_url(url: str):
+    """(url, trailing punctuation): sentence punctuation after a URL is not part of it."""
+    end = len(url)
+    while end and url[end - 1] in _URL_TRAIL:
+        # keep a closing paren the URL opened itself, e.g. /wiki/Mercury_(planet)
+        if url[end - 1] == ")" and url.count("(", 0, end) >= url.count(")", 0, end):
+            break
+        end -= 1
+    return url[:end], url[end:]
+
+
+def _inline(text: str) -> str:
+    """Escape a line of text and turn bare URLs into links."""
+    out, pos = [], 0
+    text = text or ""
+    for m in _URL_RE.finditer(text):
+        url, trail = _split_url(m.group(0))
+        out.append(escape(text[pos:m.start()]))
+        if url.partition("://")[2]:
+            url = escape(url)
+            out.append(f'<a href="{url}">{url}</a>')
+        else:
+            out.append(escape(url))
+        pos = m.end() - len(trail)
+    out.append(escape(text[pos:]))
+    return "".join(out)
+
+
+class HtmlTools:
+    """
+    Static-site renderer for the course: same Markdown dialect as the PDF export
+    (#/##/### headings, "- " and "1. " lists, paragraphs), one page per artifact
+    under `site_root`, plus an index page. Pages are plain HTML + one stylesheet.
+    """
+
+    def __init__(self, site_root: str):
+        self.root = Path(site_root)
+
+    # ---------- file helpers ----------
+    def write_if_changed(self, path: str, content: str) -> bool:
+        """Write `content` unless the file already holds exactly that; True if written."""
+        p = Path(path)
+        data = content.encode("utf-8")
+        try:
+            if p.stat().st_size == len(data) and p.read_bytes() == data:
+                return False
+        except OSError:
+            pass
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+        return True
+
+    def _rel(self, page_rel: str, target_rel: str) -> str:
+        """Link from one site-relative page to another."""
+        return os.path.relpath(target_rel, os.path.dirname(page_rel) or ".").replace(os.sep, "/")
+
+    def page(self, rel: str, title: str, body: str, prev: Optional[tuple] = None,
+             next: Optional[tuple] = None) -> str:
+        """Full HTML document for site-relative path `rel`; prev/next are (rel, label) pairs."""
+        css = self._rel(rel, "style.css")
+        home = self._rel(rel, "index.html")
+        pager = ""
+        if prev or next:
+            left = f'<a href="{self._rel(rel, prev[0])}">← {escape(prev[1])}</a>' if prev else "<span></span>"
+            right = f'<a href="{self._rel(rel, next[0])}">{escape(next[1])} →</a>' if next else "<span></span>"
+            pager = f'<nav class="pager">{left}{right}</nav>'
+        return (
+            "<!doctype html>\n"
+            '<html lang="en"><head><meta charset="utf-8">'
+            '<meta name="viewport" content="width=device-width,initial-scale=1">'
+            f"<title>{escape(title)}</title>"
+            f'<link rel="stylesheet" href="{css}"></head>\n'
+            f'<body><header class="site"><a href="{home}">Course home</a></header>\n'
+            f"<main>\n{body}\n{pager}</main></body></html>\n"
+        )
+
+    def write_page(self, rel: str, title: str, body: str, prev: Optional[tuple] = None,
+                   next: Optional[tuple] = None) -> str:
+        path = (self.root / rel).as_posix()
+        self.write_if_changed(path, self.page(rel, title, body, prev=prev, next=next))
+        return path
+
+    def write_stylesheet(self) -> str:
+        path = (self.root / "style.css").as_posix()
+        self.write_if_changed(path, _CSS)
+        return path
+
+    # ---------- Markdown(ish) -> HTML ----------
+    def markdown_to_html(self, md_text: str, title: Optional[str] = None) -> str:
+        out: List[str] = []
+        if title:
+            out.append(f"<h1>{escape(title)}</h1>")
+        list_buffer: List[str] = []
+        list_kind: Optional[str] = None
+
+        def flush_list():
+            nonlocal list_buffer, list_kind
+            if list_buffer:
+                tag = "ol" if list_kind == "number" else "ul"
+                out.append(f"<{tag}>" + "".join(f"<li>{_inline(li)}</li>" for li in list_buffer) + f"</{tag}>")
+            list_buffer, list_kind = [], None
+
+        for raw in (md_text or "").splitlines():
+            line = (raw or "").rstrip()
+            if not line:
+                flush_list()
+                continue
+            m = re.match(r"^(#{1,3}) (.*)$", line)
+            if m:
+                flush_list()
+                n = len(m.group(1))
+                out.append(f"<h{n}>{_inline(m.group(2).strip())}</h{n}>")
+                continue
+            if line.lstrip().startswith("- "):
+                if list_kind not in (None, "bullet"):
+                    flush_list()
+                list_kind = "bullet"
+                list_buffer.append(line.lstrip()[2:].strip())
+                continue
+            if _NUM_RE.match(line):
+                if list_kind not in (None, "number"):
+                    flush_list()
+                list_kind = "number"
+                list_buffer.append(_NUM_RE.sub("", line).strip())
+                continue
+            flush_list()
+            out.append(f"<p>{_inline(line)}</p>")
+        flush_list()
+        return "\n".join(out)
+
+    # ---------- Quiz JSON -> HTML (answers folded under <details>) ----------
+    def quiz_to_html(self, quiz: Dict, title: Optional[str] = None) -> str:
+        out: List[str] = [f"<h1>{escape(title)}</h1>"] if title else []
+        alpha = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        for i, it in enumerate((quiz or {}).get("items", []) or [], 1):
+            qtype = str(it.get("type", "mcq")).lower()
+            if qtype in ("mcq", "multiple_choice", "choice"):
+                out.append(f"<h3>Q{i}. {_inline(str(it.get('question', '')))}</h3>")
+                choices = it.get("choices", []) or []
+                if choices:
+                    out.append('<ol class="choices">' + "".join(f"<li>{_inline(str(c))}</li>" for c in choices) + "</ol>")
+                ans = it.get("answer", "")
+                if isinstance(ans, int) and 0 <= ans < len(choices):
+                    ans = f"{alpha[ans % 26]}) {choices[ans]}"
+                why = f"<p>Why: {_inline(str(it['rationale']))}</p>" if it.get("rationale") else ""
+                out.append(f"<details><summary>Answer</summary><p>{_inline(str(ans))}</p>{why}</details>")
+                meta = [f"Bloom: {it['bloom']}" if it.get("bloom") else "",
+                        f"Difficulty: {it['difficulty']}" if it.get("difficulty") else ""]
+                meta = " | ".join(m for m in meta if m)
+                if meta:
+                    out.append(f'<p class="meta">{escape(meta)}</p>')
+            else:
+                out.append(f"<h3>Short-answer: {_inline(str(it.get('prompt', '')))}</h3>")
+        return "\n".join(out)
+
+    # ---------- index ----------
+    def write_index(self, topic: str, syllabus: Dict, extras: List[tuple]) -> str:
+        """Course home: syllabus/reading list links (`extras` = [(rel, label)]) and every lesson + quiz by week."""
+        parts = [f"<h1>{escape(topic)}</h1>", "<ul>"]
+        parts += [f'<li><a href="{rel}">{escape(label)}</a></li>' for rel, label in extras]
+        parts.append("</ul>")
+        for w in syllabus.get("weeks", []):
+            parts.append(f"<h2>Week {w['week']}</h2><ul>")
+            for l in w.get("lessons", []):
+                lesson_rel = f"lessons/week_{w['week']}/lesson_{l['lesson']}.html"
+                quiz_rel = f"quizzes/week_{w['week']}_lesson_{l['lesson']}.html"
+                parts.append(
+                    f'<li><a href="{lesson_rel}">{escape(l["title"])}</a>'
+                    f' · <a href="{quiz_rel}">quiz</a></li>'
+                )
+            parts.append("</ul>")
+        return self.write_page("index.html", topic, "\n".join(parts))
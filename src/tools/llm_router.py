@@ -0,0 +1,277 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .llm_tools import get_client
+from .rate_limit import is_transient, limiter
+
+TASKS = ("refine", "crew", "quiz", "quiz_repair")
+
+# Defaults per task type; overridable through `llm.routes` in settings.yaml.
+# timeout bounds one request, latency_budget the whole call including failover.
+_ROUTE_DEFAULTS: Dict[str, Dict] = {
+    "refine": {"max_tokens": 600, "timeout": 20.0, "latency_budget": 45.0},
+    "crew": {"timeout": 60.0, "latency_budget": 600.0},
+    "quiz": {"max_tokens": 1500, "timeout": 30.0, "latency_budget": 90.0},
+    "quiz_repair": {"max_tokens": 1500, "temperature": 0.2, "timeout": 20.0, "latency_budget": 45.0},
+}
+
+
+class RouteExhausted(RuntimeError):
+    """Every backend of a route failed, or its latency budget ran out before one answered."""
+
+
+class LatencyBudgetExceeded(TimeoutError):
+    """Raised inside an attempt that would start after the route's budget; never retried."""
+
+
+def backend_failed(exc: BaseException) -> bool:
+    """
+    True when an error says the backend itself is unhealthy (throttled, 5xx,
+    unreachable, timed out), looking through wrapped causes. Other errors, e.g.
+    a bad prompt or unparsable output, do not put a backend into cooldown.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if is_transient(exc) or isinstance(exc, TimeoutError):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class Backend:
+    """One OpenAI-compatible endpoint. `model` (optional) replaces the route's model, e.g. for a local server."""
+
+    def __init__(self, name: str, base_url: Optional[str] = None, api_key_env: Optional[str] = None,
+                 api_key: Optional[str] = None, model: Optional[str] = None, limiter: Optional[str] = None):
+        self.name = name
+        self.base_url = base_url or None
+        self.api_key_env = api_key_env
+        self._api_key = api_key
+        self.model = model
+        # the default backend shares the 'openai' limiter with every other OpenAI call
+        self.limiter = limiter or ("openai" if self.base_url is None else name)
+
+    @property
+    def api_key(self) -> Optional[str]:
+        if self._api_key:
+            return self._api_key
+        if self.api_key_env:
+            # local servers usually ignore the key, but the SDK insists on one
+            return os.environ.get(self.api_key_env) or ("local" if self.base_url else None)
+        return "local" if self.base_url else None
+
+
+class Route:
+    def __init__(self, task: str, model: str, backends: List[str], temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None, timeout: float = 30.0, latency_budget: float = 60.0):
+        self.task = task
+        self.model = model
+        self.backends = list(backends)
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.timeout = float(timeout)
+        self.latency_budget = float(latency_budget)
+
+
+def _blank() -> Dict:
+    return {"calls": 0, "ok": 0, "errors": 0, "failovers": 0, "budget_exceeded": 0, "seconds": 0.0, "max_seconds": 0.0}
+
+
+class LlmRouter:
+    """
+    Picks backend, model, max_tokens and timeouts per task type (refine, crew,
+    quiz, quiz_repair). A call that fails on one backend moves to the next in the
+    route's list while its latency budget lasts; a backend that failed is skipped
+    by later calls for `cooldown` seconds, so a dead upstream costs one timeout,
+    not one per lesson.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.25, max_tokens: Optional[int] = None,
+                 backends: Optional[Dict[str, Dict]] = None, routes: Optional[Dict[str, Dict]] = None,
+                 cooldown: float = 60.0):
+        self._lock = threading.Lock()
+        self.cooldown = float(cooldown)
+        self.backends: Dict[str, Backend] = {"openai": Backend("openai")}
+        for name, opts in (backends or {}).items():
+            self.backends[name] = Backend(name, **(opts or {}))
+        self.routes: Dict[str, Route] = {}
+        for task in TASKS:
+            opts = dict(_ROUTE_DEFAULTS.get(task, {}))
+            opts.update((routes or {}).get(task) or {})
+            names = [b for b in (opts.pop("backends", None) or ["openai"]) if b in self.backends] or ["openai"]
+            opts.setdefault("temperature", temperature)
+            opts.setdefault("max_tokens", max_tokens)
+            self.routes[task] = Route(task, opts.pop("model", None) or model, names, **opts)
+        self._down_until: Dict[str, float] = {}
+        self._stats: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_cfg(cls, cfg: Optional[Dict]) -> "LlmRouter":
+        c = (cfg or {}).get("llm") or {}
+        return cls(model=c.get("model", "gpt-4o-mini"), temperature=c.get("temperature", 0.25),
+                   max_tokens=c.get("max_tokens"), backends=c.get("backends"), routes=c.get("routes"),
+                   cooldown=c.get("failover_cooldown_seconds", 60.0))
+
+    # ---------- selection ----------
+    def _order(self, route: Route) -> List[Backend]:
+        """Route backends in failover order, healthy ones first."""
+        now = time.monotonic()
+        with self._lock:
+            up = [b for b in route.backends if self._down_until.get(b, 0.0) <= now]
+        down = [b for b in route.backends if b not in up]
+        return [self.backends[b] for b in up + down]
+
+    def model_for(self, task: str, backend: Optional[Backend] = None) -> str:
+        route = self.routes[task]
+        backend = backend or self._order(route)[0]
+        return backend.model or route.model
+
+    def mark_failed(self, backend: str):
+        """Skip `backend` (a name, as returned by `apply`) for the cooldown period."""
+        with self._lock:
+            self._down_until[backend] = time.monotonic() + self.cooldown
+
+    def _mark_ok(self, name: str):
+        with self._lock:
+            self._down_until.pop(name, None)
+
+    def _count(self, task: str, backend: str, **inc):
+        with self._lock:
+            rec = self._stats.setdefault(task, {}).setdefault(backend, _blank())
+            for k, v in inc.items():
+                if k == "max_seconds":
+                    rec[k] = max(rec[k], v)
+                else:
+                    rec[k] += v
+
+    # ---------- direct calls ----------
+    def complete(self, task: str, messages: List[Dict], usage=None, lesson: Optional[str] = None, **kwargs):
+        """
+        Chat completion for `task` (extra kwargs go to the API, e.g. response_format;
+        `model` replaces the route's and backends' models for this call). Raises
+        RouteExhausted when no backend answered within the route's latency budget.
+        """
+        route = self.routes[task]
+        model_override = kwargs.pop("model", None)
+        t_end = time.monotonic() + route.latency_budget
+        errors = []
+        for backend in self._order(route):
+            if time.monotonic() >= t_end:
+                break
+            model = model_override or backend.model or route.model
+            client = get_client(backend.base_url, backend.api_key)
+
+            def _attempt(**kw):
+                left = t_end - time.monotonic()
+                if left <= 0:
+                    raise LatencyBudgetExceeded(f"{task}: latency budget of {route.latency_budget:g}s spent")
+                return client.with_options(timeout=min(route.timeout, left)).chat.completions.create(**kw)
+
+            params = dict(model=model, messages=messages, temperature=route.temperature)
+            if route.max_tokens:
+                params["max_tokens"] = int(route.max_tokens)
+            params.update(kwargs)
+            t0 = time.monotonic()
+            try:
+                r = limiter(backend.limiter).call(_attempt, **params)
+            except LatencyBudgetExceeded as e:
+                self._count(task, backend.name, calls=1, budget_exceeded=1)
+                errors.append(f"{backend.name}: {e}")
+                break
+            except Exception as e:
+                secs = time.monotonic() - t0
+                self._count(task, backend.name, calls=1, errors=1, seconds=secs, max_seconds=secs)
+                errors.append(f"{backend.name}: {type(e).__name__}: {e}")
+                if backend_failed(e):
+                    self.mark_failed(backend.name)
+                continue
+            secs = time.monotonic() - t0
+            self._count(task, backend.name, calls=1, ok=1, seconds=secs, max_seconds=secs, failovers=int(backend.name != route.backends[0]))
+            self._mark_ok(backend.name)
+            if usage is not None:
+                usage.record_response(task, r, model=model, lesson=lesson)
+            return r
+        raise RouteExhausted(f"{task}: no backend answered ({'; '.join(errors) or 'latency budget spent'})")
+
+    # ---------- CrewAI agents ----------
+    def llm(self, task: str, backend: Optional[Backend] = None):
+        """crewai.LLM for `backend`, by default the task's first healthy one (agents cannot fail over mid-task)."""
+        from crewai import LLM
+
+        route = self.routes[task]
+        backend = backend or self._order(route)[0]
+        model = backend.model or route.model
+        if backend.base_url and "/" not in model:
+            model = f"openai/{model}"  # LiteLLM provider prefix for OpenAI-compatible servers
+        opts = {"model": model, "temperature": route.temperature, "timeout": route.timeout}
+        if route.max_tokens:
+            opts["max_tokens"] = int(route.max_tokens)
+        if backend.base_url:
+            opts.update(base_url=backend.base_url, api_key=backend.api_key)
+        return LLM(**opts)
+
+    def apply(self, agent, task: str, budget: Optional[float] = None, backend: Optional[Backend] = None) -> Backend:
+        """
+        Point a (possibly pooled) agent at the task's first healthy backend (or at
+        `backend`, to keep the agents of one crew together) and bound one task by its
+        latency budget. Returns that backend: pass its name to `mark_failed` when the
+        kickoff fails with a `backend_failed` error.
+        """
+        backend = backend or self._order(self.routes[task])[0]
+        agent.llm = self.llm(task, backend)
+        agent.max_execution_time = max(1, int(budget if budget is not None else self.routes[task].latency_budget))
+        return backend
+
+    def stats(self) -> Dict:
+        with self._lock:
+            out = {}
+            for task, per_backend in self._stats.items():
+                out[task] = {}
+                for name, rec in per_backend.items():
+                    rec = dict(rec)
+                    rec["mean_seconds"] = round(rec["seconds"] / rec["calls"], 3) if rec["calls"] else 0.0
+                    rec["seconds"] = round(rec["seconds"], 3)
+                    rec["max_seconds"] = round(rec["max_seconds"], 3)
+                    out[task][name] = rec
+            down = {b: round(t - time.monotonic(), 1) for b, t in self._down_until.items() if t > time.monotonic()}
+        return {"routes": {t: {"model": r.model, "backends": r.backends, "max_tokens": r.max_tokens,
+                               "timeout": r.timeout, "latency_budget": r.latency_budget}
+                           for t, r in self.routes.items()},
+                "calls": out, "cooling_down": down}
+
+
+_ROUTER: Optional[LlmRouter] = None
+_ROUTER_KEY: Optional[str] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def llm_router() -> LlmRouter:
+    """Process-wide router; backend health is shared by every concurrent build."""
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = LlmRouter()
+        return _ROUTER
+
+
+def configure_llm_router(cfg: Optional[Dict]) -> LlmRouter:
+    """
+    Process-wide router for settings.yaml's `llm` block. Builds with the same block
+    share one router; a changed block replaces it, and the new router takes over the
+    old one's lock, cooldowns and counters, so a build still holding the old router
+    updates the same state.
+    """
+    global _ROUTER, _ROUTER_KEY
+    key = json.dumps((cfg or {}).get("llm") or {}, sort_keys=True, default=str)
+    with _ROUTER_LOCK:
+        if _ROUTER is not None and key == _ROUTER_KEY:
+            return _ROUTER
+        new = LlmRouter.from_cfg(cfg)
+        if _ROUTER is not None:
+            new._lock, new._down_until, new._stats = _ROUTER._lock, _ROUTER._down_until, _ROUTER._stats
+        _ROUTER, _ROUTER_KEY = new, key
+        return new
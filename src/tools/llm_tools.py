@@ -1,8 +1,50 @@
 import json
+import threading
+import warnings
 from openai import OpenAI
 
-def llm_make_quiz(lesson_title: str, objectives: list[str], lesson_notes: str, model: str = "gpt-4o-mini") -> dict:
-    client = OpenAI()
+# One OpenAI client per endpoint, shared process-wide. The client is thread-safe and
+# keeps an HTTP connection pool, so reusing it preserves keep-alive across lessons/builds.
+_CLIENTS: dict[tuple, OpenAI] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(base_url: str | None = None, api_key: str | None = None) -> OpenAI:
+    key = (base_url, api_key)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            # retries are owned by the shared 'openai' limiter, not the SDK
+            client = OpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+            _CLIENTS[key] = client
+        return client
+
+
+def close_clients():
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for c in clients:
+        try:
+            c.close()
+        except Exception:
+            pass
+
+
+def llm_make_quiz(lesson_title: str, objectives: list[str], lesson_notes: str, model: str | None = None,
+                  usage=None, lesson: str | None = None, router=None) -> dict:
+    """
+    Direct quiz generation over the 'quiz_repair' route (model, timeouts and failover
+    from `llm.routes`); `usage` (a UsageMeter) records the response's token usage.
+    `model` is deprecated: it still overrides the route's model for this call, but
+    set `llm.routes.quiz_repair.model` instead.
+    """
+    from .llm_router import llm_router
+
+    if model is not None:
+        warnings.warn("llm_make_quiz(model=...) is deprecated; set llm.routes.quiz_repair.model instead",
+                      DeprecationWarning, stacklevel=2)
+    router = router or llm_router()
     sys = "You generate rigorous assessments aligned to objectives. Return ONLY strict JSON."
     usr = f"""
 Create exactly 5 multiple-choice items and 1 short-answer item for this lesson.
@@ -28,10 +70,12 @@ Schema:
   ]
 }}
 """
-    r = client.chat.completions.create(
+    r = router.complete(
+        "quiz_repair",
+        [{"role":"system","content":sys},{"role":"user","content":usr}],
+        usage=usage,
+        lesson=lesson,
         model=model,
-        messages=[{"role":"system","content":sys},{"role":"user","content":usr}],
-        temperature=0.2,
         response_format={"type":"json_object"}
     )
     return json.loads(r.choices[0].message.content)
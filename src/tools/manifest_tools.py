@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .export_tools import sidecar_paths
+from .metrics import record_artifact
+
+
+def sha256_file(path: str, chunk: int = 1 << 16) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_entry(path: str, stage: str, seconds: Optional[float] = None, sidecars: Iterable[str] = ()) -> Dict:
+    """Content hash, size and provenance for one written artifact (plus its compressed sidecars, if any)."""
+    p = Path(path)
+    entry = {
+        "sha256": sha256_file(path),
+        "bytes": p.stat().st_size,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "stage": stage,
+        "stage_seconds": round(seconds, 3) if seconds is not None else None,
+    }
+    sides = {c: s for c, s in sidecar_paths(path, sidecars).items() if os.path.exists(s)}
+    if sides:
+        entry["sidecars"] = {c: {"path": s, "bytes": os.path.getsize(s), "sha256": sha256_file(s)}
+                             for c, s in sides.items()}
+    return entry
+
+
+def storage_stats(root: str) -> Dict:
+    """Logical bytes and allocated (on-disk) bytes of everything under `root`, by file extension."""
+    files = logical = stored = 0
+    by_ext: Dict[str, int] = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            files += 1
+            logical += st.st_size
+            # st_blocks is in 512-byte units where the platform reports it
+            stored += st.st_blocks * 512 if hasattr(st, "st_blocks") else st.st_size
+            ext = os.path.splitext(name)[1].lower() or "(none)"
+            by_ext[ext] = by_ext.get(ext, 0) + st.st_size
+    return {"files": files, "bytes": logical, "stored_bytes": stored, "by_extension": dict(sorted(by_ext.items()))}
+
+
+class ManifestJournal:
+    """
+    Append-only JSONL log of artifacts as they are written.
+    The build keeps no per-lesson lists in memory; the manifest is rebuilt
+    from this file once all lessons are done.
+    """
+
+    def __init__(self, path: str, sidecars: Iterable[str] = ()):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sidecars = tuple(sidecars)
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, path: str, **extra):
+        rec = {"kind": kind, "path": path}
+        rec.update(extra)
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+    def record(self, kind: str, path: str, stage: str, seconds: Optional[float] = None):
+        """Journal an artifact together with its hash/size/timing entry."""
+        entry = file_entry(path, stage, seconds, self.sidecars)
+        self.add(kind, path, **entry)
+        record_artifact(stage, entry["bytes"] + sum(s["bytes"] for s in entry.get("sidecars", {}).values()))
+
+    def entries(self) -> Iterator[Dict]:
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+
+    def collect(self) -> Dict[str, List[str]]:
+        """kind -> paths in write order; a path re-written later keeps its first position."""
+        out: Dict[str, List[str]] = {}
+        seen = set()
+        for rec in self.entries():
+            key = (rec.get("kind"), rec.get("path"))
+            if key in seen:
+                continue
+            seen.add(key)
+            out.setdefault(rec["kind"], []).append(rec["path"])
+        return out
+
+    def artifacts(self) -> Dict[str, Dict]:
+        """path -> latest hash/size/timing entry, for the manifest's `artifacts` map."""
+        out: Dict[str, Dict] = {}
+        for rec in self.entries():
+            if "sha256" not in rec:
+                continue
+            meta = {k: v for k, v in rec.items() if k not in ("kind", "path")}
+            out[rec["path"]] = meta
+        return dict(sorted(out.items()))
+
+    def bytes_written(self) -> Dict[str, int]:
+        """Bytes journaled this build (re-written files count each time), artifacts and sidecars apart."""
+        art = side = 0
+        for rec in self.entries():
+            art += int(rec.get("bytes") or 0)
+            side += sum(int(s.get("bytes") or 0) for s in (rec.get("sidecars") or {}).values())
+        return {"artifacts": art, "sidecars": side, "total": art + side}
+
+
+def diff_manifests(old: Dict, new: Dict) -> Dict:
+    """
+    Compare the `artifacts` maps of two manifests by content hash.
+    Manifests from before hashing (path lists only) count every shared path as changed.
+    """
+    a = (old or {}).get("artifacts") or {}
+    b = (new or {}).get("artifacts") or {}
+    if not a:
+        a = {p: {} for p in _manifest_paths(old)}
+    if not b:
+        b = {p: {} for p in _manifest_paths(new)}
+
+    added = sorted(p for p in b if p not in a)
+    removed = sorted(p for p in a if p not in b)
+    changed, unchanged = [], 0
+    for p in sorted(set(a) & set(b)):
+        ha, hb = a[p].get("sha256"), b[p].get("sha256")
+        if ha and hb and ha == hb:
+            unchanged += 1
+        else:
+            changed.append(p)
+    by_codec: Dict[str, int] = {}
+    for p in added + changed:
+        for codec, side in (b[p].get("sidecars") or {}).items():
+            by_codec[codec] = by_codec.get(codec, 0) + int(side.get("bytes") or 0)
+    out = {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": unchanged,
+        "bytes_to_fetch": sum(int(b[p].get("bytes") or 0) for p in added + changed),
+    }
+    if by_codec:
+        # fetching the compressed copies instead (artifacts without a sidecar are not counted)
+        out["sidecar_bytes_to_fetch"] = dict(sorted(by_codec.items()))
+    return out
+
+
+def _manifest_paths(man: Dict) -> List[str]:
+    prefix = str((man or {}).get("out_dir") or "course").rstrip("/") + "/"
+    out = []
+    for v in (man or {}).values():
+        if isinstance(v, str) and v.startswith(prefix):
+            out.append(v)
+        elif isinstance(v, list):
+            out.extend(x for x in v if isinstance(x, str) and x.startswith(prefix))
+    return out
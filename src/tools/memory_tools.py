@@ -0,0 +1,65 @@
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size right now (Linux /proc); None where unavailable."""
+    if resource is None:
+        return None
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process-wide high-water mark (ru_maxrss is KiB on Linux, bytes on macOS); None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RssMonitor:
+    """Samples RSS at unit boundaries so growth across lessons is visible."""
+
+    def __init__(self, target_growth_mb: Optional[float] = None):
+        self.target_growth_mb = target_growth_mb
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.high: Optional[float] = None
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def sample(self):
+        rss = current_rss_mb()
+        if rss is None:
+            return
+        with self._lock:
+            if self.first is None:
+                self.first = rss
+            self.last = rss
+            self.high = rss if self.high is None else max(self.high, rss)
+            self.samples += 1
+
+    def report(self) -> Dict:
+        growth = (self.last - self.first) if self.first is not None and self.last is not None else None
+        peak = peak_rss_mb()
+        out = {
+            "peak_rss_mb": round(peak, 1) if peak is not None else None,
+            "build_high_rss_mb": round(self.high, 1) if self.high is not None else None,
+            "rss_growth_mb": round(growth, 1) if growth is not None else None,
+            "samples": self.samples,
+        }
+        if self.target_growth_mb is not None and growth is not None:
+            out["target_growth_mb"] = self.target_growth_mb
+            out["within_target"] = growth <= self.target_growth_mb
+        return out
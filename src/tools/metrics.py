@@ -0,0 +1,287 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Prometheus text exposition (format 0.0.4) without a client-library dependency.
+_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+_STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = _STAGE_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            rec = self._values.get(key)
+            if rec is None:
+                rec = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                rec[i] += 1
+            rec[-2] += value
+            rec[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        out = self.header()
+        for key, rec in items:
+            cum = 0
+            for le, n in zip(self.buckets, rec):
+                cum += n
+                le_label = 'le="%s"' % _num(le)
+                out.append(f"{self.name}_bucket{_labels(self.label_names, key, le_label)} {cum}")
+            inf_label = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_labels(self.label_names, key, inf_label)} {rec[-1]}")
+            out.append(f"{self.name}_sum{_labels(self.label_names, key)} {_num(rec[-2])}")
+            out.append(f"{self.name}_count{_labels(self.label_names, key)} {rec[-1]}")
+        return out
+
+
+class Registry:
+    """Metrics owned by this process plus collectors that read other components' stats at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], List[str]]):
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        lines: List[str] = []
+        for m in metrics:
+            lines += m.render()
+        for fn in collectors:
+            try:
+                lines += fn()
+            except Exception:
+                continue  # a broken collector must not take the endpoint down
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+BUILDS_ACTIVE = REGISTRY.register(Gauge("c2c_builds_active", "Course builds currently running."))
+BUILDS_QUEUED = REGISTRY.register(Gauge("c2c_builds_queued", "Course builds waiting for a build slot."))
+BUILDS_TOTAL = REGISTRY.register(Counter("c2c_builds_total", "Finished course builds by outcome.", ("status",)))
+BUILD_SECONDS = REGISTRY.register(Histogram("c2c_build_duration_seconds", "Wall-clock duration of course builds.",
+                                            ("status",), buckets=_DURATION_BUCKETS))
+STAGE_SECONDS = REGISTRY.register(Histogram("c2c_stage_duration_seconds", "Seconds per unit of each build stage.",
+                                            ("stage",)))
+ARTIFACT_BYTES = REGISTRY.register(Counter("c2c_artifact_bytes_total", "Bytes of artifacts written, by stage.",
+                                           ("stage",)))
+ARTIFACTS = REGISTRY.register(Counter("c2c_artifacts_total", "Artifacts written, by stage.", ("stage",)))
+CACHE_EVENTS = REGISTRY.register(Counter("c2c_cache_events_total", "Cache lookups by cache and result (hit/miss).",
+                                         ("cache", "result")))
+BUILDS_ACTIVE.set(0)
+BUILDS_QUEUED.set(0)
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+def record_artifact(stage: str, nbytes: int):
+    ARTIFACTS.inc(stage=stage)
+    ARTIFACT_BYTES.inc(nbytes, stage=stage)
+
+
+def cache_event(cache: str, hit: bool):
+    CACHE_EVENTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+@contextmanager
+def track_build() -> Iterator[None]:
+    """Count one running build and record its duration and outcome."""
+    BUILDS_ACTIVE.inc()
+    t0 = time.monotonic()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        BUILDS_ACTIVE.dec()
+        BUILDS_TOTAL.inc(status=status)
+        BUILD_SECONDS.observe(time.monotonic() - t0, status=status)
+
+
+class BuildSlots:
+    """Admission control for builds started by the UI: at most `limit` run at once, the rest are queued."""
+
+    def __init__(self, limit: int = 2):
+        self.limit = max(1, int(limit))
+        self._sem = threading.BoundedSemaphore(self.limit)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        BUILDS_QUEUED.inc()
+        try:
+            self._sem.acquire()
+        finally:
+            BUILDS_QUEUED.dec()
+        try:
+            yield
+        finally:
+            self._sem.release()
+
+
+def counter_lines(name: str, help: str, label: str, values: Dict[str, Dict[str, float]], field: str,
+                  kind: str = "counter") -> List[str]:
+    """Exposition lines for `values` = {label value: stats dict}, reading `field` from each."""
+    out = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for key in sorted(values):
+        v = values[key].get(field)
+        if v is not None:
+            out.append(f'{name}{{{label}="{_escape(key)}"}} {_num(v)}')
+    return out
+
+
+@REGISTRY.collector
+def _upstream_metrics() -> List[str]:
+    from .rate_limit import limiter_stats
+    from .hedge import hedge_stats
+
+    lim, hedge = limiter_stats(), hedge_stats()
+    return (
+        counter_lines("c2c_upstream_calls_total", "Calls to each upstream.", "upstream", lim, "calls")
+        + counter_lines("c2c_upstream_errors_total", "Upstream calls that failed after retries.", "upstream",
+                        lim, "errors")
+        + counter_lines("c2c_upstream_throttled_total", "Throttled upstream responses (429/503, Retry-After).",
+                        "upstream", lim, "throttled")
+        + counter_lines("c2c_upstream_transient_total", "Transient upstream failures (resets, timeouts, 5xx).",
+                        "upstream", lim, "transient")
+        + counter_lines("c2c_upstream_retries_total", "Upstream retries.", "upstream", lim, "retries")
+        + counter_lines("c2c_upstream_inflight", "Upstream calls in flight.", "upstream", lim, "inflight", "gauge")
+        + counter_lines("c2c_upstream_concurrency_limit", "Current AIMD concurrency window.", "upstream",
+                        lim, "concurrency_limit", "gauge")
+        + counter_lines("c2c_upstream_timeouts_total", "Upstream calls that hit their deadline.", "upstream",
+                        hedge, "timeouts")
+        + counter_lines("c2c_upstream_hedged_total", "Hedged duplicate requests sent.", "upstream", hedge, "hedged")
+        + counter_lines("c2c_upstream_hedge_wins_total", "Hedged requests that answered first.", "upstream",
+                        hedge, "hedge_wins")
+    )
+
+
+@REGISTRY.collector
+def _article_cache_metrics() -> List[str]:
+    from .search_tools import article_cache_stats
+
+    st = {"articles": article_cache_stats()}
+    return (
+        counter_lines("c2c_article_cache_hits_total", "Shared article cache hits.", "cache", st, "hits")
+        + counter_lines("c2c_article_cache_misses_total", "Shared article cache misses.", "cache", st, "misses")
+        + counter_lines("c2c_article_cache_hit_ratio", "Shared article cache hit ratio since start.", "cache",
+                        st, "hit_ratio", "gauge")
+        + counter_lines("c2c_article_cache_items", "Items in the shared article cache.", "cache", st, "items",
+                        "gauge")
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the console
+
+
+def serve_metrics(port: int = 9464, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a daemon thread; returns the server (call .shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, int(port)), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,187 @@
+import csv
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    topic TEXT,
+    unit TEXT NOT NULL,
+    week INTEGER,
+    lesson INTEGER,
+    lesson_title TEXT,
+    position INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    bloom TEXT,
+    difficulty TEXT,
+    item TEXT NOT NULL,
+    UNIQUE (unit, position)
+);
+CREATE INDEX IF NOT EXISTS items_unit ON items (unit);
+CREATE INDEX IF NOT EXISTS items_week_lesson ON items (week, lesson);
+CREATE INDEX IF NOT EXISTS items_bloom_difficulty ON items (bloom, difficulty);
+CREATE INDEX IF NOT EXISTS items_difficulty ON items (difficulty);
+"""
+
+_FILTERS = ("topic", "unit", "week", "lesson", "type", "bloom", "difficulty")
+_CSV_FIELDS = ("topic", "unit", "week", "lesson", "lesson_title", "position", "type", "bloom", "difficulty",
+               "question", "choice_a", "choice_b", "choice_c", "choice_d", "answer", "rationale", "prompt")
+
+Filter = Union[None, str, int, Sequence]
+
+_FETCH_ROWS = 500  # rows per fetchmany() while streaming a query
+
+
+class QuizBank:
+    """
+    Every normalized quiz item of a course in one SQLite file (`<out>/quiz_bank.sqlite`),
+    indexed by lesson, bloom level and difficulty. Re-adding a lesson replaces its
+    items, so resumed and incremental builds keep exactly one copy per lesson.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    # ---------- writes ----------
+    def add_quiz(self, unit: str, quiz: Dict, week: Optional[int] = None, lesson: Optional[int] = None,
+                 title: Optional[str] = None, topic: Optional[str] = None) -> int:
+        """Store (or replace) the items of one lesson's quiz; returns the number of items."""
+        rows = [
+            (topic, unit, week, lesson, title, pos, it.get("type", "mcq"), it.get("bloom"), it.get("difficulty"),
+             json.dumps(it, ensure_ascii=False))
+            for pos, it in enumerate(quiz.get("items", []))
+        ]
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM items WHERE unit = ?", (unit,))
+            self._db.executemany(
+                "INSERT INTO items (topic, unit, week, lesson, lesson_title, position, type, bloom, difficulty, item)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def retain(self, units: Iterable[str]) -> int:
+        """Drop lessons that are no longer in the syllabus; returns the number of items removed."""
+        keep = sorted(set(units))
+        with self._lock, self._db:
+            if not keep:
+                return self._db.execute("DELETE FROM items").rowcount
+            marks = ",".join("?" * len(keep))
+            return self._db.execute(f"DELETE FROM items WHERE unit NOT IN ({marks})", keep).rowcount
+
+    # ---------- reads ----------
+    @staticmethod
+    def _where(filters: Dict[str, Filter]):
+        unknown = set(filters) - set(_FILTERS)
+        if unknown:
+            raise ValueError(f"unknown quiz bank filter(s): {', '.join(sorted(unknown))}")
+        clauses, args = [], []
+        for name in _FILTERS:
+            value = filters.get(name)
+            if value is None or value == "" or value == []:
+                continue
+            values = [value] if isinstance(value, (str, int)) else list(value)
+            clauses.append(f"{name} IN ({','.join('?' * len(values))})")
+            args += values
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def query(self, limit: Optional[int] = None, **filters: Filter) -> Iterator[Dict]:
+        """
+        Items matching every given filter (a value or a list of values per field:
+        topic, unit, week, lesson, type, bloom, difficulty), in syllabus order.
+        Each item carries its lesson metadata next to the normalized fields.
+        Rows are streamed in chunks, so an export never holds every match in memory.
+        """
+        where, args = self._where(filters)
+        sql = ("SELECT topic, unit, week, lesson, lesson_title, position, item FROM items"
+               f"{where} ORDER BY week, lesson, unit, position")
+        if limit:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        with self._lock:
+            cur = self._db.execute(sql, args)
+        try:
+            while True:
+                # the lock is only held per chunk, never while the caller consumes items
+                with self._lock:
+                    rows = cur.fetchmany(_FETCH_ROWS)
+                if not rows:
+                    return
+                for topic, unit, week, lesson, title, pos, item in rows:
+                    rec = {"topic": topic, "unit": unit, "week": week, "lesson": lesson, "lesson_title": title,
+                           "position": pos}
+                    rec.update(json.loads(item))
+                    yield rec
+        finally:
+            with self._lock:
+                try:
+                    cur.close()
+                except sqlite3.ProgrammingError:
+                    pass  # the bank was closed first
+
+    def count(self, **filters: Filter) -> int:
+        where, args = self._where(filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM items{where}", args).fetchone()[0]
+
+    def summary(self) -> Dict:
+        """Item counts overall, by type and by bloom level x difficulty (for the manifest)."""
+        with self._lock:
+            by_type = dict(self._db.execute("SELECT type, COUNT(*) FROM items GROUP BY type").fetchall())
+            grid = self._db.execute(
+                "SELECT bloom, difficulty, COUNT(*) FROM items WHERE type = 'mcq' GROUP BY bloom, difficulty"
+            ).fetchall()
+            lessons = self._db.execute("SELECT COUNT(DISTINCT unit) FROM items").fetchone()[0]
+        by_bloom: Dict[str, Dict[str, int]] = {}
+        for bloom, diff, n in grid:
+            by_bloom.setdefault(bloom, {})[diff] = n
+        return {"items": sum(by_type.values()), "lessons": lessons, "by_type": by_type, "by_bloom": by_bloom}
+
+    # ---------- bulk export ----------
+    def export(self, path: str, limit: Optional[int] = None, **filters: Filter) -> int:
+        """Write matching items to .jsonl, .json or .csv (by extension, one row per item); returns the count."""
+        p = Path(path)
+        fmt = p.suffix.lower().lstrip(".")
+        if fmt not in ("jsonl", "json", "csv"):
+            raise ValueError(f"unsupported export format: {p.suffix or path} (use .jsonl, .json or .csv)")
+        p.parent.mkdir(parents=True, exist_ok=True)
+        items = self.query(limit=limit, **filters)
+        n = 0
+        with p.open("w", encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+            if fmt == "jsonl":
+                for it in items:
+                    f.write(json.dumps(it, ensure_ascii=False) + "\n")
+                    n += 1
+            elif fmt == "json":
+                # written item by item: the same document json.dump would produce, without the list
+                f.write('{"items": [')
+                for it in items:
+                    f.write((", " if n else "") + json.dumps(it, ensure_ascii=False))
+                    n += 1
+                f.write("]}")
+            else:
+                w = csv.DictWriter(f, fieldnames=_CSV_FIELDS, extrasaction="ignore")
+                w.writeheader()
+                for it in items:
+                    w.writerow(_csv_row(it))
+                    n += 1
+        return n
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _csv_row(it: Dict) -> Dict:
+    row = dict(it)
+    choices: List[str] = list(it.get("choices") or [])
+    for i, key in enumerate(("choice_a", "choice_b", "choice_c", "choice_d")):
+        row[key] = choices[i] if i < len(choices) else ""
+    if isinstance(it.get("answer"), int):
+        row["answer"] = "abcd"[it["answer"]] if 0 <= it["answer"] < 4 else it["answer"]
+    return row
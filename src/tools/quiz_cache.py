@@ -0,0 +1,38 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .metrics import cache_event
+
+
+def quiz_key(title: str, objectives: List[str]) -> str:
+    raw = json.dumps({"title": title, "objectives": list(objectives or [])}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class QuizCache:
+    """Normalized quizzes from earlier builds, keyed by lesson title + objectives."""
+
+    def __init__(self, root: str = ".cache/quizzes"):
+        self.root = Path(root)
+
+    def get(self, title: str, objectives: List[str]) -> Optional[Dict]:
+        try:
+            quiz = json.loads((self.root / f"{quiz_key(title, objectives)}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            quiz = None
+        cache_event("quizzes", quiz is not None)
+        return quiz
+
+    def put(self, title: str, objectives: List[str], quiz: Dict):
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.root / f"{quiz_key(title, objectives)}.json"
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(quiz, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass  # the cache is best-effort
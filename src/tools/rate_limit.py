@@ -0,0 +1,236 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Defaults per upstream; overridable through the `limits` block of settings.yaml.
+_DEFAULTS: Dict[str, Dict] = {
+    "wikipedia": {"rate": 10.0, "burst": 10, "max_concurrency": 8, "retries": 4},
+    "openai": {"rate": 5.0, "burst": 5, "max_concurrency": 4, "retries": 4},
+}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttle(exc: BaseException) -> bool:
+    """True for errors that mean 'slow down' (429/503 or a Retry-After, provider rate limits, overloaded API)."""
+    if _status_code(exc) in (429, 503) or _retry_after(exc) is not None:
+        return True
+    name = type(exc).__name__
+    # openai.RateLimitError; wikipedia.HTTPTimeoutError ("Pool queue is full" / API timed out)
+    return name in ("RateLimitError", "HTTPTimeoutError")
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Throttles plus network-level failures worth one more try."""
+    if is_throttle(exc):
+        return True
+    code = _status_code(exc)
+    if code is not None and code >= 500:
+        return True
+    name = type(exc).__name__
+    return name in ("ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout",
+                    "APIConnectionError", "APITimeoutError", "TimeoutError")
+
+
+class DeadlinePassed(TimeoutError):
+    """The caller's deadline passed before an attempt could start; never retried."""
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        val = headers.get("retry-after") or headers.get("Retry-After")
+        return float(val) if val is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: float = 1.0) -> float:
+        """Block until `n` tokens are available; returns seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return waited
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket for request rate plus an AIMD concurrency window:
+    every success grows the window by 1/window, every throttle (429/503 or a
+    provider rate limit) halves it. Other transient errors (resets, timeouts,
+    5xx) say nothing about capacity: they are counted as `transient` and leave
+    the window alone. Both are retried with full-jitter exponential backoff.
+    """
+
+    def __init__(self, name: str, rate: float = 10.0, burst: float = 10, max_concurrency: int = 8,
+                 min_concurrency: int = 1, retries: int = 4, base_delay: float = 0.5, max_delay: float = 20.0):
+        self.name = name
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._counts = {"calls": 0, "ok": 0, "throttled": 0, "transient": 0, "retries": 0, "errors": 0,
+                        "expired": 0}
+        self._wait_s = 0.0
+        self.configure(rate=rate, burst=burst, max_concurrency=max_concurrency, min_concurrency=min_concurrency,
+                       retries=retries, base_delay=base_delay, max_delay=max_delay)
+
+    def configure(self, rate: float = 10.0, burst: float = 10, max_concurrency: int = 8, min_concurrency: int = 1,
+                  retries: int = 4, base_delay: float = 0.5, max_delay: float = 20.0):
+        config = (rate, burst, max_concurrency, min_concurrency, retries, base_delay, max_delay)
+        with self._cond:
+            if getattr(self, "_config", None) == config:
+                return  # keep the learned window when settings are re-applied unchanged
+            self._config = config
+            self.bucket = TokenBucket(rate, burst)
+            self.max_concurrency = max(1, int(max_concurrency))
+            self.min_concurrency = max(1, min(int(min_concurrency), self.max_concurrency))
+            self.retries = max(0, int(retries))
+            self.base_delay = float(base_delay)
+            self.max_delay = float(max_delay)
+            # start in the middle and let AIMD find the sustainable level
+            self._window = float(max(self.min_concurrency, self.max_concurrency // 2))
+            self._cond.notify_all()
+
+    def _enter(self, t_end: Optional[float] = None):
+        t0 = time.monotonic()
+        with self._cond:
+            while self._inflight >= int(self._window):
+                if t_end is None:
+                    self._cond.wait()
+                    continue
+                left = t_end - time.monotonic()
+                if left <= 0:
+                    self._counts["expired"] += 1
+                    self._wait_s += time.monotonic() - t0
+                    raise DeadlinePassed(f"{self.name}: deadline passed while queued")
+                self._cond.wait(left)
+            self._inflight += 1
+            self._wait_s += time.monotonic() - t0
+
+    def _leave(self, outcome: str):
+        with self._cond:
+            self._inflight -= 1
+            self._counts[outcome] += 1
+            if outcome == "ok":
+                self._window = min(self.max_concurrency, self._window + 1.0 / self._window)
+            elif outcome == "throttled":
+                self._window = max(self.min_concurrency, self._window / 2.0)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        hinted = _retry_after(exc)
+        if hinted is not None:
+            return min(self.max_delay, hinted)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable, *args, **kwargs):
+        return self.call_until(None, fn, *args, **kwargs)
+
+    def call_until(self, t_end: Optional[float], fn: Callable, *args, **kwargs):
+        """
+        `call` bounded by a caller's deadline (a time.monotonic() value, or None):
+        no attempt starts and no backoff sleeps past `t_end`, so a caller that gave
+        up (e.g. a hedger's FetchTimeout) does not keep a slot busy with retries.
+        """
+        with self._cond:
+            self._counts["calls"] += 1
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            with self._cond:
+                self._wait_s += waited
+                if t_end is not None and time.monotonic() >= t_end:
+                    self._counts["expired"] += 1
+                    raise DeadlinePassed(f"{self.name}: deadline passed before the request could start")
+            self._enter(t_end)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    # the upstream answered (e.g. PageError); not a capacity signal
+                    self._leave("errors")
+                    raise
+                self._leave("throttled" if is_throttle(e) else "transient")
+                if attempt >= self.retries:
+                    with self._cond:
+                        self._counts["errors"] += 1
+                    raise
+                delay = self._backoff(attempt, e)
+                if t_end is not None and time.monotonic() + delay >= t_end:
+                    with self._cond:
+                        self._counts["expired"] += 1
+                    raise  # the retry could not start before the deadline
+                with self._cond:
+                    self._counts["retries"] += 1
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._leave("ok")
+            return result
+
+    def stats(self) -> Dict:
+        with self._cond:
+            out = dict(self._counts)
+            out.update({
+                "inflight": self._inflight,
+                "concurrency_limit": round(self._window, 2),
+                "max_concurrency": self.max_concurrency,
+                "rate": self.bucket.rate,
+                "wait_seconds": round(self._wait_s, 3),
+            })
+            return out
+
+
+_LIMITERS: Dict[str, AdaptiveLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter(name: str) -> AdaptiveLimiter:
+    """Process-wide limiter for an upstream; shared by every concurrent build."""
+    with _LIMITERS_LOCK:
+        lim = _LIMITERS.get(name)
+        if lim is None:
+            lim = AdaptiveLimiter(name, **_DEFAULTS.get(name, {}))
+            _LIMITERS[name] = lim
+        return lim
+
+
+def configure_limiters(limits: Optional[Dict]):
+    """Apply the `limits` block from settings.yaml, e.g. {"wikipedia": {"rate": 5}}."""
+    for name, opts in (limits or {}).items():
+        if isinstance(opts, dict):
+            merged = dict(_DEFAULTS.get(name, {}))
+            merged.update(opts)
+            limiter(name).configure(**merged)
+
+
+def limiter_stats() -> Dict[str, Dict]:
+    with _LIMITERS_LOCK:
+        items = list(_LIMITERS.items())
+    return {name: lim.stats() for name, lim in items}
@@ -1,7 +1,17 @@
 import re
-from typing import List, Dict
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Optional
+from urllib.parse import quote
 import wikipedia
 from youtube_transcript_api import YouTubeTranscriptApi
+from .rate_limit import limiter
+from .hedge import hedger, install_request_timeout
+from .corpus_tools import CorpusIndex, WIKI_URL
+
+# the wikipedia package issues requests.get() without a timeout
+install_request_timeout(wikipedia.wikipedia, "wikipedia")
 
 _YT_PATTERNS = [
     re.compile(r"(?:v=)([A-Za-z0-9_\-]{11})"),
@@ -16,20 +26,193 @@ def _extract_yt_id(s: str) -> str | None:
             return m.group(1)
     return s if len(s) == 11 else None
 
+
+class _ArticleCache:
+    """
+    Process-wide LRU of fetched pages/summaries, shared by concurrent builds.
+    Concurrent misses on the same key wait for the single in-flight fetch.
+    Failures are not cached.
+    """
+
+    def __init__(self, max_items: int = 256):
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[tuple, object]" = OrderedDict()
+        self._inflight: Dict[tuple, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fetch(self, key: tuple, fetch: Callable):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+        if not owner:
+            return fut.result()
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.max_items > 0:
+                self._items[key] = value
+                while len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+        fut.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self._items),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_ARTICLES = _ArticleCache()
+
+
+def configure_article_cache(max_items: int):
+    _ARTICLES.max_items = int(max_items)
+
+
+def article_cache_stats() -> Dict:
+    return _ARTICLES.stats()
+
+
+_BACKENDS: Dict[str, CorpusIndex] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def content_backend(content_cfg: Optional[Dict]) -> Optional[CorpusIndex]:
+    """
+    Resolve the `content` block of settings.yaml. Returns a shared CorpusIndex when
+    backend is "corpus", or None for live Wikipedia.
+    """
+    content_cfg = content_cfg or {}
+    if str(content_cfg.get("backend", "wikipedia")).lower() != "corpus":
+        return None
+    path = str(content_cfg.get("corpus_path") or "data/wiki_corpus.sqlite")
+    with _BACKENDS_LOCK:
+        idx = _BACKENDS.get(path)
+        if idx is None:
+            idx = _BACKENDS[path] = CorpusIndex(path)
+        return idx
+
+
+class SearchHit(dict):
+    """
+    One search result: title, url and source from the search response, usable as the
+    plain dict callers expect. The article itself is only downloaded on first `.page`
+    access (through SearchTools.wiki_page, so the article cache is shared) and memoized.
+    """
+
+    def __init__(self, st: "SearchTools", title: str, url: str, source: str = "wikipedia"):
+        super().__init__(title=title, url=url, source=source)
+        self._st = st
+        self._page = None
+
+    @property
+    def page(self):
+        if self._page is None:
+            self._page = self._st.wiki_page(self["title"])
+        return self._page
+
+
 class SearchTools:
-    def wiki_search(self, query: str, max_results: int = 5) -> List[Dict]:
+    """
+    Wikipedia/YouTube lookups. Live Wikipedia traffic goes through the shared 'wikipedia' limiter
+    and hedger (per-call deadline, p95-hedged duplicate requests); with a `backend` (CorpusIndex)
+    search and pages are served from the local index instead.
+    With cache=True results are shared with every other build in the process.
+    """
+
+    def __init__(self, cache: bool = True, backend: Optional[CorpusIndex] = None):
+        self.cache = cache
+        self.backend = backend
+        self._tag = f"corpus:{backend.path}" if backend is not None else "wikipedia"
+
+    def _cached(self, key: tuple, fetch: Callable):
+        key = (self._tag,) + key
+        return _ARTICLES.get_or_fetch(key, fetch) if self.cache else fetch()
+
+    @staticmethod
+    def _live(fn: Callable, *args, **kwargs):
+        """One live Wikipedia call: deadline + hedging around the rate limiter (which stops at the deadline)."""
+        return hedger("wikipedia").call_bounded(limiter("wikipedia").call_until, fn, *args, **kwargs)
+
+    def _search_titles(self, query: str, max_results: int) -> List[str]:
+        if self.backend is not None:
+            return self.backend.search(query, results=max_results)
+        return self._live(wikipedia.search, query, results=max_results)
+
+    def search_titles(self, query: str, max_results: int = 5) -> List[str]:
+        """Result titles only (cached); wiki_search and speculative prefetch share this entry."""
+        return self._cached(("search", query, max_results), lambda: self._search_titles(query, max_results))
+
+    def page_url(self, title: str) -> str:
+        if self.backend is not None:
+            return WIKI_URL + title.replace(" ", "_")  # as stored by CorpusIndex.ingest
+        return WIKI_URL + quote(title.replace(" ", "_"), safe="/:(),'!*")
+
+    def wiki_search(self, query: str, max_results: int = 5) -> List[SearchHit]:
+        """
+        Lazy hits: title and URL come from the search response and no article is
+        downloaded here. A hit whose page fails to load (missing, ambiguous title)
+        raises on `.page`; the lesson fetch then moves on to a spare hit.
+        """
         try:
-            titles = wikipedia.search(query, results=max_results)
-            out = []
-            for t in titles:
-                try:
-                    page = wikipedia.page(t, auto_suggest=False, redirect=True)
-                    out.append({"title": page.title, "url": page.url, "source": "wikipedia"})
-                except Exception:
-                    continue
-            return out
+            titles = self.search_titles(query, max_results)
         except Exception:
             return []
+        # disambiguation pages never make a usable lesson source
+        return [SearchHit(self, t, self.page_url(t)) for t in titles if not t.endswith("(disambiguation)")]
+
+    def wiki_page(self, title: str):
+        """Fetch a page and its content (content is lazy in the wikipedia package, so load it here)."""
+        if self.backend is not None:
+            return self._cached(("page", title), lambda: self.backend.page(title))
+
+        def _fetch():
+            page = wikipedia.page(title, auto_suggest=False, redirect=True)
+            _ = page.content
+            return page
+        return self._cached(("page", title), lambda: self._live(_fetch))
+
+    def wiki_summary(self, title: str, sentences: int = 6) -> str:
+        if self.backend is not None:
+            return self._cached(("summary", title, sentences), lambda: self.backend.summary(title, sentences))
+        return self._cached(
+            ("summary", title, sentences),
+            lambda: self._live(wikipedia.summary, title, sentences=sentences),
+        )
+
+    def clear_caches(self):
+        """The wikipedia package memoizes search/summary forever; drop those caches."""
+        for fn in (wikipedia.search, wikipedia.summary):
+            clear = getattr(fn, "clear_cache", None)
+            if clear:
+                clear()
 
     def youtube_transcript_text(self, url_or_id: str, languages: tuple[str, ...] = ("en",)) -> str:
         vid = _extract_yt_id(url_or_id)
@@ -1,11 +1,24 @@
+import math
 import re
-from typing import List
+from typing import Dict, List
+
+import numpy as np
 
 _SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z][a-z0-9'-]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can for from has have in into is it its of on or that the their "
+    "them then there these they this to was were which while who will with within without also such than "
+    "other more most some many may might one two used use using between about after before during over "
+    "under both each how what when where why not only however often".split()
+)
 
 def _sentences(text: str) -> List[str]:
     return [s.strip() for s in _SENT_SPLIT.split(text.strip()) if s.strip()]
 
+def _terms(text: str) -> List[str]:
+    return [w for w in _WORD.findall((text or "").lower()) if w not in _STOPWORDS]
+
 class TextTools:
     def clean(self, text: str) -> str:
         return re.sub(r"\s+", " ", text or " ").strip()
@@ -43,3 +56,123 @@ class TextTools:
         syll = sum(max(1, len(re.findall(r"[aeiouyAEIOUY]+", w))) for w in words)
         W = max(1, len(words))
         return 206.835 - 1.015 * (W / sents) - 84.6 * (syll / W)
+
+    # ---------- extractive key concepts ----------
+    def key_concepts(self, lessons: List[Dict], k: int = 5, candidates: int = 40) -> List[List[str]]:
+        """
+        Rank sentences for a batch of lessons at once and return the top `k` per lesson.
+        Each lesson is {"title", "query" (objectives), "texts": [summary, section, ...]}.
+
+        The batch's sentences share one sparse TF-IDF matrix (COO arrays, no
+        per-sentence Python scoring), but document frequencies, IDF and scores are
+        computed per lesson, so a lesson ranks the same whether it comes alone or
+        with others. Relevance is cosine similarity to the lesson's title (weighted
+        twice) plus objectives, centrality is TextRank over the lesson's top
+        `candidates` sentences, and earlier sentences get a small lead bonus.
+        Near-duplicates of an already picked sentence are skipped.
+        """
+        sents: List[str] = []
+        owner: List[int] = []
+        position: List[int] = []
+        for li, lesson in enumerate(lessons):
+            pos = 0
+            for text in lesson.get("texts") or []:
+                for sent in _sentences(text or ""):
+                    if 40 <= len(sent) <= 400:
+                        sents.append(sent)
+                        owner.append(li)
+                        position.append(pos)
+                        pos += 1
+        out: List[List[str]] = [[] for _ in lessons]
+        if not sents:
+            return out
+
+        terms = [_terms(sent) for sent in sents]
+        # sorted vocabulary: a lesson's terms keep the same relative order in any batch,
+        # so its float sums run in the same order and the ranking is bit-for-bit stable
+        vocab = {t: j for j, t in enumerate(sorted({t for ts in terms for t in ts}))}
+        rows = [si for si, ts in enumerate(terms) for _ in ts]
+        cols = [vocab[t] for ts in terms for t in ts]
+        if not vocab:
+            return [[_as_sentence(s) for s, o in zip(sents, owner) if o == li][:k] for li in range(len(lessons))]
+
+        n_lessons, n, v = len(lessons), len(sents), len(vocab)
+        owner_a = np.asarray(owner)
+        # term frequencies -> sublinear tf * per-lesson idf, L2-normalized per sentence
+        keys = np.asarray(rows, dtype=np.int64) * v + np.asarray(cols, dtype=np.int64)
+        keys, tf = np.unique(keys, return_counts=True)
+        r, c = keys // v, keys % v
+        lr = owner_a[r]
+        df = np.bincount(lr * v + c, minlength=n_lessons * v).reshape(n_lessons, v)
+        n_sents = np.bincount(owner_a, minlength=n_lessons)[:, None]
+        idf = np.log((1.0 + n_sents) / (1.0 + df)) + 1.0
+        w = (1.0 + np.log(tf)) * idf[lr, c]
+        norms = np.sqrt(np.bincount(r, weights=w * w, minlength=n))
+        w = w / np.where(norms > 0, norms, 1.0)[r]
+
+        # one query vector per lesson over the shared vocabulary
+        q = np.zeros((n_lessons, v))
+        for li, lesson in enumerate(lessons):
+            query = lesson.get("query") or ""
+            title = lesson.get("title") or ""
+            for t in _terms(query) + 2 * _terms(title):
+                j = vocab.get(t)
+                if j is not None:
+                    q[li, j] += idf[li, j]
+            qn = math.sqrt(math.fsum(q[li, np.flatnonzero(q[li])] ** 2))
+            if qn > 0:
+                q[li] /= qn
+        relevance = np.bincount(r, weights=w * q[lr, c], minlength=n)
+        lead = 1.0 / (1.0 + np.asarray(position, dtype=float))
+
+        for li in range(len(lessons)):
+            idx = np.flatnonzero(owner_a == li)
+            if idx.size == 0:
+                continue
+            pre = relevance[idx] + 0.1 * lead[idx]
+            cand = np.sort(idx[np.argsort(-pre, kind="stable")[:candidates]])
+            # dense block for the candidates only: |cand| x |local vocab|
+            local = np.isin(r, cand)
+            rr, cc, ww = r[local], c[local], w[local]
+            ri = np.searchsorted(cand, rr)
+            uc, ci = np.unique(cc, return_inverse=True)
+            x = np.zeros((cand.size, uc.size))
+            x[ri, ci] = ww
+            sim = x @ x.T
+            np.fill_diagonal(sim, 0.0)
+            centrality = _textrank(sim)
+            score = (0.6 * _unit_scale(relevance[cand]) + 0.3 * _unit_scale(centrality)
+                     + 0.1 * lead[cand])
+            picked: List[int] = []
+            for j in np.argsort(-score, kind="stable"):
+                if len(picked) >= k:
+                    break
+                if picked and sim[j, picked].max() > 0.6:
+                    continue
+                picked.append(int(j))
+            out[li] = [_as_sentence(sents[cand[j]]) for j in picked]
+        return out
+
+
+def _textrank(sim: "np.ndarray", damping: float = 0.85, iters: int = 30) -> "np.ndarray":
+    n = sim.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_w = sim.sum(axis=1, keepdims=True)
+    m = np.divide(sim, out_w, out=np.zeros_like(sim), where=out_w > 0)
+    p = np.full(n, 1.0 / n)
+    for _ in range(iters):
+        p = (1.0 - damping) / n + damping * (m.T @ p)
+    return p
+
+
+def _unit_scale(a: "np.ndarray") -> "np.ndarray":
+    if a.size == 0:
+        return a
+    lo, hi = float(a.min()), float(a.max())
+    return (a - lo) / (hi - lo) if hi > lo else np.zeros_like(a)
+
+
+def _as_sentence(s: str) -> str:
+    s = s.strip()
+    return s if s.endswith((".", "!", "?")) else s + "."
@@ -0,0 +1,134 @@
+import threading
+from typing import Dict, Optional
+
+# USD per 1M tokens (prompt, completion). Unknown models are counted in tokens only.
+_PRICES: Dict[str, tuple] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+
+def _price(model: Optional[str], prices: Dict[str, tuple]) -> Optional[tuple]:
+    if not model:
+        return None
+    name = model.split("/")[-1]
+    if name in prices:
+        return prices[name]
+    # dated snapshots, e.g. gpt-4o-mini-2024-07-18
+    for key in sorted(prices, key=len, reverse=True):
+        if name.startswith(key):
+            return prices[key]
+    return None
+
+
+def _blank() -> Dict:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost_usd": 0.0}
+
+
+def crew_tokens(agents) -> Dict[int, tuple]:
+    """(prompt, completion, requests) counters of each CrewAI agent, keyed by id()."""
+    out: Dict[int, tuple] = {}
+    for agent in agents:
+        proc = getattr(agent, "_token_process", None)
+        if agent is None or proc is None:
+            continue
+        s = proc.get_summary()
+        out[id(agent)] = (int(getattr(s, "prompt_tokens", 0) or 0), int(getattr(s, "completion_tokens", 0) or 0),
+                          int(getattr(s, "successful_requests", 0) or 0))
+    return out
+
+
+class UsageMeter:
+    """
+    Token and cost accounting for one build, aggregated per stage and per lesson.
+    With a budget set, `exhausted` turns true once either limit is reached and the
+    build switches to deterministic fallbacks for the remaining LLM steps.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_cost_usd: Optional[float] = None,
+                 prices: Optional[Dict[str, tuple]] = None):
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.prices = dict(_PRICES)
+        self.prices.update({k: tuple(v) for k, v in (prices or {}).items()})
+        self._lock = threading.Lock()
+        self._total = _blank()
+        self._stages: Dict[str, Dict] = {}
+        self._lessons: Dict[str, Dict] = {}
+        self._degraded: list = []
+
+    @classmethod
+    def from_cfg(cls, cfg: Optional[Dict]) -> "UsageMeter":
+        b = (cfg or {}).get("budget") or {}
+        return cls(max_tokens=b.get("max_tokens"), max_cost_usd=b.get("max_cost_usd"), prices=b.get("prices"))
+
+    def record(self, stage: str, prompt_tokens: int, completion_tokens: int, model: Optional[str] = None,
+               lesson: Optional[str] = None, calls: int = 1):
+        prompt_tokens, completion_tokens = int(prompt_tokens or 0), int(completion_tokens or 0)
+        p = _price(model, self.prices)
+        cost = (prompt_tokens * p[0] + completion_tokens * p[1]) / 1_000_000 if p else 0.0
+        with self._lock:
+            buckets = [self._total, self._stages.setdefault(stage, _blank())]
+            if lesson:
+                buckets.append(self._lessons.setdefault(lesson, _blank()))
+            for b in buckets:
+                b["calls"] += int(calls or 0)
+                b["prompt_tokens"] += prompt_tokens
+                b["completion_tokens"] += completion_tokens
+                b["total_tokens"] += prompt_tokens + completion_tokens
+                b["cost_usd"] += cost
+
+    def record_response(self, stage: str, response, model: Optional[str] = None, lesson: Optional[str] = None):
+        """Record an OpenAI chat completion's `usage` block."""
+        u = getattr(response, "usage", None)
+        if u is None:
+            return
+        self.record(stage, getattr(u, "prompt_tokens", 0), getattr(u, "completion_tokens", 0),
+                    model=getattr(response, "model", None) or model, lesson=lesson)
+
+    def record_crew(self, stage: str, agents, before: Dict[int, tuple], model: Optional[str] = None,
+                    lesson: Optional[str] = None):
+        """
+        Record the tokens `agents` spent since `before` (a `crew_tokens` snapshot
+        taken just ahead of the kickoff). CrewOutput.token_usage cannot be used:
+        it sums each agent's lifetime counters, which pooled agents carry across
+        kickoffs and builds.
+        """
+        prompt = completion = calls = 0
+        for key, (p, c, n) in crew_tokens(agents).items():
+            p0, c0, n0 = before.get(key, (0, 0, 0))
+            prompt += max(0, p - p0)
+            completion += max(0, c - c0)
+            calls += max(0, n - n0)
+        self.record(stage, prompt, completion, model=model, lesson=lesson, calls=calls)
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            if self.max_tokens is not None and self._total["total_tokens"] >= self.max_tokens:
+                return True
+            if self.max_cost_usd is not None and self._total["cost_usd"] >= self.max_cost_usd:
+                return True
+            return False
+
+    def degrade(self, stage: str, lesson: Optional[str] = None):
+        """Note a step that used a fallback because the budget ran out."""
+        with self._lock:
+            self._degraded.append({"stage": stage, "lesson": lesson} if lesson else {"stage": stage})
+
+    def report(self) -> Dict:
+        def _r(b: Dict) -> Dict:
+            return dict(b, cost_usd=round(b["cost_usd"], 6))
+
+        with self._lock:
+            return {
+                "total": _r(self._total),
+                "stages": {k: _r(v) for k, v in self._stages.items()},
+                "lessons": {k: _r(v) for k, v in self._lessons.items()},
+                "budget": {"max_tokens": self.max_tokens, "max_cost_usd": self.max_cost_usd},
+                "degraded": list(self._degraded),
+            }
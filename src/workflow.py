@@ -1,24 +1,32 @@
 from pathlib import Path
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 from crewai import Crew, Process, Task
-import wikipedia
-import json, shutil
-
-from .agents import supervisor, curator, designer, note_maker, assessor, assembler, auditor, topic_refiner
+import gc, json, os, queue, re, shutil, threading, time
+
+from .agents import topic_refiner, assessor
+from .pool import agent_pool
+from .checkpoint import Checkpoint
+from .crew_limits import CrewLimits, CrewLimitExceeded
+from .progress import ProgressModel, timing_history
+from .pipeline import StagedPipeline
+from .prefetch import SpeculativeFetch
+from .render import Renderer, parse_formats
 from .tasks import t_curate, t_syllabus, t_summarize, t_quiz, t_assemble, t_qa, t_refine
-from .tools.search_tools import SearchTools
+from .tools.search_tools import SearchTools, configure_article_cache, content_backend
 from .tools.license_tools import LicenseTools, DEFAULT_ALLOWED
 from .tools.export_tools import ExportTools
 from .tools.text_tools import TextTools
 from .tools.quiz_validate import normalize_quiz
 from .tools.llm_tools import llm_make_quiz
-
-
-def _pdfify(xt: ExportTools, md_text: str, rel_path_under_course: str, title: Optional[str] = None) -> str:
-    """Create a PDF under course/ and return its course-relative path."""
-    out_abs = (Path("course") / rel_path_under_course).as_posix()
-    xt.write_pdf_from_markdown(md_text, out_abs, title=title)
-    return f"course/{rel_path_under_course}"
+from .tools.llm_router import LlmRouter, RouteExhausted, backend_failed, configure_llm_router, llm_router
+from .tools.rate_limit import configure_limiters, limiter_stats
+from .tools.hedge import configure_hedgers, hedge_stats
+from .tools.metrics import track_build
+from .tools.manifest_tools import ManifestJournal, storage_stats
+from .tools.memory_tools import RssMonitor
+from .tools.usage_tools import UsageMeter, crew_tokens
+from .tools.quiz_cache import QuizCache
+from .tools.quiz_bank import QuizBank
 
 
 def _fallback_spec(topic: str, total_lessons: int) -> Dict:
@@ -74,59 +82,270 @@ def _run_topic_refiner(raw_topic: str, weeks: int, lessons_per_week: int) -> Dic
         return _fallback_spec(raw_topic, total)
 
 
-def _deterministic_build(
-    topic: str,
-    weeks: int,
-    lessons_per_week: int,
-    allow,
-    qz_agent,
-    progress_cb: Optional[Callable[[str, float], None]] = None,
-    lesson_titles: Optional[List[str]] = None
-) -> Dict:
-    if progress_cb:
-        progress_cb("Initializing build", 0.02)
+_CANDIDATE_SECTIONS = [
+    "Overview",
+    "Introduction",
+    "Background",
+    "History",
+    "Principles",
+    "Types",
+    "Applications",
+    "Markets",
+    "Instruments",
+    "Risk",
+    "Regulation",
+    "Examples",
+    "Practice",
+]
+
+
+def _fetch_source(st: SearchTools, src: Dict) -> Dict:
+    """
+    Network step of a lesson: the source page and its lead summary. On failure
+    (including a FetchTimeout past the deadline) page is None and `error` says why.
+    """
+    try:
+        return {"page": st.wiki_page(src["title"]), "summary": st.wiki_summary(src["title"], sentences=6)}
+    except Exception as e:
+        return {"page": None, "summary": None, "error": type(e).__name__}
 
-    # Clean previous runs to avoid stale files / duplicates
-    shutil.rmtree("course", ignore_errors=True)
-    Path("course").mkdir(parents=True, exist_ok=True)
 
-    st, lt, xt, tt = SearchTools(), LicenseTools(), ExportTools(), TextTools()
+def _prepare_lesson(tt: TextTools, src: Dict, fetched: Dict) -> Dict:
+    """CPU step of a lesson: clean the article and pick up to three sections ("axes")."""
+    page = fetched.get("page")
+    try:
+        raw = tt.clean(page.content or "")
+        summary = tt.dedupe_paragraphs(tt.clean(fetched.get("summary") or ""))
+    except Exception:
+        page = None
+        raw = summary = src["title"]
+
+    # Try to build 3 "axes" from meaningful sections
+    axes = []
+    if page is not None:
+        seen = set()
+        for name in _CANDIDATE_SECTIONS:
+            try:
+                sec_txt = page.section(name)
+            except Exception:
+                sec_txt = None
+            if sec_txt:
+                sec_txt = tt.dedupe_paragraphs(tt.clean(sec_txt.strip()))
+                # require a bit of substance
+                if len(sec_txt) > 250 and name not in seen:
+                    axes.append((name, sec_txt))
+                    seen.add(name)
+            if len(axes) >= 3:
+                break
+
+    # Fallback: split long paragraphs into 3 buckets
+    if not axes:
+        paras = [p.strip() for p in raw.split("\n") if len(p.strip()) > 80]
+        if not paras:
+            paras = [p.strip() for p in raw.split("\n") if p.strip()]
+        if not paras:
+            paras = [summary]
+        # split into ~thirds
+        third = max(1, len(paras) // 3)
+        buckets = [paras[:third], paras[third : 2 * third], paras[2 * third :]]
+        labels = ["Foundations", "Practice", "Implications"]
+        for idx, bucket in enumerate(buckets):
+            if not bucket:
+                continue
+            axes.append((labels[idx], "\n\n".join(bucket[:5])))
+        axes = axes[:3]
+
+    return {"summary": summary, "axes": axes}
+
+
+def _compose_lessons(tt: TextTools, jobs: List[Tuple[Dict, Dict, Dict]]) -> List[Tuple[str, Dict]]:
+    """
+    Author a batch of lessons from (lesson, source, fetched) triples; returns
+    (markdown, quiz payload) per lesson. Key concepts for the whole batch are
+    ranked in one pass (TF-IDF relevance to title/objectives + TextRank).
+    """
+    prepared = [_prepare_lesson(tt, src, fetched) for _, src, fetched in jobs]
+    ranked = tt.key_concepts([
+        {"title": l["title"], "query": " ".join(l.get("objectives") or []),
+         "texts": [p["summary"]] + [t for _, t in p["axes"]]}
+        for (l, _, _), p in zip(jobs, prepared)
+    ], k=5)
+    return [_lesson_markdown(l, src, p["summary"], p["axes"], kc or [_first_sentence(p["summary"])])
+            for (l, src, _), p, kc in zip(jobs, prepared, ranked)]
+
+
+def _first_sentence(text: str) -> str:
+    first = (text or "").strip().split(". ", 1)[0].strip()
+    return first if first.endswith(".") else first + "."
+
+
+def _lesson_markdown(l: Dict, src: Dict, summary: str, axes: List[Tuple[str, str]],
+                     key_concepts: List[str]) -> Tuple[str, Dict]:
+    attr = (
+        f"{src['title']} — {src['license']} — {src['url']} — "
+        "License: https://creativecommons.org/licenses/by-sa/4.0/"
+    )
+
+    self_check_lines = [
+        f"1. Define {src['title']} in your own words.",
+        f"2. List two applications or real-world examples of {src['title']}.",
+        f"3. Explain one potential misconception about {src['title']} and correct it.",
+    ]
+
+    # Build lesson markdown (single H1 only)
+    parts = []
+    parts.append(f"# {l['title']}\n")
+    parts.append("## Objectives\n" + "\n".join(f"- {o}" for o in l["objectives"]) + "\n")
+    parts.append("## Overview\n" + summary + "\n")
+    parts.append("## Key Concepts\n" + "\n".join(f"- {c}" for c in key_concepts) + "\n")
+    parts.append("## Core Content")
+    for idx, (name, text) in enumerate(axes, 1):
+        parts.append(f"### {idx}. {name}\n{text}\n")
+    parts.append("## Self-Check\n" + "\n".join(self_check_lines) + "\n")
+    parts.append("## Attribution\n" + attr + "\n")
+    md = "\n".join(parts)
+
+    return md, {
+        "title": l["title"],
+        "objectives": l["objectives"],
+        "notes": (summary + "\n\n" + "\n\n".join(t for _, t in axes))[:3500],
+    }
+
+
+def _write_lesson(rd: Renderer, journal: ManifestJournal, w: Dict, l: Dict, md: str, seconds: float = 0.0) -> float:
+    """Render step of a lesson: write MD plus the selected formats and journal them; returns total lesson seconds."""
+    t0 = time.perf_counter()
+    base = f"lessons/week_{w['week']}/lesson_{l['lesson']}"
+
+    # Write MD + PDF/HTML (avoid duplicate title: the markdown carries the H1)
+    rd.xt.write_text(f"{rd.out}/{base}.md", md)
+    paths = rd.markdown(md, base, title=None, page_title=l["title"])
+
+    secs = seconds + time.perf_counter() - t0
+    journal.record("lessons", f"{rd.out}/{base}.md", "lesson", secs)
+    if "pdf" in paths:
+        journal.record("lesson_pdfs", paths["pdf"], "lesson", secs)
+    if "html" in paths:
+        journal.record("lesson_html", paths["html"], "lesson", secs)
+    return secs
+
+
+def _make_quiz(qz_agent, w: Dict, l: Dict, payload: Dict, usage: Optional[UsageMeter] = None,
+               router: Optional[LlmRouter] = None, quiz_cache: Optional[QuizCache] = None) -> Dict:
+    """LLM step of a lesson: generate and normalize its quiz."""
+    lesson_key = f"week_{w['week']}_lesson_{l['lesson']}"
+    router = router or llm_router()
+    if usage is not None and usage.exhausted:
+        # over budget: reuse a quiz from an earlier build, else a short-answer-only quiz
+        quiz_json = (quiz_cache.get(payload["title"], payload["objectives"]) if quiz_cache else None) or {}
+        quiz_json = normalize_quiz(quiz_json)
+        usage.degrade("quiz", lesson_key)
+    else:
+        quiz_task = Task(
+            description=(
+                "Generate 5 MCQs and 1 short-answer aligned to the lesson. "
+                "Return ONLY strict JSON with fields: "
+                "items[{type,question,choices,answer,rationale,bloom,difficulty},"
+                "{type:'short',prompt}] "
+                f"Title: {payload['title']} Objectives: {payload['objectives']} Notes: {payload['notes']}"
+            ),
+            expected_output="Strict JSON object matching the schema.",
+            agent=qz_agent,
+        )
+        # re-routed per lesson so a backend that failed for an earlier lesson is skipped while it cools down
+        backend = router.apply(qz_agent, "quiz")
+        model = router.model_for("quiz", backend)
+        degraded = False
+        before = crew_tokens([qz_agent])
+        try:
+            Crew(agents=[qz_agent], tasks=[quiz_task], process=Process.sequential, verbose=False).kickoff()
+            if usage is not None:
+                usage.record_crew("quiz", [qz_agent], before, model=model, lesson=lesson_key)
+            raw_out = getattr(quiz_task.output, "raw", quiz_task.output)
+        except Exception as e:
+            # backend down or the quiz route's latency budget hit: later lessons route elsewhere
+            if backend_failed(e):
+                router.mark_failed(backend.name)
+            raw_out = None
+        try:
+            quiz_json = json.loads(raw_out) if isinstance(raw_out, str) else raw_out
+            if not isinstance(quiz_json, dict):
+                raise ValueError("no quiz from the agent")
+        except Exception:
+            try:
+                quiz_json = llm_make_quiz(payload["title"], payload["objectives"], payload["notes"],
+                                          usage=usage, lesson=lesson_key, router=router)
+            except RouteExhausted:
+                # every backend failed within the budget: same fallback as an exhausted token budget
+                quiz_json = (quiz_cache.get(payload["title"], payload["objectives"]) if quiz_cache else None) or {}
+                degraded = True
+        quiz_json = normalize_quiz(quiz_json)
+        if quiz_cache is not None and not degraded:
+            quiz_cache.put(payload["title"], payload["objectives"], quiz_json)
+    return quiz_json
+
+
+def _write_quiz(rd: Renderer, journal: ManifestJournal, w: Dict, l: Dict, quiz_json: Dict,
+                seconds: float = 0.0, bank: Optional[QuizBank] = None, topic: Optional[str] = None) -> float:
+    """Render step of a quiz: JSON + course quiz bank + pretty PDF/HTML; returns total quiz seconds."""
+    t_quiz = time.perf_counter() - seconds
+    base = f"quizzes/week_{w['week']}_lesson_{l['lesson']}"
+    qjson_path = f"{rd.out}/{base}.json"
+    rd.xt.write_json(qjson_path, quiz_json)
+    journal.record("quizzes", qjson_path, "quiz", time.perf_counter() - t_quiz)
+    if bank is not None:
+        bank.add_quiz(f"{w['week']}_{l['lesson']}", quiz_json, week=w["week"], lesson=l["lesson"],
+                      title=l["title"], topic=topic)
+    try:
+        paths = rd.quiz(quiz_json, base, title=f"Quiz – {l['title']}")
+        if "pdf" in paths:
+            journal.record("quiz_pdfs", paths["pdf"], "quiz", time.perf_counter() - t_quiz)
+        if "html" in paths:
+            journal.record("quiz_html", paths["html"], "quiz", time.perf_counter() - t_quiz)
+    except Exception:
+        pass
+    return time.perf_counter() - t_quiz
 
-    total = max(1, weeks * lessons_per_week)
 
-    if progress_cb:
-        progress_cb("Searching open content", 0.06)
-    seeds = st.wiki_search(topic, max_results=max(5, total + 3))
+_UNIT_RE = re.compile(r"week_(\d+)[/_]lesson_(\d+)")
 
-    if progress_cb:
-        progress_cb("Filtering by license", 0.10)
-    curated = []
-    for it in seeds:
-        meta = f"{it.get('title','')} CC-BY-SA"
-        r = lt.check(meta, allow)
+
+def _unit_order(path: str) -> Tuple[int, int]:
+    m = _UNIT_RE.search(path)
+    return (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+
+
+def _search_size(total: int) -> int:
+    """Search hits requested for curation (speculative prefetch must ask for the same number)."""
+    return max(5, total + 3)
+
+
+def _curate(st: SearchTools, lt: LicenseTools, topic: str, allow, total: int) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Search open content for the topic and keep hits whose license is allowed.
+    Returns (sources, spares): the first `total` hits are lesson sources, the rest
+    stand in, in search order, for sources whose page fails to load in the lesson
+    fetch. Search hits are lazy, so nothing is downloaded here.
+    """
+    allowed = []
+    for it in st.wiki_search(topic, max_results=_search_size(total)):
+        r = lt.check(f"{it.get('title','')} CC-BY-SA", allow)
         if r["status"] == "OK":
-            curated.append(
-                {
-                    "title": it["title"],
-                    "url": it["url"],
-                    "license": r["license"],
-                    "source": it["source"],
-                }
-            )
-    if not curated:
-        curated = [
+            allowed.append({"title": it["title"], "url": it["url"], "license": r["license"], "source": it["source"]})
+    if not allowed:
+        allowed = [
             {
                 "title": topic,
-                "url": f"https://en.wikipedia.org/wiki/{topic.replace(' ','_')}",
+                "url": st.page_url(topic),
                 "license": "CC-BY-SA",
                 "source": "wikipedia",
             }
         ]
+    return allowed[:total], allowed[total:]
 
-    # --- Syllabus ---
-    if progress_cb:
-        progress_cb("Constructing syllabus", 0.15)
 
+def _plan_syllabus(topic: str, weeks: int, lessons_per_week: int, curated: List[Dict],
+                   lesson_titles: Optional[List[str]] = None) -> Dict:
     weeks_list = []
     k = 0
     titles_from_sources = [x["title"] for x in curated]
@@ -156,9 +375,14 @@ def _deterministic_build(
             })
         weeks_list.append({"week": i, "lessons": lessons})
 
-    syllabus = {"topic": topic, "weeks": weeks_list}
+    return {"topic": topic, "weeks": weeks_list}
+
 
-    xt.write_json("course/syllabus.json", syllabus)
+def _write_syllabus(rd: Renderer, journal: ManifestJournal, syllabus: Dict):
+    t_stage = time.perf_counter()
+    xt, out = rd.xt, rd.out
+    topic = syllabus["topic"]
+    xt.write_json(f"{out}/syllabus.json", syllabus)
     syllabus_md = (
         f"# {topic}\n"
         + "\n".join(
@@ -168,238 +392,386 @@ def _deterministic_build(
             ]
         )
     )
-    xt.write_text("course/syllabus.md", syllabus_md)
-    syllabus_pdf = _pdfify(xt, syllabus_md, "syllabus.pdf", title=None)
+    xt.write_text(f"{out}/syllabus.md", syllabus_md)
+    paths = rd.markdown(syllabus_md, "syllabus", title=None, page_title=f"{topic} — Syllabus")
+    secs = time.perf_counter() - t_stage
+    journal.record("syllabus_json", f"{out}/syllabus.json", "syllabus", secs)
+    journal.record("syllabus_md", f"{out}/syllabus.md", "syllabus", secs)
+    for fmt, path in paths.items():
+        journal.record(f"syllabus_{fmt}", path, "syllabus", secs)
+
+
+def _reset_out(out: str, incremental: bool = False):
+    """
+    Start a fresh build in `out`. Normally the directory is wiped; with
+    run.incremental only build state goes, so rendered pages whose source is
+    unchanged are kept and not rendered again.
+    """
+    if not incremental:
+        shutil.rmtree(out, ignore_errors=True)
+        return
+    shutil.rmtree(f"{out}/.checkpoint", ignore_errors=True)
+    try:
+        os.remove(f"{out}/.manifest.jsonl")
+    except OSError:
+        pass
 
-    # --- Lessons ---
-    if progress_cb:
-        progress_cb("Authoring lessons", 0.22)
 
-    lesson_md_paths: List[str] = []
-    lesson_pdf_paths: List[str] = []
-    k = 0
-    total_lessons = weeks * lessons_per_week
+def _prune_stale(out: str, journal: ManifestJournal) -> int:
+    """Incremental builds: delete per-lesson files and site pages this build did not write."""
+    arts = journal.artifacts()
+    keep = set(arts) | {s["path"] for a in arts.values() for s in (a.get("sidecars") or {}).values()}
+    removed = 0
+    for sub in ("lessons", "quizzes", "site"):
+        for p in Path(out, sub).rglob("*"):
+            if p.is_file() and p.as_posix() not in keep:
+                p.unlink()
+                removed += 1
+    return removed
 
-    for w in syllabus["weeks"]:
-        for l in w["lessons"]:
-            k += 1
-            src = curated[(k - 1) % len(curated)]
 
-            # Pull Wikipedia content
-            try:
-                page = wikipedia.page(src["title"], auto_suggest=False)
-                raw = tt.clean(page.content or "")
-                summary = tt.dedupe_paragraphs(tt.clean(wikipedia.summary(src["title"], sentences=6)))
-            except Exception:
-                raw = summary = src["title"]
+def _output_formats(cfg: Optional[Dict]):
+    return ((cfg or {}).get("output") or {}).get("formats") or ["pdf"]
 
-            # Try to build 3 "axes" from meaningful sections
-            axes = []
-            try:
-                candidate_sections = [
-                    "Overview",
-                    "Introduction",
-                    "Background",
-                    "History",
-                    "Principles",
-                    "Types",
-                    "Applications",
-                    "Markets",
-                    "Instruments",
-                    "Risk",
-                    "Regulation",
-                    "Examples",
-                    "Practice",
-                ]
-                seen = set()
-                for name in candidate_sections:
-                    try:
-                        sec_txt = page.section(name)  # may NameError if page unset; caught by outer except
-                    except Exception:
-                        sec_txt = None
-                    if sec_txt:
-                        sec_txt = tt.dedupe_paragraphs(tt.clean(sec_txt.strip()))
-                        # require a bit of substance
-                        if len(sec_txt) > 250 and name not in seen:
-                            axes.append((name, sec_txt))
-                            seen.add(name)
-                    if len(axes) >= 3:
-                        break
-            except Exception:
-                pass
-
-            # Fallback: split long paragraphs into 3 buckets
-            if not axes:
-                paras = [p.strip() for p in raw.split("\n") if len(p.strip()) > 80]
-                if not paras:
-                    paras = [p.strip() for p in raw.split("\n") if p.strip()]
-                if not paras:
-                    paras = [summary]
-                # split into ~thirds
-                third = max(1, len(paras) // 3)
-                buckets = [paras[:third], paras[third : 2 * third], paras[2 * third :]]
-                labels = ["Foundations", "Practice", "Implications"]
-                for idx, bucket in enumerate(buckets):
-                    if not bucket:
-                        continue
-                    axes.append((labels[idx], "\n\n".join(bucket[:5])))
-                axes = axes[:3]
-
-            # Key concepts = first sentences from summary + axes (max 5)
-            key_concepts: List[str] = []
-
-            def _first_sents(text: str, limit: int = 2) -> List[str]:
-                sents = [s.strip() for s in text.split(". ") if s.strip()]
-                picked = []
-                for s in sents[:limit]:
-                    if not s.endswith("."):
-                        s += "."
-                    picked.append(s)
-                return picked
-
-            key_concepts.extend(_first_sents(summary, limit=3))
-            for _, txt in axes:
-                if len(key_concepts) >= 5:
-                    break
-                key_concepts.extend(_first_sents(txt, limit=1))
-                key_concepts = key_concepts[:5]
 
-            attr = (
-                f"{src['title']} — {src['license']} — {src['url']} — "
-                "License: https://creativecommons.org/licenses/by-sa/4.0/"
-            )
+def _export_tools(cfg: Optional[Dict]) -> ExportTools:
+    """ExportTools for `output.compact` (whitespace-free JSON) and `output.sidecars` (gzip/zstd copies)."""
+    out_cfg = (cfg or {}).get("output") or {}
+    return ExportTools(compact=bool(out_cfg.get("compact", False)), sidecars=out_cfg.get("sidecars") or ())
 
-            self_check_lines = [
-                f"1. Define {src['title']} in your own words.",
-                f"2. List two applications or real-world examples of {src['title']}.",
-                f"3. Explain one potential misconception about {src['title']} and correct it.",
-            ]
 
-            # Build lesson markdown (single H1 only)
-            parts = []
-            parts.append(f"# {l['title']}\n")
-            parts.append("## Objectives\n" + "\n".join(f"- {o}" for o in l["objectives"]) + "\n")
-            parts.append("## Overview\n" + summary + "\n")
-            parts.append("## Key Concepts\n" + "\n".join(f"- {c}" for c in key_concepts) + "\n")
-            parts.append("## Core Content")
-            for idx, (name, text) in enumerate(axes, 1):
-                parts.append(f"### {idx}. {name}\n{text}\n")
-            parts.append("## Self-Check\n" + "\n".join(self_check_lines) + "\n")
-            parts.append("## Attribution\n" + attr + "\n")
-            md = "\n".join(parts)
-
-            rel_md = f"lessons/week_{w['week']}/lesson_{l['lesson']}.md"
-            rel_pdf = f"lessons/week_{w['week']}/lesson_{l['lesson']}.pdf"
-
-            # Write MD + PDF (avoid duplicate title in the PDF: title=None)
-            xt.write_text(f"course/{rel_md}", md)
-            xt.write_pdf_from_markdown(md, f"course/{rel_pdf}", title=None)
-
-            lesson_md_paths.append(f"course/{rel_md}")
-            lesson_pdf_paths.append(f"course/{rel_pdf}")
-
-            # ----- Quiz per lesson: JSON + pretty PDF -----
-            payload = {
-                "title": l["title"],
-                "objectives": l["objectives"],
-                "notes": (summary + "\n\n" + "\n\n".join(t for _, t in axes))[:3500],
-            }
-            quiz_task = Task(
-                description=(
-                    "Generate 5 MCQs and 1 short-answer aligned to the lesson. "
-                    "Return ONLY strict JSON with fields: "
-                    "items[{type,question,choices,answer,rationale,bloom,difficulty},"
-                    "{type:'short',prompt}] "
-                    f"Title: {payload['title']} Objectives: {payload['objectives']} Notes: {payload['notes']}"
-                ),
-                expected_output="Strict JSON object matching the schema.",
-                agent=qz_agent,
-            )
-            Crew(agents=[qz_agent], tasks=[quiz_task], process=Process.sequential, verbose=False).kickoff()
-            raw_out = getattr(quiz_task.output, "raw", quiz_task.output)
-            try:
-                quiz_json = json.loads(raw_out) if isinstance(raw_out, str) else raw_out
-            except Exception:
-                quiz_json = llm_make_quiz(payload["title"], payload["objectives"], payload["notes"])
-            quiz_json = normalize_quiz(quiz_json)
+def _progress_model(cfg: Optional[Dict], progress_cb: Optional[Callable[[str, float], None]],
+                    units: Dict[str, int]) -> ProgressModel:
+    p_cfg = (cfg or {}).get("progress") or {}
+    return ProgressModel(progress_cb, units, history=timing_history(p_cfg.get("history_path", ".cache/timings.json")),
+                         tick=p_cfg.get("tick_seconds", 1.0))
 
-            qjson_path = f"course/quizzes/week_{w['week']}_lesson_{l['lesson']}.json"
-            qpdf_path = f"course/quizzes/week_{w['week']}_lesson_{l['lesson']}.pdf"
-            xt.write_json(qjson_path, quiz_json)
-            try:
-                xt.quiz_json_to_pdf(quiz_json, qpdf_path, title=f"Quiz – {l['title']}")
-            except Exception:
-                pass
 
-            if progress_cb:
-                progress_cb(
-                    f"Authoring lessons ({k}/{total_lessons})", 0.22 + 0.6 * (k / max(1, total_lessons))
-                )
+def _stage_units(total_lessons: int, with_llm_phases: bool = True) -> Dict[str, int]:
+    """Unit counts per stage for the progress model (refine/crew only when run_pipeline drives them)."""
+    units = {"search": 1, "syllabus": 1, "lesson": total_lessons, "quiz": total_lessons,
+             "reading_list": 1, "qa": 1, "manifest": 1}
+    if with_llm_phases:
+        units = {"refine": 1, "crew": 1, **units}
+    return units
 
-    # --- Reading list ---
-    if progress_cb:
-        progress_cb("Writing reading list", 0.85)
-    reading_md = "# Reading List\n" + "\n".join(
-        [f"- {it['title']} — {it['license']} — {it['url']}" for it in curated]
-    )
-    xt.write_text("course/reading_list.md", reading_md)
-    reading_pdf = _pdfify(xt, reading_md, "reading_list.pdf", title=f"{topic} — Reading List")
-
-    # --- Manifest + QA ---
-    if progress_cb:
-        progress_cb("Indexing quizzes", 0.90)
-    quiz_json_files = sorted([p.as_posix() for p in Path("course/quizzes").glob("*.json")])
-    quiz_pdf_files = sorted([p.as_posix() for p in Path("course/quizzes").glob("*.pdf")])
-
-    manifest = {
-        "topic": topic,
-        "weeks": weeks,
-        "lessons_per_week": lessons_per_week,
-        "lessons": lesson_md_paths,
-        "lesson_pdfs": lesson_pdf_paths,
-        "quizzes": quiz_json_files,
-        "quiz_pdfs": quiz_pdf_files,
-        "syllabus_md": "course/syllabus.md",
-        "syllabus_pdf": syllabus_pdf,
-        "syllabus_json": "course/syllabus.json",
-        "reading_list": "course/reading_list.md",
-        "reading_list_pdf": reading_pdf,
-        "licenses": sorted(list(allow)),
-    }
-    xt.write_json("course/course_manifest.json", manifest)
-
-    if progress_cb:
-        progress_cb("QA: license check", 0.94)
-    qa = {"license_violations": []}
-    for it in curated:
-        chk = lt.check(f"{it['title']} {it['license']}", allow)
-        if chk["status"] != "OK":
-            qa["license_violations"].append(it)
-    xt.write_json("course/qa_report.json", qa)
-
-    if progress_cb:
-        progress_cb("Done", 1.0)
-    return {"manifest": manifest, "qa": qa}
 
-def run_pipeline(
+def _deterministic_build(
     topic: str,
     weeks: int,
     lessons_per_week: int,
-    min_resources: int,
-    license_allowlist: str,
-    cfg: Dict,
-    fast_mode: bool = True,
+    allow,
+    qz_agent,
     progress_cb: Optional[Callable[[str, float], None]] = None,
-):
-    allow = {x.strip() for x in license_allowlist.split(",")} if license_allowlist else DEFAULT_ALLOWED
+    lesson_titles: Optional[List[str]] = None,
+    cfg: Optional[Dict] = None,
+    ckpt: Optional[Checkpoint] = None,
+    out_dir: str = "course",
+    progress: Optional[ProgressModel] = None,
+    usage: Optional[UsageMeter] = None,
+    prefetch: Optional[SpeculativeFetch] = None,
+) -> Dict:
+    out = out_dir.rstrip("/") or "course"
+    run_cfg = (cfg or {}).get("run") or {}
+    usage = usage or UsageMeter.from_cfg(cfg)
+    router = llm_router()
+    quiz_cache = QuizCache(((cfg or {}).get("budget") or {}).get("quiz_cache", ".cache/quizzes"))
+    # bounded-memory mode: drop article text right after each lesson and collect eagerly
+    low_memory = bool(run_cfg.get("low_memory", False))
+    mem = RssMonitor(target_growth_mb=run_cfg.get("rss_growth_target_mb"))
 
-    refined_topic = topic
-    lesson_titles_from_refiner: Optional[List[str]] = None
+    total = max(1, weeks * lessons_per_week)
+    pm = progress or _progress_model(cfg, progress_cb, _stage_units(total, with_llm_phases=False))
+    pm.emit("Initializing build")
+
+    incremental = bool(run_cfg.get("incremental", False))
+    if ckpt is None:
+        # Standalone call: clean previous runs to avoid stale files / duplicates
+        _reset_out(out, incremental)
+        ckpt = Checkpoint(f"{out}/.checkpoint")
+    Path(out).mkdir(parents=True, exist_ok=True)
+    xt = _export_tools(cfg)
+    journal = ManifestJournal(f"{out}/.manifest.jsonl", sidecars=xt.sidecars)
+
+    # low-memory builds don't pin pages in the shared article cache
+    st = SearchTools(cache=not low_memory, backend=content_backend((cfg or {}).get("content")))
+    lt, tt = LicenseTools(), TextTools()
+    rd = Renderer(out, formats=_output_formats(cfg), xt=xt)
+
+    curated = ckpt.load("curated")
+    if curated is None:
+        with pm.stage("search", "Searching open content"):
+            curated, spares = _curate(st, lt, topic, allow, total)
+        ckpt.save("spares", spares)
+        ckpt.save("curated", curated)
+    else:
+        spares = ckpt.load("spares") or []
+        pm.skip("search")
+
+    # --- Syllabus ---
+    syllabus = ckpt.load("syllabus")
+    if syllabus is None:
+        with pm.stage("syllabus", "Constructing syllabus"):
+            syllabus = _plan_syllabus(topic, weeks, lessons_per_week, curated, lesson_titles)
+            rd.set_lesson_order(syllabus)
+            _write_syllabus(rd, journal, syllabus)
+        ckpt.save("syllabus", syllabus)
+    else:
+        pm.skip("syllabus")
+    rd.set_lesson_order(syllabus)
+
+    # --- Lessons: fetch -> author -> quiz -> render over bounded queues ---
+    # lesson k+1 is fetched while lesson k's quiz is generated and lesson k-1 is rendered
+    pm.emit("Authoring lessons")
+    pipe_cfg = (cfg or {}).get("pipeline") or {}
+    n_workers = {"fetch": 2, "author": 1, "quiz": 1, "render": 1}
+    n_workers.update({k: int(v) for k, v in (pipe_cfg.get("workers") or {}).items() if k in n_workers})
+    queue_size = int(pipe_cfg.get("queue_size", 2))
+    author_batch = max(1, int(pipe_cfg.get("author_batch", 4)))
+
+    # a CrewAI agent runs one task at a time, so each extra quiz worker gets its own assessor
+    quiz_agents: "queue.Queue" = queue.Queue()
+    quiz_agents.put(qz_agent)
+    for _ in range(max(1, n_workers["quiz"]) - 1):
+        quiz_agents.put(assessor())
+
+    units = []
+    for w in syllabus["weeks"]:
+        for l in w["lessons"]:
+            unit = f"{w['week']}_{l['lesson']}"
+            # a completed lesson keeps its quiz payload and source so a resumed run can skip the fetch
+            payload = ckpt.load(f"lesson_{unit}")
+            src = (payload or {}).pop("source", None) or curated[len(units) % len(curated)]
+            units.append({"w": w, "l": l, "unit": unit, "src": src, "payload": payload})
+    total_lessons = len(units)
+    finished = {"n": 0}
+    finished_lock = threading.Lock()
+    fetch_errors: List[Dict] = []
+    # claimed in search order by lessons whose source fails to load (not ones a resumed lesson already took)
+    taken = {u["src"]["title"] for u in units}
+    spare_srcs = [sp for sp in spares if sp["title"] not in taken]
+
+    def _unit_finished():
+        with finished_lock:
+            finished["n"] += 1
+            n = finished["n"]
+        mem.sample()
+        pm.emit(f"Authoring lessons ({n}/{total_lessons})")
+
+    def _fetch(item: Dict, emit):
+        if item["payload"] is None:
+            t0 = time.perf_counter()
+            src = item["src"]
+            fetched = _fetch_source(st, src)
+            failed = []
+            while fetched.get("error"):
+                # missing page, ambiguous title or deadline: try the next unclaimed spare hit
+                failed.append({"unit": item["unit"], "title": src["title"], "error": fetched["error"]})
+                with finished_lock:
+                    spare = spare_srcs.pop(0) if spare_srcs else None
+                if spare is None:
+                    break
+                src, fetched = spare, _fetch_source(st, spare)
+            if not fetched.get("error"):
+                item["src"] = src
+            item["fetched"] = fetched
+            item["seconds"] = time.perf_counter() - t0
+            if failed:
+                # without a spare the lesson falls back to its title; keep the cause visible in the manifest
+                replaced_by = None if fetched.get("error") else src["title"]
+                with finished_lock:
+                    fetch_errors.extend({**f, "replaced_by": replaced_by} for f in failed)
+        emit("author", item)
+
+    def _author(batch: List[Dict], emit):
+        # micro-batched: lessons that arrive together share one key-concept ranking pass
+        todo = [it for it in batch if it["payload"] is None]
+        if todo:
+            t0 = time.perf_counter()
+            authored = _compose_lessons(tt, [(it["l"], it["src"], it.pop("fetched")) for it in todo])
+            share = (time.perf_counter() - t0) / len(todo)
+            if low_memory:
+                # nothing from these articles is needed again; let them go now
+                st.clear_caches()
+                gc.collect()
+            for it, (md, payload) in zip(todo, authored):
+                it["payload"] = payload
+                emit("render", ("lesson", it, md, it["seconds"] + share))
+        authored_ids = {id(it) for it in todo}
+        for it in batch:
+            if id(it) not in authored_ids:
+                pm.skip("lesson")
+            if ckpt.done(f"quiz_{it['unit']}"):
+                pm.skip("quiz")
+                _unit_finished()
+            else:
+                emit("quiz", it)
+
+    def _quiz(item: Dict, emit):
+        t0 = time.perf_counter()
+        agent = quiz_agents.get()
+        try:
+            quiz_json = _make_quiz(agent, item["w"], item["l"], item["payload"],
+                                   usage=usage, router=router, quiz_cache=quiz_cache)
+        finally:
+            quiz_agents.put(agent)
+        emit("render", ("quiz", item, quiz_json, time.perf_counter() - t0))
+
+    def _render(job: Tuple, emit):
+        kind, item, data, secs = job
+        w, l, unit = item["w"], item["l"], item["unit"]
+        if kind == "lesson":
+            pm.add("lesson", _write_lesson(rd, journal, w, l, data, seconds=secs))
+            ckpt.save(f"lesson_{unit}", {**item["payload"], "source": item["src"]})
+        else:
+            pm.add("quiz", _write_quiz(rd, journal, w, l, data, seconds=secs, bank=bank, topic=topic))
+            ckpt.save(f"quiz_{unit}", {"json": f"{out}/quizzes/week_{w['week']}_lesson_{l['lesson']}.json"})
+            _unit_finished()
+
+    pipe = (
+        StagedPipeline(name=f"build-{Path(out).name}")
+        .add_stage("fetch", _fetch, workers=n_workers["fetch"], maxsize=queue_size)
+        .add_stage("author", _author, workers=n_workers["author"], maxsize=max(queue_size, author_batch),
+                   batch_size=author_batch)
+        .add_stage("quiz", _quiz, workers=n_workers["quiz"], maxsize=queue_size)
+        .add_stage("render", _render, workers=n_workers["render"], maxsize=queue_size)
+    )
+    # survives resume/incremental runs: a lesson's items are replaced whenever its quiz is written again
+    bank = QuizBank(f"{out}/quiz_bank.sqlite")
     try:
-        A_ref = topic_refiner()
-        T_ref = t_refine(A_ref, topic, weeks, lessons_per_week)
-        Crew(agents=[A_ref], tasks=[T_ref], process=Process.sequential, verbose=False).kickoff()
+        pipe.run(units)
+        if prefetch is not None:
+            prefetch.close()
+        bank.retain(u["unit"] for u in units)
+        bank_summary = bank.summary()
+    finally:
+        bank.close()
+    journal.record("quiz_bank", f"{out}/quiz_bank.sqlite", "quiz")
+
+    # sources the lessons actually used (a spare replaces a source that failed to load)
+    sources = list({u["src"]["title"]: u["src"] for u in units}.values())
 
+    # --- Reading list ---
+    with pm.stage("reading_list", "Writing reading list"):
+        t_stage = time.perf_counter()
+        reading_md = "# Reading List\n" + "\n".join(
+            [f"- {it['title']} — {it['license']} — {it['url']}" for it in sources]
+        )
+        xt.write_text(f"{out}/reading_list.md", reading_md)
+        paths = rd.markdown(reading_md, "reading_list", title=f"{topic} — Reading List")
+        site = rd.site(topic, syllabus)
+        secs = time.perf_counter() - t_stage
+        journal.record("reading_list", f"{out}/reading_list.md", "reading_list", secs)
+        for fmt, path in paths.items():
+            journal.record(f"reading_list_{fmt}", path, "reading_list", secs)
+        for kind, path in (site or {}).items():
+            journal.record(f"site_{kind}", path, "reading_list", secs)
+        rd.close()
+        if incremental:
+            _prune_stale(out, journal)
+
+    # --- QA + Manifest (QA first so its report is hashed into the manifest) ---
+    with pm.stage("qa", "QA: license check"):
+        t_stage = time.perf_counter()
+        qa = {"license_violations": []}
+        for it in sources:
+            chk = lt.check(f"{it['title']} {it['license']}", allow)
+            if chk["status"] != "OK":
+                qa["license_violations"].append(it)
+        xt.write_json(f"{out}/qa_report.json", qa)
+        journal.record("qa_report", f"{out}/qa_report.json", "qa", time.perf_counter() - t_stage)
+
+    with pm.stage("manifest", "Indexing quizzes"):
+        written = journal.collect()
+
+        manifest = {
+            "topic": topic,
+            "weeks": weeks,
+            "lessons_per_week": lessons_per_week,
+            "out_dir": out,
+            # lessons finish out of order under the pipeline; list them in syllabus order
+            "lessons": sorted(written.get("lessons", []), key=_unit_order),
+            "lesson_pdfs": sorted(written.get("lesson_pdfs", []), key=_unit_order),
+            "quizzes": sorted(written.get("quizzes", []), key=_unit_order),
+            "quiz_pdfs": sorted(written.get("quiz_pdfs", []), key=_unit_order),
+            "lesson_html": sorted(written.get("lesson_html", []), key=_unit_order),
+            "quiz_html": sorted(written.get("quiz_html", []), key=_unit_order),
+            # every quiz item in one indexed SQLite file; query/export with `main quiz-bank`
+            "quiz_bank": f"{out}/quiz_bank.sqlite",
+            "quiz_bank_summary": bank_summary,
+            "syllabus_md": f"{out}/syllabus.md",
+            "syllabus_pdf": (written.get("syllabus_pdf") or [None])[0],
+            "syllabus_html": (written.get("syllabus_html") or [None])[0],
+            "syllabus_json": f"{out}/syllabus.json",
+            "reading_list": f"{out}/reading_list.md",
+            "reading_list_pdf": (written.get("reading_list_pdf") or [None])[0],
+            "reading_list_html": (written.get("reading_list_html") or [None])[0],
+            # static site entry point when "html" is among output.formats
+            "site_index": (written.get("site_index") or [None])[0],
+            "render": rd.stats(),
+            "licenses": sorted(list(allow)),
+            "memory": mem.report(),
+            # measured seconds per stage vs. history-based expectation; filled in once this stage is done
+            "timings": None,
+            # prompt/completion tokens and cost per stage and lesson; budget fallbacks under "degraded"
+            "usage": usage.report(),
+            # model/backends per LLM task and per-backend calls, failovers and latency
+            "llm": router.stats(),
+            # per-stage workers, queue depth (max/mean) and busy time of the lesson pipeline
+            "pipeline": pipe.stats(),
+            # sources whose fetch failed or hit its deadline (and the spare that replaced each), plus
+            # upstream hedging/timeout counters
+            "fetch": {"errors": sorted(fetch_errors, key=lambda e: [int(x) for x in e["unit"].split("_")]),
+                      "upstream": hedge_stats(),
+                      # search/prefetch started for the raw topic while the refiner ran
+                      "speculative": prefetch.stats() if prefetch is not None else None},
+            # path -> {sha256, bytes, generated_at, stage, stage_seconds[, sidecars]}; see `main diff`
+            "artifacts": journal.artifacts(),
+            # bytes written this build vs. bytes and disk blocks the course tree occupies (before this file)
+            "storage": {"compact": xt.compact, "sidecars": list(xt.sidecars),
+                        "written": journal.bytes_written(), **storage_stats(out)},
+        }
+    manifest["timings"] = pm.report()
+    xt.write_json(f"{out}/course_manifest.json", manifest)
+
+    pm.finish("Done")
+    return {"manifest": manifest, "qa": qa}
+
+def _refine_topic(A_ref, topic: str, weeks: int, lessons_per_week: int,
+                  usage: Optional[UsageMeter] = None, router: Optional[LlmRouter] = None):
+    """
+    Run the topic refiner; returns (refined title, lesson titles or None). A failed
+    backend is retried on the next one of the 'refine' route while its latency
+    budget lasts; after that the raw topic is used.
+    """
+    refined_topic = topic
+    lesson_titles: Optional[List[str]] = None
+    router = router or llm_router()
+    route = router.routes["refine"]
+    t_end = time.monotonic() + route.latency_budget
+    T_ref = None
+    for _ in route.backends:
+        left = t_end - time.monotonic()
+        if left < 1:
+            break
+        backend = router.apply(A_ref, "refine", budget=left)
+        model = router.model_for("refine", backend)
+        before = crew_tokens([A_ref])
+        try:
+            T_ref = t_refine(A_ref, topic, weeks, lessons_per_week)
+            Crew(agents=[A_ref], tasks=[T_ref], process=Process.sequential, verbose=False).kickoff()
+        except Exception as e:
+            T_ref = None
+            if not backend_failed(e):
+                break  # not the backend's fault: another one would fail the same way
+            router.mark_failed(backend.name)
+            continue
+        if usage is not None:
+            usage.record_crew("refine", [A_ref], before, model=model)
+        break
+    if T_ref is None:
+        return refined_topic, lesson_titles
+    try:
         _raw = getattr(T_ref.output, "raw", T_ref.output)
         _spec = json.loads(_raw) if isinstance(_raw, str) else (_raw or {})
         if isinstance(_spec, dict):
@@ -409,20 +781,28 @@ def run_pipeline(
             subs = _spec.get("subtopics")
             if isinstance(subs, list) and subs:
                 total = max(1, weeks * lessons_per_week)
-                lesson_titles_from_refiner = [str(subs[i % len(subs)]) for i in range(total)]
+                lesson_titles = [str(subs[i % len(subs)]) for i in range(total)]
     except Exception:
-        
         refined_topic = topic
-        lesson_titles_from_refiner = None
-
-    # ---- Regular crew agents / tasks ----
-    A_sup = supervisor()
-    A_cur = curator()
-    A_des = designer()
-    A_notes = note_maker()
-    A_qz = assessor()
-    A_asm = assembler()
-    A_aud = auditor()
+        lesson_titles = None
+    return refined_topic, lesson_titles
+
+
+def _run_crew(ag: Dict, refined_topic: str, allow, weeks: int, lessons_per_week: int,
+              usage: Optional[UsageMeter] = None, router: Optional[LlmRouter] = None,
+              limits: Optional[CrewLimits] = None) -> Dict:
+    """
+    Hierarchical planning crew over the pooled agents (reused across builds).
+    Bounded by `limits`; a crew stopped at a cap or the deadline is reported, not
+    raised, since the deterministic build does not depend on its output.
+    """
+    A_sup = ag["supervisor"]
+    A_cur = ag["curator"]
+    A_des = ag["designer"]
+    A_notes = ag["note_maker"]
+    A_qz = ag["assessor"]
+    A_asm = ag["assembler"]
+    A_aud = ag["auditor"]
 
     T_cur = t_curate(A_cur, refined_topic, ", ".join(sorted(list(allow))))
     T_syl = t_syllabus(A_des, refined_topic, weeks, lessons_per_week)
@@ -431,22 +811,165 @@ def run_pipeline(
     T_asm = t_assemble(A_asm)
     T_qa  = t_qa(A_aud)
 
-    Crew(
-        agents=[A_cur, A_des, A_notes, A_qz, A_asm, A_aud],
-        tasks=[T_cur, T_syl, T_sum, T_qz, T_asm, T_qa],
-        process=Process.hierarchical,
-        manager_agent=A_sup,
-        verbose=False
-    ).kickoff(inputs={"topic": refined_topic, "weeks": weeks, "lessons_per_week": lessons_per_week})
-
-
-    built = _deterministic_build(
-        refined_topic,
-        weeks,
-        lessons_per_week,
-        allow,
-        A_qz,
-        progress_cb=progress_cb,
-        lesson_titles=lesson_titles_from_refiner,
-    )
-    return {"status": "ok", "artifacts": ["course/"], "manifest": built["manifest"], "qa": built["qa"]}
+    workers = [A_cur, A_des, A_notes, A_qz, A_asm, A_aud]
+    tasks = [T_cur, T_syl, T_sum, T_qz, T_asm, T_qa]
+    router = router or llm_router()
+    # one backend for the whole crew, so a failed kickoff cools down the backend every agent used;
+    # the assessor is routed back to 'quiz' before each lesson's quiz
+    backend = router.apply(A_sup, "crew")
+    for agent in workers:
+        router.apply(agent, "crew", backend=backend)
+    model = router.model_for("crew", backend)
+    limits = limits or CrewLimits()
+    limits.attach(A_sup, workers, tasks, ["curate", "syllabus", "summarize", "quiz", "assemble", "qa"])
+    before = crew_tokens([A_sup] + workers)
+    try:
+        Crew(
+            agents=workers,
+            tasks=tasks,
+            process=Process.hierarchical,
+            manager_agent=A_sup,
+            verbose=False
+        ).kickoff(inputs={"topic": refined_topic, "weeks": weeks, "lessons_per_week": lessons_per_week})
+        if usage is not None:
+            usage.record_crew("crew", [A_sup] + workers, before, model=model)
+    except (CrewLimitExceeded, TimeoutError) as e:
+        # CrewAI wraps step-callback errors on some versions; the reason is kept on `limits`
+        limits.aborted = limits.aborted or f"{type(e).__name__}: {e}"
+    except Exception as e:
+        if limits.aborted is None:
+            if backend_failed(e):
+                router.mark_failed(backend.name)
+            raise
+    finally:
+        limits.detach()
+    return limits.report()
+
+
+def _speculate(cfg: Optional[Dict], ckpt: Checkpoint, topic: str, total: int) -> Optional[SpeculativeFetch]:
+    """Speculative search/prefetch for the raw topic, or None when it cannot help (resume, low-memory, off)."""
+    run_cfg = (cfg or {}).get("run") or {}
+    pipe_cfg = (cfg or {}).get("pipeline") or {}
+    if not pipe_cfg.get("speculative_fetch", True) or run_cfg.get("low_memory") or ckpt.done("curated"):
+        return None  # low-memory builds bypass the shared cache the prefetch fills
+    st = SearchTools(backend=content_backend((cfg or {}).get("content")))
+    return SpeculativeFetch(st, total, _search_size(total), workers=pipe_cfg.get("prefetch_workers", 4)).start(topic)
+
+
+def run_pipeline(
+    topic: str,
+    weeks: int,
+    lessons_per_week: int,
+    min_resources: int,
+    license_allowlist: str,
+    cfg: Dict,
+    fast_mode: bool = True,
+    progress_cb: Optional[Callable[[str, float], None]] = None,
+    out_dir: str = "course",
+):
+    with track_build():
+        return _run_pipeline(topic, weeks, lessons_per_week, min_resources, license_allowlist, cfg,
+                             fast_mode=fast_mode, progress_cb=progress_cb, out_dir=out_dir)
+
+
+def _run_pipeline(
+    topic: str,
+    weeks: int,
+    lessons_per_week: int,
+    min_resources: int,
+    license_allowlist: str,
+    cfg: Dict,
+    fast_mode: bool = True,
+    progress_cb: Optional[Callable[[str, float], None]] = None,
+    out_dir: str = "course",
+):
+    out = out_dir.rstrip("/") or "course"
+    allow = {x.strip() for x in license_allowlist.split(",")} if license_allowlist else DEFAULT_ALLOWED
+    configure_limiters((cfg or {}).get("limits"))
+    configure_hedgers((cfg or {}).get("deadlines"))
+    router = configure_llm_router(cfg)
+    cache_cfg = (cfg or {}).get("cache") or {}
+    if cache_cfg.get("articles") is not None:
+        configure_article_cache(cache_cfg["articles"])
+
+    # Fresh builds wipe the course directory; --resume keeps it and continues from the last completed unit
+    # as long as the checkpoint was written for the same parameters.
+    ckpt = Checkpoint(f"{out}/.checkpoint")
+    params = {"topic": topic, "weeks": weeks, "lessons_per_week": lessons_per_week, "licenses": sorted(allow),
+              "formats": list(parse_formats(_output_formats(cfg)))}
+    resume = bool(((cfg or {}).get("run") or {}).get("resume", False))
+    if not (resume and ckpt.matches(params)):
+        _reset_out(out, bool(((cfg or {}).get("run") or {}).get("incremental", False)))
+        ckpt.save("params", params)
+
+    pm = _progress_model(cfg, progress_cb, _stage_units(max(1, weeks * lessons_per_week)))
+    usage = UsageMeter.from_cfg(cfg)
+
+    # curation searches (and lesson fetches) start for the raw topic while the refiner runs
+    prefetch = _speculate(cfg, ckpt, topic, max(1, weeks * lessons_per_week))
+    try:
+        with agent_pool().lease() as ag:
+            refined = ckpt.load("refine")
+            if refined is not None:
+                pm.skip("refine")
+            elif usage.exhausted:
+                spec = _fallback_spec(topic, max(1, weeks * lessons_per_week))
+                refined = {"title": spec["title"], "lesson_titles": spec["subtopics"]}
+                usage.degrade("refine")
+                pm.skip("refine")
+            else:
+                with pm.stage("refine", "Refining topic"):
+                    refined_topic, lesson_titles = _refine_topic(ag["topic_refiner"], topic, weeks, lessons_per_week,
+                                                                 usage=usage, router=router)
+                refined = {"title": refined_topic, "lesson_titles": lesson_titles}
+                ckpt.save("refine", refined)
+            refined_topic = refined["title"]
+            lesson_titles_from_refiner = refined["lesson_titles"]
+            if prefetch is not None:
+                prefetch.reconcile(refined_topic)
+
+            crew_report = (ckpt.load("crew") or {}).get("report")
+            if ckpt.done("crew"):
+                pm.skip("crew")
+            elif usage.exhausted:
+                # the planning crew produces no artifacts; skipping it is the cheapest degradation
+                usage.degrade("crew")
+                pm.skip("crew")
+            else:
+                with pm.stage("crew", "Planning with the agent crew"):
+                    crew_report = _run_crew(ag, refined_topic, allow, weeks, lessons_per_week, usage=usage,
+                                            router=router, limits=CrewLimits.from_cfg(cfg))
+                ckpt.save("crew", {"topic": refined_topic, "report": crew_report})
+
+            built = _deterministic_build(
+                refined_topic,
+                weeks,
+                lessons_per_week,
+                allow,
+                ag["assessor"],
+                progress_cb=progress_cb,
+                lesson_titles=lesson_titles_from_refiner,
+                cfg=cfg,
+                ckpt=ckpt,
+                out_dir=out,
+                progress=pm,
+                usage=usage,
+                prefetch=prefetch,
+            )
+    finally:
+        if prefetch is not None:
+            prefetch.close()
+    return {
+        "status": "ok",
+        "artifacts": [f"{out}/"],
+        "manifest": built["manifest"],
+        "qa": built["qa"],
+        "timings": pm.report(),
+        "usage": usage.report(),
+        # per-agent LLM calls, delegations per stage, and whether a cap/deadline stopped the crew
+        "crew": crew_report,
+        "limits": limiter_stats(),
+        "deadlines": hedge_stats(),
+        # per-task model/backends and calls, failovers and latency per backend
+        "llm": router.stats(),
+    }
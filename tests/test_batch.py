@@ -0,0 +1,73 @@
+import json
+import threading
+
+import pytest
+
+batch = pytest.importorskip("src.batch")
+
+
+def test_load_topics_yaml(tmp_path):
+    p = tmp_path / "topics.yaml"
+    p.write_text("- Graph theory\n- {topic: Optics, weeks: 2, licenses: CC0}\n- {weeks: 3}\n- null\n- {topic: ''}\n",
+                 encoding="utf-8")
+    assert batch.load_topics(str(p)) == [{"topic": "Graph theory"}, {"topic": "Optics", "weeks": 2, "licenses": "CC0"}]
+    p.write_text("topics:\n  - Optics\n", encoding="utf-8")
+    assert batch.load_topics(str(p)) == [{"topic": "Optics"}]
+
+
+def test_load_topics_csv_drops_blank_fields_and_rows(tmp_path):
+    p = tmp_path / "topics.csv"
+    p.write_text("topic,weeks,lessons_per_week\nGraph theory,2,\n,3,1\n  ,4,2\nOptics,,3\n", encoding="utf-8")
+    assert batch.load_topics(str(p)) == [{"topic": "Graph theory", "weeks": "2"},
+                                         {"topic": "Optics", "lessons_per_week": "3"}]
+
+
+def test_load_topics_jsonl(tmp_path):
+    p = tmp_path / "topics.jsonl"
+    p.write_text('{"topic": "Optics", "weeks": 1}\n\n{"title": "no topic"}\n{"topic": "Optics", "out_dir": "o2"}\n',
+                 encoding="utf-8")
+    assert batch.load_topics(str(p)) == [{"topic": "Optics", "weeks": 1}, {"topic": "Optics", "out_dir": "o2"}]
+    p.write_text('{"topic": "Optics"}\n{not json\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        batch.load_topics(str(p))
+
+
+def test_load_topics_rejects_unknown_formats(tmp_path):
+    p = tmp_path / "topics.txt"
+    p.write_text("Optics\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="unsupported topic list format"):
+        batch.load_topics(str(p))
+
+
+def test_run_batch_isolates_courses_and_records_failures(tmp_path, monkeypatch):
+    topics = tmp_path / "topics.jsonl"
+    topics.write_text("\n".join(json.dumps(t) for t in [
+        {"topic": "Graph Theory"},
+        {"topic": "graph theory!", "weeks": 1},
+        {"topic": "Optics", "out_dir": "Light & Optics"},
+        {"topic": "Broken"},
+    ]), encoding="utf-8")
+    calls, lock = [], threading.Lock()
+
+    def fake_run_pipeline(topic, weeks, lessons_per_week, min_resources, licenses, cfg, out_dir):
+        with lock:
+            calls.append((topic, weeks, out_dir))
+        if topic == "Broken":
+            raise RuntimeError("search backend down")
+        return {"manifest": {"lessons": ["a"] * weeks * lessons_per_week}, "qa": {"license_violations": []}}
+
+    monkeypatch.setattr(batch, "run_pipeline", fake_run_pipeline)
+    done = []
+    report = batch.run_batch(str(topics), {}, out_root=str(tmp_path / "out"), workers=3, weeks=2,
+                             lessons_per_week=1, on_done=done.append)
+
+    root = (tmp_path / "out").as_posix()
+    assert sorted(c[2] for c in calls) == [f"{root}/broken", f"{root}/graph-theory", f"{root}/graph-theory-2",
+                                          f"{root}/light-optics"]
+    assert (report["total"], report["ok"], report["failed"]) == (4, 3, 1)
+    assert len(done) == 4
+    by_topic = {r["topic"]: r for r in report["courses"]}
+    assert by_topic["Broken"]["status"] == "failed"
+    assert by_topic["Broken"]["error"] == "RuntimeError: search backend down"
+    assert by_topic["graph theory!"]["lessons"] == 1 and by_topic["Graph Theory"]["lessons"] == 2
+    assert json.loads((tmp_path / "out" / "batch_report.json").read_text(encoding="utf-8")) == report
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from src.checkpoint import Checkpoint
+
+
+def test_save_load_and_completed(tmp_path):
+    ck = Checkpoint(str(tmp_path / ".checkpoint"))
+    assert ck.load("curated") is None and not ck.done("curated") and ck.completed() == []
+    ck.save("params", {"topic": "Graphs", "weeks": 2})
+    ck.save("lesson_1_1", {"title": "Ünïcode"})
+    ck.save("lesson_1_1", {"title": "second"})
+    assert ck.load("lesson_1_1") == {"title": "second"}
+    assert ck.matches({"topic": "Graphs", "weeks": 2}) and not ck.matches({"topic": "Graphs", "weeks": 3})
+    assert ck.completed() == ["lesson_1_1", "params"]
+    assert not [p for p in os.listdir(ck.root) if p.endswith(".tmp")]
+
+
+def test_failed_save_keeps_the_previous_state(tmp_path, monkeypatch):
+    ck = Checkpoint(str(tmp_path))
+    ck.save("syllabus", {"weeks": [1]})
+
+    def crash(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        ck.save("syllabus", {"weeks": [1, 2]})
+    monkeypatch.undo()
+    assert ck.load("syllabus") == {"weeks": [1]}
+    assert sorted(os.listdir(tmp_path)) == ["syllabus.json"]  # the temp file is cleaned up
+
+
+def test_unserializable_value_does_not_touch_the_file(tmp_path):
+    ck = Checkpoint(str(tmp_path))
+    ck.save("crew", {"ok": True})
+    with pytest.raises(TypeError):
+        ck.save("crew", {"bad": object()})
+    assert ck.load("crew") == {"ok": True}
+
+
+def test_torn_or_foreign_files_read_as_missing(tmp_path):
+    ck = Checkpoint(str(tmp_path))
+    (tmp_path / "quiz_1_1.json").write_text('{"key": "quiz_1_1", "val', encoding="utf-8")
+    (tmp_path / "refine.json").write_text(json.dumps({"no": "value"}), encoding="utf-8")
+    assert ck.load("quiz_1_1") is None
+    assert ck.load("refine") is None
@@ -0,0 +1,89 @@
+import bz2
+import json
+import threading
+
+import pytest
+
+from src.tools.corpus_tools import CorpusIndex, CorpusPageError, wikitext_to_text
+
+_XML = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">
+  <page><title>Graph theory</title><ns>0</ns><revision><text>'''Graph theory''' studies [[Graph (discrete mathematics)|graphs]].{{Infobox|x=1}} Graphs model pairwise relations between objects. Edges join vertices.
+
+== History ==
+The [[Seven Bridges of Königsberg]] problem started it.&lt;ref&gt;Euler 1736&lt;/ref&gt;
+
+== Applications ==
+* Networks
+* Chemistry</text></revision></page>
+  <page><title>Graph</title><ns>0</ns><redirect title="Graph theory"/><revision><text>#REDIRECT [[Graph theory]]</text></revision></page>
+  <page><title>Talk:Graph theory</title><ns>1</ns><revision><text>talk about graphs</text></revision></page>
+  <page><title>Tree (graph theory)</title><ns>0</ns><revision><text>A tree is a connected acyclic graph. Trees have no cycles.</text></revision></page>
+</mediawiki>
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    dump = tmp_path / "dump.xml.bz2"
+    dump.write_bytes(bz2.compress(_XML.encode("utf-8")))
+    idx = CorpusIndex(str(tmp_path / "corpus.sqlite"))
+    assert idx.ingest(str(dump), batch_size=1) == 2  # redirects and non-article namespaces are skipped
+    return idx
+
+
+def test_wikitext_to_text():
+    text = wikitext_to_text("'''Bold''' [[A|b]] {{t|{{nested}}}} [http://x.org site]<ref>r</ref>\n== H ==\n* item")
+    assert text == "Bold b site\n\n== H ==\n\nitem"
+
+
+def test_search_matches_all_terms_then_falls_back_to_any(index):
+    assert sorted(index.search("graph theory", results=5)) == ["Graph theory", "Tree (graph theory)"]
+    assert index.search("acyclic", results=5) == ["Tree (graph theory)"]
+    # no page has both terms: the OR query fills the results
+    assert sorted(index.search("acyclic chemistry", results=5)) == ["Graph theory", "Tree (graph theory)"]
+    assert index.search("", results=5) == []
+    assert index.search('"; DROP TABLE pages; --', results=5) == []
+
+
+def test_pages_sections_and_summaries(index):
+    page = index.page("graph theory")  # case-insensitive fallback
+    assert page.title == "Graph theory"
+    assert page.url == "https://en.wikipedia.org/wiki/Graph_theory"
+    assert "Seven Bridges of Königsberg" in page.section("History")
+    assert "Euler" not in page.content
+    assert page.section("Missing") is None
+    assert index.summary("Graph theory", sentences=2) == \
+        "Graph theory studies graphs. Graphs model pairwise relations between objects."
+    with pytest.raises(CorpusPageError):
+        index.page("Nope")
+
+
+def test_reingest_replaces_pages_and_keeps_the_fts_index_in_sync(index, tmp_path):
+    jsonl = tmp_path / "extract.jsonl"
+    jsonl.write_text("\n".join([
+        json.dumps({"title": "Graph theory", "text": "Rewritten article about lattices.", "url": "https://x/g"}),
+        "not json",
+        json.dumps({"title": "", "text": "no title"}),
+    ]), encoding="utf-8")
+    assert index.ingest(str(jsonl)) == 1
+    assert index.count() == 2
+    assert index.page("Graph theory").url == "https://x/g"
+    assert index.search("lattices") == ["Graph theory"]
+    assert "Graph theory" not in index.search("Königsberg")
+
+
+def test_lookups_from_several_threads(index):
+    out, errors = [], []
+
+    def lookup():
+        try:
+            out.append(index.search("tree")[0])
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and out == ["Tree (graph theory)"] * 8
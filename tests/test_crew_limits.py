@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.crew_limits import CrewLimitExceeded, CrewLimits
+
+
+def _agent(role: str):
+    return SimpleNamespace(role=role, max_iter=25, step_callback=None, max_execution_time=None, max_retry_limit=2)
+
+
+def test_attach_disables_retries_and_detach_restores():
+    manager, worker = _agent("manager"), _agent("worker")
+    task = SimpleNamespace(callback=None)
+    limits = CrewLimits(max_loops_per_stage=2, max_delegations_per_stage=3, deadline_seconds=60)
+    limits.attach(manager, [worker], [task], ["plan"])
+    assert (manager.max_iter, worker.max_iter) == (8, 2)
+    assert manager.max_retry_limit == worker.max_retry_limit == 0
+    assert 1 <= worker.max_execution_time <= 60
+    limits.detach()
+    for a in (manager, worker):
+        assert (a.max_iter, a.step_callback, a.max_execution_time, a.max_retry_limit) == (25, None, None, 2)
+
+
+def test_delegation_cap_and_call_counts():
+    manager, worker = _agent("manager"), _agent("worker")
+    tasks = [SimpleNamespace(callback=None), SimpleNamespace(callback=None)]
+    limits = CrewLimits(max_delegations_per_stage=1, deadline_seconds=None)
+    limits.attach(manager, [worker], tasks, ["curate", "syllabus"])
+    delegate = SimpleNamespace(tool="Delegate work to coworker")
+    manager.step_callback(delegate)
+    worker.step_callback(SimpleNamespace(tool=None))
+    tasks[0].callback(None)
+    manager.step_callback(delegate)  # the cap is per stage
+    with pytest.raises(CrewLimitExceeded):
+        manager.step_callback(delegate)
+    rep = limits.report()
+    assert rep["llm_calls"] == {"manager": 3, "worker": 1}
+    assert rep["delegations"] == {"curate": 1, "syllabus": 2}
+    assert "syllabus" in rep["aborted"]
+    limits.detach()
+
+
+def test_deadline_aborts_at_the_next_step():
+    manager = _agent("manager")
+    limits = CrewLimits(deadline_seconds=0.001)
+    limits.attach(manager, [], [], ["plan"])
+    limits._t0 -= 1
+    with pytest.raises(CrewLimitExceeded, match="deadline"):
+        manager.step_callback(SimpleNamespace(tool=None))
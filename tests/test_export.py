@@ -0,0 +1,44 @@
+import gzip
+import hashlib
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from src.tools.export_tools import ExportTools  # noqa: E402
+
+_MD = "# Graphs\n\n## Key Concepts\n- A graph has vertices and edges.\n1. First step\n\nPlain paragraph."
+
+
+def _sha(path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_same_markdown_renders_to_the_same_pdf(tmp_path):
+    xt = ExportTools()
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    xt.write_pdf_from_markdown(_MD, str(a), title="Lesson")
+    xt.write_pdf_from_markdown(_MD, str(b), title="Lesson")
+    assert a.read_bytes().startswith(b"%PDF")
+    assert _sha(a) == _sha(b)
+    xt.write_pdf_from_markdown(_MD + "\nMore.", str(b), title="Lesson")
+    assert _sha(a) != _sha(b)
+
+
+def test_same_quiz_renders_to_the_same_pdf(tmp_path):
+    quiz = {"items": [{"type": "mcq", "question": "Q?", "choices": ["a", "b", "c", "d"], "answer": 1,
+                       "rationale": "because", "bloom": "remember", "difficulty": "easy"},
+                      {"type": "short", "prompt": "Explain."}]}
+    xt = ExportTools()
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    xt.quiz_json_to_pdf(quiz, str(a), title="Quiz")
+    xt.quiz_json_to_pdf(quiz, str(b), title="Quiz")
+    assert _sha(a) == _sha(b)
+
+
+def test_compact_json_and_gzip_sidecar(tmp_path):
+    xt = ExportTools(compact=True, sidecars="gzip")
+    path = tmp_path / "x.json"
+    xt.write_json(str(path), {"a": [1, 2]})
+    assert path.read_text() == '{"a":[1,2]}'
+    assert gzip.decompress((tmp_path / "x.json.gz").read_bytes()) == path.read_bytes()
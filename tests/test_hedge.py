@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from src.tools.hedge import FetchTimeout, Hedger
+from src.tools.rate_limit import AdaptiveLimiter, DeadlinePassed
+
+
+def _hedger(**kw) -> Hedger:
+    opts = dict(deadline=2.0, hedge_min_delay=0.05, workers=4, min_samples=5)
+    opts.update(kw)
+    return Hedger("test", **opts)
+
+
+def test_slow_call_is_hedged_and_the_duplicate_wins():
+    h = _hedger()
+    for _ in range(5):
+        h.call(lambda: "warm")
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(1.0)  # the primary stalls
+            return "slow"
+        return "fast"
+
+    t0 = time.monotonic()
+    assert h.call(fetch) == "fast"
+    assert time.monotonic() - t0 < 0.5
+    stats = h.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    h.shutdown()
+
+
+def test_no_hedge_before_enough_samples():
+    h = _hedger(min_samples=50)
+    assert h.hedge_delay() is None
+    assert h.call(lambda x: x * 2, 21) == 42
+    assert h.stats()["hedged"] == 0
+    h.shutdown()
+
+
+def test_deadline_raises_fetch_timeout():
+    h = _hedger(deadline=0.2, hedge=False)
+    t0 = time.monotonic()
+    with pytest.raises(FetchTimeout):
+        h.call(time.sleep, 1.0)
+    assert time.monotonic() - t0 < 0.6
+    assert h.stats()["timeouts"] == 1
+    h.shutdown()
+
+
+def test_errors_propagate():
+    h = _hedger()
+
+    def boom():
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        h.call(boom)
+    assert h.stats()["errors"] == 1
+    h.shutdown()
+
+
+class ConnectionError(Exception):  # transient by name, like requests.ConnectionError
+    pass
+
+
+def test_abandoned_call_stops_retrying_at_the_deadline():
+    h = _hedger(deadline=0.3, hedge=False)
+    lim = AdaptiveLimiter("test-deadline", rate=0, retries=50, base_delay=0.05, max_delay=0.05)
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        time.sleep(0.12)
+        raise ConnectionError("reset")
+
+    t0 = time.monotonic()
+    # the limiter gives up at the deadline, or just before it when the next backoff would cross it
+    with pytest.raises((FetchTimeout, ConnectionError)):
+        h.call_bounded(lim.call_until, flaky)
+    time.sleep(0.4)
+    assert attempts and max(attempts) < t0 + 0.3  # no retry started after the deadline
+    assert lim.stats()["inflight"] == 0
+    h.shutdown()
+
+
+def test_queued_call_gives_up_at_its_deadline():
+    lim = AdaptiveLimiter("test-queue", rate=0, max_concurrency=1)
+    release = threading.Event()
+    holder = threading.Thread(target=lim.call, args=(release.wait,))
+    holder.start()
+    time.sleep(0.05)
+    ran = []
+    with pytest.raises(DeadlinePassed):
+        lim.call_until(time.monotonic() + 0.1, lambda: ran.append(1))
+    release.set()
+    holder.join()
+    assert ran == []
+    assert lim.call_until(time.monotonic() + 1.0, lambda: "ok") == "ok"
@@ -0,0 +1,25 @@
+from src.tools.html_tools import HtmlTools, _inline
+
+
+def test_url_cannot_break_out_of_href():
+    html = _inline('see https://x.org/a"onmouseover="alert(1) now')
+    assert "onmouseover=\"" not in html
+    assert '<a href="https://x.org/a">https://x.org/a</a>' in html
+    assert "&quot;onmouseover=&quot;alert(1) now" in html
+    assert "onmouseover" not in _inline("https://x.org/a'onmouseover='alert(1)").split("</a>")[0]
+
+
+def test_trailing_punctuation_stays_outside_the_link():
+    assert _inline("Read https://en.wikipedia.org/wiki/Graph.") == \
+        'Read <a href="https://en.wikipedia.org/wiki/Graph">https://en.wikipedia.org/wiki/Graph</a>.'
+    assert _inline("(see https://x.org/a, then b)") == \
+        '(see <a href="https://x.org/a">https://x.org/a</a>, then b)'
+    assert _inline("(https://x.org/a)") == '(<a href="https://x.org/a">https://x.org/a</a>)'
+    url = "https://en.wikipedia.org/wiki/Mercury_(planet)"
+    assert _inline(f"{url}.") == f'<a href="{url}">{url}</a>.'
+
+
+def test_text_is_escaped():
+    assert _inline("a < b & \"c\"") == "a &lt; b &amp; &quot;c&quot;"
+    body = HtmlTools("site").markdown_to_html("# T\n\n- x <script>")
+    assert "<script>" not in body
@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+from src.tools.llm_router import LlmRouter, RouteExhausted, backend_failed, configure_llm_router  # noqa: E402
+from src.tools.llm_tools import llm_make_quiz  # noqa: E402
+from src.tools.rate_limit import configure_limiters  # noqa: E402
+
+
+class _Stub(BaseHTTPRequestHandler):
+    """OpenAI-compatible mock: /<backend>/v1/chat/completions answers from a per-backend script."""
+
+    script = {}  # backend -> list of (status, delay); the last entry repeats
+    hits = {}
+    models = []  # `model` of every request, in arrival order
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers.get("content-length") or 0)) or b"{}")
+        self.models.append(req.get("model"))
+        name = self.path.strip("/").split("/")[0]
+        steps = self.script[name]
+        n = self.hits.get(name, 0)
+        self.hits[name] = n + 1
+        status, delay = steps[min(n, len(steps) - 1)]
+        time.sleep(delay)
+        body = {"error": {"message": "boom", "type": "server_error"}} if status != 200 else {
+            "id": "c1", "object": "chat.completion", "created": 0, "model": f"{name}-model",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": name}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+        }
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass  # the client gave up (timeout test)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    srv.daemon_threads = True
+    _Stub.script, _Stub.hits, _Stub.models = {}, {}, []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+_N = iter(range(10**6))
+
+
+def _router(base: str, timeout: float = 5.0, budget: float = 10.0) -> LlmRouter:
+    # unique limiter names without retries, so every failure is visible to the router
+    names = {b: f"test-{b}-{next(_N)}" for b in ("primary", "local")}
+    configure_limiters({lim: {"rate": 0, "retries": 0, "max_concurrency": 8} for lim in names.values()})
+    return LlmRouter(
+        backends={b: {"base_url": f"{base}/{b}/v1", "api_key": "k", "limiter": lim} for b, lim in names.items()},
+        routes={"quiz": {"backends": ["primary", "local"], "timeout": timeout, "latency_budget": budget}},
+    )
+
+
+def _answer(r) -> str:
+    return r.choices[0].message.content
+
+
+def test_fails_over_on_500_then_skips_the_cooling_backend(server):
+    _Stub.script = {"primary": [(500, 0), (200, 0)], "local": [(200, 0)]}
+    router = _router(server)
+    assert _answer(router.complete("quiz", [{"role": "user", "content": "q"}])) == "local"
+    assert set(router.stats()["cooling_down"]) == {"primary"}
+    # primary would answer now, but it is cooling down: the next call goes straight to local
+    assert _answer(router.complete("quiz", [{"role": "user", "content": "q"}])) == "local"
+    assert _Stub.hits == {"primary": 1, "local": 2}
+    calls = router.stats()["calls"]["quiz"]
+    assert calls["primary"]["errors"] == 1 and calls["local"]["ok"] == 2 and calls["local"]["failovers"] == 2
+
+
+def test_concurrent_failures_only_cool_the_backend_that_failed(server):
+    _Stub.script = {"primary": [(500, 0.2)], "local": [(200, 0)]}
+    router = _router(server)
+    out = []
+    workers = [threading.Thread(target=lambda: out.append(_answer(router.complete("quiz", [])))) for _ in range(2)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    assert out == ["local", "local"]
+    assert set(router.stats()["cooling_down"]) == {"primary"}
+
+
+def test_client_errors_do_not_cool_a_backend(server):
+    _Stub.script = {"primary": [(400, 0)], "local": [(200, 0)]}
+    router = _router(server)
+    assert _answer(router.complete("quiz", [])) == "local"
+    assert router.stats()["cooling_down"] == {}
+
+
+def test_route_exhausted_when_every_backend_fails(server):
+    _Stub.script = {"primary": [(500, 0)], "local": [(503, 0)]}
+    router = _router(server)
+    with pytest.raises(RouteExhausted, match="primary.*local"):
+        router.complete("quiz", [])
+
+
+def test_latency_budget_bounds_the_whole_call(server):
+    _Stub.script = {"primary": [(200, 3.0)], "local": [(200, 3.0)]}
+    router = _router(server, timeout=0.5, budget=0.8)
+    t0 = time.monotonic()
+    with pytest.raises(RouteExhausted):
+        router.complete("quiz", [])
+    assert time.monotonic() - t0 < 2.0
+    assert set(router.stats()["cooling_down"]) == {"primary", "local"}
+
+
+def test_backend_failed_looks_through_wrapped_errors():
+    class RateLimitError(Exception):
+        pass
+
+    try:
+        try:
+            raise RateLimitError("429")
+        except RateLimitError as e:
+            raise RuntimeError("agent failed") from e
+    except RuntimeError as wrapped:
+        assert backend_failed(wrapped)
+    assert backend_failed(TimeoutError("task timed out"))
+    assert not backend_failed(ValueError("bad json"))
+
+
+def test_configure_keeps_the_router_until_the_llm_block_changes():
+    cfg = {"llm": {"model": "m1", "backends": {"alt": {"base_url": "http://127.0.0.1:9/v1"}}}}
+    first = configure_llm_router(cfg)
+    assert configure_llm_router({"llm": dict(cfg["llm"]), "run": {"resume": True}}) is first
+    first.mark_failed("alt")
+
+    second = configure_llm_router({"llm": {**cfg["llm"], "model": "m2"}})
+    assert second is not first and second.routes["quiz"].model == "m2"
+    assert "alt" in second.stats()["cooling_down"]
+    # a build still holding the old router updates the state the new one reads
+    first.mark_failed("openai")
+    first._count("quiz", "openai", calls=1)
+    assert "openai" in second.stats()["cooling_down"]
+    assert second.stats()["calls"]["quiz"]["openai"]["calls"] >= 1
+    assert second._lock is first._lock
+
+
+def test_model_override_and_deprecated_llm_make_quiz_model(server):
+    _Stub.script = {"primary": [(200, 0)], "local": [(200, 0)]}
+    router = _router(server)
+    router.complete("quiz", [], model="override")
+    router.complete("quiz", [])
+    assert _Stub.models == ["override", "gpt-4o-mini"]
+
+    calls = []
+
+    class _Router:
+        def complete(self, task, messages, **kw):
+            calls.append((task, kw.get("model")))
+            msg = type("M", (), {"content": '{"items": []}'})
+            return type("R", (), {"choices": [type("C", (), {"message": msg})]})
+
+    with pytest.warns(DeprecationWarning):
+        assert llm_make_quiz("T", ["o"], "notes", "legacy-model", router=_Router()) == {"items": []}
+    llm_make_quiz("T", ["o"], "notes", router=_Router())
+    assert calls == [("quiz_repair", "legacy-model"), ("quiz_repair", None)]
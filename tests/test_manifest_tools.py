@@ -0,0 +1,58 @@
+import hashlib
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from src.tools.manifest_tools import ManifestJournal, diff_manifests, file_entry  # noqa: E402
+
+
+def _art(sha: str, size: int, **extra):
+    return dict({"sha256": sha, "bytes": size}, **extra)
+
+
+def test_diff_by_content_hash():
+    old = {"artifacts": {"c/a.md": _art("1", 10), "c/b.pdf": _art("2", 20), "c/gone.md": _art("3", 5)}}
+    new = {"artifacts": {"c/a.md": _art("1", 10), "c/b.pdf": _art("9", 25),
+                         "c/new.json": _art("4", 7, sidecars={"gzip": {"bytes": 3}})}}
+    assert diff_manifests(old, new) == {
+        "added": ["c/new.json"],
+        "changed": ["c/b.pdf"],
+        "removed": ["c/gone.md"],
+        "unchanged": 1,
+        "bytes_to_fetch": 32,
+        "sidecar_bytes_to_fetch": {"gzip": 3},
+    }
+
+
+def test_identical_manifests_have_nothing_to_fetch():
+    man = {"artifacts": {"c/a.md": _art("1", 10)}}
+    assert diff_manifests(man, man) == {"added": [], "changed": [], "removed": [], "unchanged": 1,
+                                        "bytes_to_fetch": 0}
+
+
+def test_manifests_without_hashes_count_shared_paths_as_changed():
+    old = {"out_dir": "course", "lessons": ["course/lessons/a.md", "other/x.md"], "syllabus": "course/s.md"}
+    new = {"out_dir": "course", "artifacts": {"course/lessons/a.md": _art("1", 4), "course/s.md": _art("2", 6)}}
+    d = diff_manifests(old, new)
+    assert d["changed"] == ["course/lessons/a.md", "course/s.md"] and d["unchanged"] == 0
+    assert d["bytes_to_fetch"] == 10
+    assert diff_manifests({}, {}) == {"added": [], "changed": [], "removed": [], "unchanged": 0,
+                                      "bytes_to_fetch": 0}
+
+
+def test_journal_entries_hash_files_and_keep_the_latest_entry(tmp_path):
+    path = tmp_path / "lesson.md"
+    path.write_text("v1", encoding="utf-8")
+    journal = ManifestJournal(str(tmp_path / ".manifest.jsonl"))
+    journal.record("lessons", str(path), "lesson", 0.5)
+    path.write_text("v2!", encoding="utf-8")
+    journal.record("lessons", str(path), "lesson", 0.25)
+    with journal.path.open("a", encoding="utf-8") as f:
+        f.write('{"kind": "torn')  # crash mid-line
+    assert journal.collect() == {"lessons": [str(path)]}
+    art = journal.artifacts()[str(path)]
+    assert art["sha256"] == hashlib.sha256(b"v2!").hexdigest() and art["bytes"] == 3
+    assert art["stage"] == "lesson" and art["stage_seconds"] == 0.25
+    assert journal.bytes_written() == {"artifacts": 5, "sidecars": 0, "total": 5}
+    assert "sidecars" not in file_entry(str(path), "lesson")
@@ -0,0 +1,20 @@
+from src.tools import memory_tools
+from src.tools.memory_tools import RssMonitor
+
+
+def test_report_without_the_resource_module(monkeypatch):
+    monkeypatch.setattr(memory_tools, "resource", None)
+    mon = RssMonitor(target_growth_mb=10)
+    mon.sample()
+    assert memory_tools.current_rss_mb() is None
+    assert mon.report() == {"peak_rss_mb": None, "build_high_rss_mb": None, "rss_growth_mb": None, "samples": 0}
+
+
+def test_growth_against_target():
+    mon = RssMonitor(target_growth_mb=10)
+    mon.sample()
+    mon.sample()
+    rep = mon.report()
+    assert rep["samples"] == 2
+    if rep["rss_growth_mb"] is not None:  # Linux
+        assert rep["within_target"] is True
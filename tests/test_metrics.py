@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from src.tools.metrics import (BUILDS_ACTIVE, BUILDS_QUEUED, BUILDS_TOTAL, BuildSlots, Counter, Gauge, Histogram,
+                               Registry, track_build)
+
+
+def _value(metric, **labels) -> float:
+    return metric._values.get(metric._key(labels), 0.0)
+
+
+def _samples(text: str) -> dict:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#"))
+
+
+def test_registry_renders_metrics_and_collectors():
+    reg = Registry()
+    c = reg.register(Counter("t_calls_total", "Calls.", ("upstream",)))
+    g = reg.register(Gauge("t_inflight", "In flight."))
+    c.inc(upstream="wiki")
+    c.inc(2, upstream='a"b')
+    g.set(3)
+    reg.collector(lambda: ["t_extra 7"])
+    reg.collector(lambda: 1 / 0)  # a broken collector is skipped
+
+    text = reg.render()
+    assert text.endswith("\n")
+    assert "# HELP t_calls_total Calls.\n# TYPE t_calls_total counter" in text
+    assert "# TYPE t_inflight gauge" in text
+    assert _samples(text) == {'t_calls_total{upstream="a\\"b"}': "2", 't_calls_total{upstream="wiki"}': "1",
+                              "t_inflight": "3", "t_extra": "7"}
+
+
+def test_histogram_buckets_are_cumulative_with_inf():
+    h = Histogram("t_seconds", "Seconds.", ("stage",), buckets=(1, 0.5, 5))
+    for v in (0.2, 0.5, 3.0, 60.0):
+        h.observe(v, stage="quiz")
+    s = _samples("\n".join(h.render()))
+    assert s['t_seconds_bucket{stage="quiz",le="0.5"}'] == "2"  # le is inclusive
+    assert s['t_seconds_bucket{stage="quiz",le="1"}'] == "2"
+    assert s['t_seconds_bucket{stage="quiz",le="5"}'] == "3"
+    assert s['t_seconds_bucket{stage="quiz",le="+Inf"}'] == "4"  # past the last bucket
+    assert s['t_seconds_count{stage="quiz"}'] == "4"
+    assert float(s['t_seconds_sum{stage="quiz"}']) == pytest.approx(63.7)
+
+
+def test_track_build_records_failures():
+    ok, failed = _value(BUILDS_TOTAL, status="ok"), _value(BUILDS_TOTAL, status="failed")
+    active = _value(BUILDS_ACTIVE)
+    with track_build():
+        assert _value(BUILDS_ACTIVE) == active + 1
+    with pytest.raises(RuntimeError):
+        with track_build():
+            raise RuntimeError("boom")
+    assert _value(BUILDS_TOTAL, status="ok") == ok + 1
+    assert _value(BUILDS_TOTAL, status="failed") == failed + 1
+    assert _value(BUILDS_ACTIVE) == active
+
+
+def test_build_slots_queue_beyond_the_limit():
+    slots = BuildSlots(1)
+    queued = _value(BUILDS_QUEUED)
+    release, order = threading.Event(), []
+
+    def build(name, hold=None):
+        with slots.slot():
+            order.append(name)
+            if hold:
+                hold.wait(5)
+
+    first = threading.Thread(target=build, args=("first", release))
+    first.start()
+    while not order:
+        time.sleep(0.01)
+    second = threading.Thread(target=build, args=("second",))
+    second.start()
+    deadline = time.monotonic() + 5
+    while _value(BUILDS_QUEUED) != queued + 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _value(BUILDS_QUEUED) == queued + 1 and order == ["first"]
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert order == ["first", "second"]
+    assert _value(BUILDS_QUEUED) == queued
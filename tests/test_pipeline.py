@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from src.pipeline import StagedPipeline
+
+
+def _run(pipe: StagedPipeline, items, timeout: float = 5.0):
+    """pipe.run(items) on a thread, failing the test instead of hanging on a deadlock."""
+    out = {}
+
+    def target():
+        try:
+            pipe.run(items)
+        except BaseException as e:
+            out["error"] = e
+
+    t = threading.Thread(target=target, daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "pipeline did not drain"
+    if "error" in out:
+        raise out["error"]
+
+
+def test_items_flow_through_every_stage_in_order():
+    seen = []
+    pipe = (
+        StagedPipeline()
+        .add_stage("double", lambda x, emit: emit("add", x * 2))
+        .add_stage("add", lambda x, emit: emit("sink", x + 1))
+        .add_stage("sink", lambda x, emit: seen.append(x))
+    )
+    _run(pipe, range(20))
+    assert seen == [x * 2 + 1 for x in range(20)]
+    assert {n: s["processed"] for n, s in pipe.stats()["stages"].items()} == {"double": 20, "add": 20, "sink": 20}
+
+
+def test_parallel_workers_process_everything():
+    seen, lock = [], threading.Lock()
+
+    def sink(x, emit):
+        time.sleep(0.001)
+        with lock:
+            seen.append(x)
+
+    pipe = StagedPipeline().add_stage("fan", lambda x, emit: emit("sink", x), workers=3) \
+        .add_stage("sink", sink, workers=4)
+    _run(pipe, range(100))
+    assert sorted(seen) == list(range(100))
+
+
+def test_bounded_queues_apply_backpressure():
+    def slow(x, emit):
+        time.sleep(0.005)
+
+    pipe = StagedPipeline().add_stage("fast", lambda x, emit: emit("slow", x), maxsize=2) \
+        .add_stage("slow", slow, maxsize=2)
+    _run(pipe, range(30))
+    stages = pipe.stats()["stages"]
+    assert stages["slow"]["processed"] == 30
+    assert stages["slow"]["max_depth"] <= 2 and stages["fast"]["max_depth"] <= 2
+
+
+def test_micro_batches_and_a_stop_in_the_middle_of_a_batch():
+    batches = []
+    pipe = StagedPipeline().add_stage("batch", lambda b, emit: batches.append(list(b)), batch_size=4,
+                                      maxsize=8, batch_wait=10.0)
+    t0 = time.monotonic()
+    _run(pipe, range(6))
+    # the stop after item 5 closes the open batch at once instead of waiting out batch_wait
+    assert time.monotonic() - t0 < 5.0
+    assert [x for b in batches for x in b] == list(range(6))
+    assert all(1 <= len(b) <= 4 for b in batches)
+    assert pipe.stats()["stages"]["batch"]["processed"] == 6
+
+
+def test_batching_stage_with_several_workers_exits_cleanly():
+    seen, lock = [], threading.Lock()
+
+    def consume(batch, emit):
+        with lock:
+            seen.extend(batch)
+
+    pipe = StagedPipeline().add_stage("feed", lambda x, emit: emit("batch", x)) \
+        .add_stage("batch", consume, workers=3, batch_size=3, maxsize=4, batch_wait=0.01)
+    _run(pipe, range(50))
+    assert sorted(seen) == list(range(50))
+
+
+def test_first_error_is_raised_and_the_rest_drains():
+    done = []
+
+    def fail_on_3(x, emit):
+        if x == 3:
+            raise ValueError("bad item 3")
+        emit("sink", x)
+
+    pipe = (
+        StagedPipeline()
+        .add_stage("src", lambda x, emit: emit("mid", x), maxsize=1)
+        .add_stage("mid", fail_on_3, maxsize=1)
+        .add_stage("sink", lambda x, emit: (time.sleep(0.002), done.append(x)), maxsize=1)
+    )
+    with pytest.raises(ValueError, match="bad item 3"):
+        _run(pipe, range(200))
+    assert 3 not in done
+    assert len(done) < 200  # intake stopped after the failure
+    assert pipe.stats()["stages"]["mid"]["processed"] < 200
+
+
+def test_error_in_a_batching_stage_propagates():
+    def boom(batch, emit):
+        raise RuntimeError("batch failed")
+
+    pipe = StagedPipeline().add_stage("feed", lambda x, emit: emit("batch", x), maxsize=1) \
+        .add_stage("batch", boom, batch_size=4, maxsize=4, batch_wait=0.01)
+    with pytest.raises(RuntimeError, match="batch failed"):
+        _run(pipe, range(100))
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def pool_mod(monkeypatch):
+    mod = pytest.importorskip("src.pool")
+    built = []
+
+    def factory(name):
+        def make():
+            built.append(name)
+            return object()
+        return make
+
+    monkeypatch.setattr(mod, "_FACTORIES", {name: factory(name) for name in ("supervisor", "assessor")})
+    monkeypatch.setattr(mod, "built", built, raising=False)  # factory calls, for the assertions
+    return mod
+
+
+def test_lease_reuses_returned_sets(pool_mod):
+    pool = pool_mod.AgentPool(max_idle=2)
+    with pool.lease() as first:
+        assert pool.stats() == {"idle": 0, "leased": 1, "created": 1, "reused": 0}
+    with pool.lease() as second:
+        assert second is first
+    assert pool.stats() == {"idle": 1, "leased": 0, "created": 1, "reused": 1}
+    assert sorted(pool_mod.built) == ["assessor", "supervisor"]
+
+
+def test_concurrent_leases_get_distinct_sets_and_extra_ones_are_evicted(pool_mod):
+    pool = pool_mod.AgentPool(max_idle=1)
+    entered, release, sets = threading.Barrier(3), threading.Event(), []
+
+    def build():
+        with pool.lease() as ag:
+            sets.append(ag)
+            entered.wait(5)
+            release.wait(5)
+
+    workers = [threading.Thread(target=build) for _ in range(2)]
+    for t in workers:
+        t.start()
+    entered.wait(5)
+    assert pool.stats()["leased"] == 2 and sets[0] is not sets[1]
+    release.set()
+    for t in workers:
+        t.join(5)
+    # only max_idle sets stay pooled; the other is dropped on return
+    assert pool.stats() == {"idle": 1, "leased": 0, "created": 2, "reused": 0}
+
+
+def test_failed_set_build_is_not_counted(pool_mod, monkeypatch):
+    pool = pool_mod.AgentPool()
+    monkeypatch.setattr(pool_mod, "_FACTORIES", {"supervisor": lambda: 1 / 0})
+    with pytest.raises(ZeroDivisionError):
+        with pool.lease():
+            pass
+    assert pool.stats() == {"idle": 0, "leased": 0, "created": 0, "reused": 0}
+
+
+def test_shutdown_drops_idle_sets_and_refuses_leases(pool_mod):
+    pool = pool_mod.AgentPool()
+    with pool.lease():
+        pass
+    with pool.lease() as held:
+        pool.shutdown()
+    assert pool.stats()["idle"] == 0  # a set returned after shutdown is not kept
+    with pytest.raises(RuntimeError, match="shut down"):
+        with pool.lease():
+            pass
+    assert held is not None
+
+
+def test_process_pool_is_recreated_after_shutdown(pool_mod, monkeypatch):
+    closed = []
+    monkeypatch.setattr(pool_mod, "close_clients", lambda: closed.append(True))
+    monkeypatch.setattr(pool_mod, "_POOL", None)
+    first = pool_mod.agent_pool()
+    assert pool_mod.agent_pool() is first
+    pool_mod.shutdown()
+    pool_mod.shutdown()  # safe twice
+    assert first.stats()["idle"] == 0 and closed == [True, True]
+    assert pool_mod.agent_pool() is not first
+
+
+def test_get_client_is_shared_per_endpoint_and_key():
+    pytest.importorskip("openai")
+    from src.tools.llm_tools import _CLIENTS, close_clients, get_client
+
+    a = get_client("http://127.0.0.1:9/v1", "k1")
+    assert get_client("http://127.0.0.1:9/v1", "k1") is a
+    assert get_client("http://127.0.0.1:9/v1", "k2") is not a
+    assert get_client("http://127.0.0.1:8/v1", "k1") is not a
+    assert a.max_retries == 0  # retries belong to the shared limiter
+    close_clients()
+    assert not _CLIENTS
+    assert get_client("http://127.0.0.1:9/v1", "k1") is not a
+    close_clients()
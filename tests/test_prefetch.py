@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("wikipedia")
+pytest.importorskip("youtube_transcript_api")
+
+from src.prefetch import SpeculativeFetch  # noqa: E402
+
+
+class _Search:
+    """Stub SearchTools: fixed results per query; page fetches can be held on an event."""
+
+    def __init__(self, results, gate=None):
+        self.results = results
+        self.gate = gate
+        self.pages, self.summaries = [], []
+        self._lock = threading.Lock()
+
+    def wiki_search(self, query, max_results=5):
+        return [{"title": t} for t in self.results[query][:max_results]]
+
+    def wiki_page(self, title):
+        with self._lock:
+            self.pages.append(title)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if title.startswith("missing"):
+            raise LookupError(title)
+        return title
+
+    def wiki_summary(self, title, sentences=6):
+        with self._lock:
+            self.summaries.append(title)
+        return title
+
+
+def _wait(pred, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not pred() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pred()
+
+
+def _settled(sf):
+    s = sf.stats()
+    return s["fetched"] + s["failed"] + s["cancelled"] == s["queued"]
+
+
+def test_prefetches_only_the_source_hits():
+    st = _Search({"raw": ["A", "B", "missing C", "D", "E"]})
+    sf = SpeculativeFetch(st, total=3, max_results=5, workers=2).start("raw")
+    _wait(lambda: sf.stats()["queued"] == 3 and _settled(sf))
+    assert sorted(st.pages) == ["A", "B", "missing C"] and sorted(st.summaries) == ["A", "B"]
+    s = sf.stats()
+    assert (s["fetched"], s["failed"], s["queries"]) == (2, 1, ["raw"])
+    sf.close()
+
+
+def test_reconcile_with_the_same_topic_keeps_the_work():
+    st = _Search({"t": ["A", "B"]})
+    sf = SpeculativeFetch(st, total=2, max_results=5).start("t")
+    _wait(lambda: sf.stats()["fetched"] == 2)
+    sf.reconcile("t")
+    assert sf.stats()["queries"] == ["t"] and sf.stats()["queued"] == 2
+    assert sorted(st.pages) == ["A", "B"]
+    sf.close()
+
+
+def test_reconcile_reuses_overlap_and_cancels_dropped_titles():
+    gate = threading.Event()
+    st = _Search({"raw": ["A", "B", "C"], "refined": ["A", "D", "E"]}, gate=gate)
+    sf = SpeculativeFetch(st, total=3, max_results=5, workers=1).start("raw")
+    _wait(lambda: st.pages == ["A"])  # A runs; B and C wait in the pool's queue
+    sf.reconcile("refined")
+    _wait(lambda: sf.stats()["queued"] == 5)
+    s = sf.stats()
+    assert (s["reused"], s["cancelled"]) == (1, 2)  # A kept in flight; B and C never start
+    gate.set()
+    _wait(lambda: sf.stats()["fetched"] == 3)
+    assert sorted(st.pages) == ["A", "D", "E"]
+    assert sf.stats()["queries"] == ["raw", "refined"]
+    sf.close()
+
+
+def test_close_cancels_queued_prefetches_and_is_idempotent():
+    gate = threading.Event()
+    st = _Search({"t": ["A", "B", "C"], "later": ["X"]}, gate=gate)
+    sf = SpeculativeFetch(st, total=3, max_results=5, workers=1).start("t")
+    _wait(lambda: st.pages == ["A"] and sf.stats()["queued"] == 3)
+    sf.close()
+    sf.close()
+    s = sf.stats()
+    assert s["cancelled"] == 2
+    seconds = s["seconds"]
+    gate.set()
+    _wait(lambda: sf.stats()["fetched"] == 1)  # the running prefetch still finishes into the cache
+    sf.reconcile("later")  # no-op once closed
+    time.sleep(0.05)
+    s = sf.stats()
+    assert st.pages == ["A"] and s["queries"] == ["t"] and s["seconds"] == seconds
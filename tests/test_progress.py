@@ -0,0 +1,91 @@
+import json
+import time
+
+import pytest
+
+from src.progress import ProgressModel, TimingHistory, _PRIOR_SECONDS, _fmt_eta
+
+
+def _history(tmp_path, means) -> TimingHistory:
+    path = tmp_path / "timings.json"
+    path.write_text(json.dumps({k: {"mean": v, "n": 1, "max": v} for k, v in means.items()}), encoding="utf-8")
+    return TimingHistory(str(path))
+
+
+def test_history_ewma_and_priors(tmp_path):
+    h = TimingHistory(str(tmp_path / "timings.json"))
+    assert h.mean("quiz") == _PRIOR_SECONDS["quiz"]
+    assert h.mean("unknown") == 1.0
+    h.record("quiz", 10.0)
+    assert h.mean("quiz") == 10.0  # the first sample replaces the prior
+    h.record("quiz", 20.0)
+    assert h.mean("quiz") == pytest.approx(0.7 * 10.0 + 0.3 * 20.0)
+    h.record("quiz", 5.0)
+    assert h.mean("quiz") == pytest.approx(0.7 * 13.0 + 0.3 * 5.0)
+    assert h.snapshot()["quiz"]["n"] == 3 and h.snapshot()["quiz"]["max"] == 20.0
+
+    h.save()
+    assert TimingHistory(str(tmp_path / "timings.json")).snapshot() == h.snapshot()
+
+
+def test_unreadable_history_falls_back_to_priors(tmp_path):
+    path = tmp_path / "timings.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert TimingHistory(str(path)).mean("lesson") == _PRIOR_SECONDS["lesson"]
+
+
+def test_fraction_is_weighted_by_expected_cost(tmp_path):
+    pm = ProgressModel(None, {"lesson": 4, "crew": 1}, history=_history(tmp_path, {"lesson": 1.0, "crew": 6.0}))
+    assert pm.report()["expected_seconds"] == 10.0
+    pm.add("lesson", 0.5, record=False)
+    assert pm.fraction() == pytest.approx(0.1)
+    pm.skip("crew")
+    assert pm.fraction() == pytest.approx(0.7)
+    for _ in range(5):  # extra units never push past 100%
+        pm.add("lesson", 0.5, record=False)
+    assert pm.fraction() == 1.0
+
+
+def test_eta_scales_remaining_cost_by_pace(tmp_path):
+    pm = ProgressModel(None, {"lesson": 4, "crew": 1}, history=_history(tmp_path, {"lesson": 1.0, "crew": 6.0}))
+    assert pm.eta_seconds() == pytest.approx(10.0)  # nothing done yet: the expected total
+    pm.add("lesson", 2.0, record=False)
+    pm.add("lesson", 2.0, record=False)
+    pm._t0 = time.monotonic() - 4.0  # 2 expected seconds took 4: half the historical pace
+    assert pm.eta_seconds() == pytest.approx(16.0, rel=0.02)
+    pm._t0 = time.monotonic() - 1000.0  # pace is clamped at 10x
+    assert pm.eta_seconds() == pytest.approx(80.0)
+
+
+def test_fmt_eta():
+    assert [_fmt_eta(s) for s in (-3, 42.4, 130, 3725)] == ["0s", "42s", "2m10s", "1h02m"]
+
+
+def test_stage_ticks_while_running_and_counts_on_success(tmp_path):
+    seen = []
+    pm = ProgressModel(lambda msg, frac: seen.append((msg, frac)), {"crew": 1, "qa": 1},
+                       history=_history(tmp_path, {"crew": 1.0, "qa": 1.0}), tick=0.05)
+    with pm.stage("crew", "Planning"):
+        time.sleep(0.3)
+    fracs = [f for _, f in seen]
+    assert len(seen) >= 3 and all(m.startswith("Planning") for m, _ in seen)
+    assert fracs == sorted(fracs) and 0.0 < fracs[-1] <= 0.45  # the running unit counts, capped at 90%
+    report = pm.report()["stages"]["crew"]
+    assert report["done"] == 1 and report["seconds"] >= 0.3
+    assert pm.fraction() == pytest.approx(0.5)
+    n = len(seen)
+    time.sleep(0.15)
+    assert len(seen) == n  # the ticker stopped with the stage
+
+
+def test_failed_stage_is_timed_but_not_counted(tmp_path):
+    history = _history(tmp_path, {"crew": 1.0})
+    pm = ProgressModel(lambda msg, frac: None, {"crew": 1}, history=history, tick=0.05)
+    with pytest.raises(RuntimeError):
+        with pm.stage("crew", "Planning"):
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+    report = pm.report()["stages"]["crew"]
+    assert report["done"] == 0 and report["seconds"] >= 0.1
+    assert pm.fraction() == 0.0  # no longer running either
+    assert history.snapshot()["crew"]["n"] == 1
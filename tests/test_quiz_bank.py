@@ -0,0 +1,71 @@
+import csv
+import json
+
+import pytest
+
+from src.tools import quiz_bank
+from src.tools.quiz_bank import QuizBank
+
+
+def _quiz(n_mcq: int = 2, bloom: str = "understand", difficulty: str = "medium"):
+    items = [{"type": "mcq", "question": f"Q{i}?", "choices": ["a", "b", "c", "d"], "answer": i % 4,
+              "rationale": "r", "bloom": bloom, "difficulty": difficulty} for i in range(n_mcq)]
+    return {"items": items + [{"type": "short", "prompt": "Explain."}]}
+
+
+@pytest.fixture
+def bank(tmp_path):
+    b = QuizBank(str(tmp_path / "quiz_bank.sqlite"))
+    yield b
+    b.close()
+
+
+def test_readding_a_lesson_replaces_its_items_and_retain_prunes(bank):
+    bank.add_quiz("1_1", _quiz(3), week=1, lesson=1, title="One", topic="T")
+    bank.add_quiz("1_2", _quiz(2, bloom="apply", difficulty="hard"), week=1, lesson=2, title="Two", topic="T")
+    bank.add_quiz("1_1", _quiz(1), week=1, lesson=1, title="One", topic="T")
+    assert bank.count() == 2 + 3
+    assert bank.count(unit="1_1") == 2
+    assert bank.retain(["1_2"]) == 2
+    assert bank.summary() == {"items": 3, "lessons": 1, "by_type": {"mcq": 2, "short": 1},
+                              "by_bloom": {"apply": {"hard": 2}}}
+
+
+def test_query_filters_and_order(bank):
+    bank.add_quiz("2_3", _quiz(1, difficulty="easy"), week=2, lesson=3)
+    bank.add_quiz("1_1", _quiz(2, difficulty="hard"), week=1, lesson=1)
+    items = list(bank.query(type="mcq"))
+    assert [(it["unit"], it["position"]) for it in items] == [("1_1", 0), ("1_1", 1), ("2_3", 0)]
+    assert [it["unit"] for it in bank.query(difficulty=["easy"], type="mcq")] == ["2_3"]
+    assert len(list(bank.query(limit=2))) == 2
+    with pytest.raises(ValueError):
+        list(bank.query(colour="red"))
+
+
+def test_query_streams_in_chunks(bank, monkeypatch):
+    monkeypatch.setattr(quiz_bank, "_FETCH_ROWS", 3)
+    for lesson in range(1, 6):
+        bank.add_quiz(f"1_{lesson}", _quiz(2), week=1, lesson=lesson)
+    seen = []
+    for it in bank.query():
+        seen.append(it["unit"])
+        if len(seen) == 1:
+            bank.count()  # the bank stays usable while a query is being consumed
+    assert len(seen) == 15
+
+
+def test_export_formats(bank, tmp_path):
+    bank.add_quiz("1_1", _quiz(2), week=1, lesson=1, title="One", topic="T")
+    assert bank.export(str(tmp_path / "out.jsonl")) == 3
+    lines = (tmp_path / "out.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["question"] == "Q0?"
+    assert bank.export(str(tmp_path / "out.json"), type="mcq") == 2
+    doc = json.loads((tmp_path / "out.json").read_text())
+    assert [it["question"] for it in doc["items"]] == ["Q0?", "Q1?"]
+    assert bank.export(str(tmp_path / "empty.json"), week=9) == 0
+    assert json.loads((tmp_path / "empty.json").read_text()) == {"items": []}
+    assert bank.export(str(tmp_path / "out.csv")) == 3
+    rows = list(csv.DictReader((tmp_path / "out.csv").open()))
+    assert rows[1]["answer"] == "b" and rows[1]["choice_d"] == "d" and rows[2]["prompt"] == "Explain."
+    with pytest.raises(ValueError):
+        bank.export(str(tmp_path / "out.xml"))
@@ -0,0 +1,108 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.tools.rate_limit import AdaptiveLimiter, TokenBucket, is_throttle, is_transient
+
+
+class _HttpError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(status)
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+class ConnectionError(Exception):  # transient by name, like requests.ConnectionError
+    pass
+
+
+def _failing(*errors):
+    """A call that raises `errors` in turn, then succeeds."""
+    left = list(errors)
+
+    def fn():
+        if left:
+            raise left.pop(0)
+        return "ok"
+
+    return fn
+
+
+def _limiter(**kw) -> AdaptiveLimiter:
+    opts = dict(rate=0, max_concurrency=8, retries=4, base_delay=0.0, max_delay=0.0)
+    opts.update(kw)
+    return AdaptiveLimiter("test", **opts)
+
+
+def test_classification():
+    assert is_throttle(_HttpError(429)) and is_throttle(_HttpError(503))
+    assert is_throttle(_HttpError(500, {"retry-after": "1"}))
+    assert not is_throttle(_HttpError(500)) and is_transient(_HttpError(500))
+    assert not is_throttle(ConnectionError()) and is_transient(ConnectionError())
+    assert not is_transient(_HttpError(404)) and not is_transient(KeyError("x"))
+
+
+def test_throttle_halves_the_window_and_success_grows_it():
+    lim = _limiter()
+    assert lim.stats()["concurrency_limit"] == 4
+    assert lim.call(_failing(_HttpError(429))) == "ok"
+    assert lim.stats()["concurrency_limit"] == pytest.approx(2 + 1 / 2)
+    for _ in range(20):
+        lim.call(lambda: None)
+    assert lim.stats()["concurrency_limit"] > 4
+    assert lim.stats()["throttled"] == 1 and lim.stats()["retries"] == 1
+
+
+def test_transient_errors_are_retried_without_shrinking_the_window():
+    lim = _limiter()
+    assert lim.call(_failing(ConnectionError("reset"), _HttpError(502))) == "ok"
+    stats = lim.stats()
+    assert stats["transient"] == 2 and stats["throttled"] == 0 and stats["retries"] == 2
+    assert stats["concurrency_limit"] > 4
+
+
+def test_window_never_drops_below_min_concurrency():
+    lim = _limiter(retries=10)
+    lim.call(_failing(*[_HttpError(429)] * 8))
+    assert lim.stats()["concurrency_limit"] >= 1
+
+
+def test_non_transient_errors_raise_at_once_and_retries_run_out():
+    lim = _limiter(retries=2)
+    with pytest.raises(KeyError):
+        lim.call(_failing(KeyError("page")))
+    with pytest.raises(ConnectionError):
+        lim.call(_failing(*[ConnectionError()] * 3))
+    stats = lim.stats()
+    assert stats["retries"] == 2 and stats["errors"] == 2 and stats["inflight"] == 0
+
+
+def test_window_bounds_concurrency():
+    lim = _limiter(max_concurrency=2)  # window starts at 1
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    threads = [threading.Thread(target=lim.call, args=(work,)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] <= 2
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=50, burst=1)
+    t0 = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - t0 >= 0.09
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("wikipedia")
+pytest.importorskip("youtube_transcript_api")
+
+from src.tools.search_tools import SearchTools  # noqa: E402
+
+
+class _Backend:
+    """Offline backend: search answers from a fixed list, pages count their loads."""
+
+    path = ":memory:"
+
+    def __init__(self, titles, missing=()):
+        self.titles = list(titles)
+        self.missing = set(missing)
+        self.loads = []
+
+    def search(self, query, results=5):
+        return self.titles[:results]
+
+    def page(self, title):
+        self.loads.append(title)
+        if title in self.missing:
+            raise LookupError(title)
+        return title.upper()
+
+
+def test_search_hits_are_lazy_and_memoized():
+    backend = _Backend(["Graph theory", "Graph (disambiguation)", "Tree (graph theory)"])
+    st = SearchTools(cache=False, backend=backend)
+    hits = st.wiki_search("graphs", max_results=5)
+    assert [h["title"] for h in hits] == ["Graph theory", "Tree (graph theory)"]
+    assert hits[1]["url"] == "https://en.wikipedia.org/wiki/Tree_(graph_theory)"
+    assert backend.loads == []
+    assert hits[0].page == "GRAPH THEORY"
+    assert hits[0].page == "GRAPH THEORY"
+    assert backend.loads == ["Graph theory"]
+    assert dict(hits[0]) == {"title": "Graph theory", "url": "https://en.wikipedia.org/wiki/Graph_theory",
+                             "source": "wikipedia"}
+
+
+def test_hit_that_fails_to_load_raises_on_page():
+    st = SearchTools(cache=False, backend=_Backend(["Gone"], missing={"Gone"}))
+    (hit,) = st.wiki_search("x")
+    with pytest.raises(LookupError):
+        _ = hit.page
+
+
+def test_live_page_urls_are_quoted():
+    st = SearchTools(cache=False)
+    assert st.page_url("C++ (language)") == "https://en.wikipedia.org/wiki/C%2B%2B_(language)"
@@ -0,0 +1,50 @@
+import random
+
+from src.tools.text_tools import TextTools
+
+_WORDS = ("graph node edge weight path tree cycle search queue stack heap sort order vertex degree flow "
+          "network matrix vector cost distance greedy dynamic program memory cache index hash table").split()
+
+
+def _lesson(rng: random.Random, name: str):
+    def sentence():
+        return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+
+    texts = [" ".join(sentence() for _ in range(rng.randint(3, 12))) for _ in range(rng.randint(1, 3))]
+    return {"title": f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {name}",
+            "query": " ".join(rng.choice(_WORDS) for _ in range(5)), "texts": texts}
+
+
+def test_key_concepts_do_not_depend_on_the_batch():
+    tt = TextTools()
+    rng = random.Random(7)
+    for trial in range(100):
+        a, b, c = _lesson(rng, "a"), _lesson(rng, "b"), _lesson(rng, "c")
+        alone = tt.key_concepts([a], k=3)[0]
+        assert alone
+        assert tt.key_concepts([a, b], k=3)[0] == alone, trial
+        assert tt.key_concepts([b, c, a], k=3)[2] == alone, trial
+
+
+def test_key_concepts_prefers_on_topic_sentences_and_skips_duplicates():
+    tt = TextTools()
+    lesson = {
+        "title": "Photosynthesis",
+        "query": "light reactions chlorophyll",
+        "texts": [
+            "Photosynthesis converts light energy into chemical energy in chlorophyll-bearing cells. "
+            "Photosynthesis converts light energy into chemical energy in chlorophyll-bearing cells! "
+            "The city council meets every second Tuesday to discuss local road repairs. "
+            "The light reactions of photosynthesis take place in the thylakoid membranes."
+        ],
+    }
+    picked = tt.key_concepts([lesson], k=2)[0]
+    assert len(picked) == 2
+    assert all("hotosynthesis" in s for s in picked)
+    assert tt.key_concepts([{"title": "x", "texts": []}]) == [[]]
+
+
+def test_key_concepts_without_any_content_words_keep_the_lead_sentences():
+    filler = "And the of to in is it was with which were will be by for from there these."
+    lesson = {"title": "", "texts": [" ".join([filler] * 3)]}
+    assert TextTools().key_concepts([lesson, {"title": "", "texts": [filler]}], k=2) == [[filler, filler], [filler]]
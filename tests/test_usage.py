@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from src.tools.usage_tools import UsageMeter, crew_tokens
+
+
+class _Tokens:
+    """Stands in for CrewAI's TokenProcess: lifetime counters that are never reset."""
+
+    def __init__(self):
+        self.prompt = self.completion = self.requests = 0
+
+    def add(self, prompt, completion):
+        self.prompt += prompt
+        self.completion += completion
+        self.requests += 1
+
+    def get_summary(self):
+        return SimpleNamespace(prompt_tokens=self.prompt, completion_tokens=self.completion,
+                               successful_requests=self.requests)
+
+
+def _agent():
+    return SimpleNamespace(_token_process=_Tokens())
+
+
+def test_second_kickoff_on_pooled_agent_is_not_double_counted():
+    agent = _agent()
+    meter = UsageMeter()
+
+    before = crew_tokens([agent])
+    agent._token_process.add(100, 50)
+    meter.record_crew("quiz", [agent], before, model="gpt-4o-mini", lesson="week_1_lesson_1")
+
+    before = crew_tokens([agent])
+    agent._token_process.add(10, 5)
+    meter.record_crew("quiz", [agent], before, model="gpt-4o-mini", lesson="week_1_lesson_2")
+
+    rep = meter.report()
+    assert rep["total"]["total_tokens"] == 165
+    assert rep["total"]["calls"] == 2
+    assert rep["lessons"]["week_1_lesson_1"]["total_tokens"] == 150
+    assert rep["lessons"]["week_1_lesson_2"]["total_tokens"] == 15
+    assert rep["lessons"]["week_1_lesson_2"]["prompt_tokens"] == 10
+
+
+def test_crew_delta_sums_agents_and_skips_untouched_ones():
+    a, b, idle = _agent(), _agent(), _agent()
+    a._token_process.add(1000, 1000)  # spent in an earlier build
+    meter = UsageMeter(max_tokens=100)
+    before = crew_tokens([a, b, idle])
+    a._token_process.add(20, 10)
+    b._token_process.add(30, 0)
+    meter.record_crew("crew", [a, b, idle, None], before)
+    assert meter.report()["stages"]["crew"]["total_tokens"] == 60
+    assert not meter.exhausted
+
+
+def test_budget_exhausted_by_cost():
+    meter = UsageMeter(max_cost_usd=0.01)
+    meter.record("quiz", 40_000, 0, model="gpt-4o-mini-2024-07-18")
+    assert not meter.exhausted
+    meter.record("quiz", 30_000, 0, model="gpt-4o-mini")
+    assert meter.exhausted